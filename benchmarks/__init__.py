@@ -0,0 +1 @@
+# 뷰어 파이프라인 벤치마크
@@ -0,0 +1,87 @@
+import argparse
+import ast
+import glob
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+
+from benchmarks.run_viewers import git_revision
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 필요한 페이지에서만 로드하는 무거운 모듈 (참고용으로 따로 측정)
+DEFERRED = ["matplotlib.pyplot", "arviz", "pymc", "scipy.stats", "sklearn"]
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+# 스크립트 최상위에서 실행되는 import 문만 추출 (페이지 분기 안의 import 는 제외)
+def top_level_imports(path):
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+# 새 인터프리터에서 import 만 실행해서 소요 시간과 가장 무거운 패키지 목록 측정
+def measure(statements, top=8):
+    code = "import time\n_t = time.perf_counter()\n" + "\n".join(statements) + \
+           "\nprint(time.perf_counter() - _t)"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True,
+                          env={**os.environ, "PYTHONPATH": ROOT})
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+    packages = []
+    for m in _IMPORTTIME.finditer(proc.stderr):
+        if len(m.group(3)) == 1:
+            packages.append((m.group(4), int(m.group(2)) / 1e6))
+    packages.sort(key=lambda x: -x[1])
+    return {"seconds": float(proc.stdout.strip().splitlines()[-1]),
+            "heaviest": [{"module": n, "seconds": round(s, 4)} for n, s in packages[:top]]}
+
+
+def best_of(statements, repeat):
+    runs = [measure(statements) for _ in range(repeat)]
+    ok = [r for r in runs if "error" not in r]
+    return min(ok, key=lambda r: r["seconds"]) if ok else runs[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="앱별 콜드 스타트 import 시간 측정")
+    parser.add_argument("--apps", nargs="+", default=None, help="측정할 스크립트 (기본: 전체 앱)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default="bench_results_cold_start.json")
+    args = parser.parse_args(argv)
+
+    apps = args.apps or sorted(glob.glob(os.path.join(ROOT, "pump_*.py")))
+    results = []
+    for path in apps:
+        name = os.path.basename(path)
+        res = best_of(top_level_imports(path), args.repeat)
+        results.append({"app": name, **res})
+        if "error" in res:
+            print(f"{name:45s} 실패: {res['error']}")
+        else:
+            print(f"{name:45s} {res['seconds'] * 1000:8.0f} ms")
+    deferred = []
+    for name in DEFERRED:
+        res = best_of([f"import {name}"], 1)
+        deferred.append({"module": name, **res})
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "apps": results,
+        "deferred": deferred,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from benchmarks.synthetic import write_master_workbook
+from pumpcurve import bayes, deviation, master_db, plotting, viewer, workbook_cache
+from pumpcurve.curve_store import SERIES_ORDER, CurveStore, match_column
+from pumpcurve.editor_diff import IncrementalCache
+
+SHEETS = workbook_cache.SHEETS
+# with_tabs / tabs_fixed 의 CurveStore source 이름 (SHEETS 순서)
+TAB_LABELS = ["Reference", "Catalog", "Deviation"]
+
+
+# 단계별 시간 기록
+class StageTimer:
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def __call__(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[stage] = self.stages.get(stage, 0.0) + time.perf_counter() - start
+
+
+# ---- 뷰어별 파이프라인 (각 스크립트의 처리 순서를 그대로 재현) ----
+
+# 기존 방식: 모델마다 boolean mask 로 필터링 (pump_curve_viewer.py 등)
+def bench_mask_baseline(data, timer):
+    with timer("excel_load"):
+        frames = {name: pd.read_excel(io.BytesIO(data), sheet_name=name) for name in SHEETS}
+    with timer("normalize"):
+        ref = frames["reference data"]
+        mcol, qcol, hcol = (match_column(ref, c) for c in (["모델"], ["토출량"], ["토출양정"]))
+        models = ref[mcol].dropna().unique().tolist()
+    with timer("filter"):
+        subsets = [ref[ref[mcol] == m].sort_values(qcol) for m in models]
+    with timer("figure"):
+        fig = go.Figure()
+        for m, sub in zip(models, subsets):
+            fig.add_trace(go.Scatter(x=sub[qcol], y=sub[hcol], mode="lines+markers", name=m))
+    return fig
+
+
+# pump_curve_viewer_tabs_fixed_updated.py: 해시 캐시 + curve store + add_traces
+def bench_tabs_fixed_updated(data, timer, batched=False):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        digest = workbook_cache.content_hash(data)
+        with timer("excel_load"):
+            workbook_cache.load_workbook(data, digest=digest, cache_dir=cache_dir)
+        with timer("cache_load"):
+            frames = workbook_cache.load_workbook(data, digest=digest, cache_dir=cache_dir)
+    with timer("normalize"):
+        store = CurveStore.from_frames(frames)
+    with timer("filter"):
+        models = store.models_in("reference data")
+        slices = {src: [store.slice(src, m) for m in models] for src in SHEETS}
+    with timer("figure"):
+        fig = go.Figure()
+        for src in SHEETS:
+            if batched:
+                fig.add_trace(plotting.batched_trace(store, src, "h", models))
+                continue
+            for m, sl in zip(models, slices[src]):
+                fig.add_trace(go.Scatter(x=store.q[sl], y=store.h[sl], mode="lines+markers", name=m))
+    return fig
+
+
+# 뷰어와 같은 해시 캐시 경로로 워크북 로드 (매번 빈 캐시 디렉터리에서 시작해서 실제 파싱 시간 측정)
+def load_frames(data, sheets=SHEETS):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        return workbook_cache.load_workbook(data, sheets=sheets, cache_dir=cache_dir)
+
+
+# pump_curve_viewer_app.py: reference + clean_frame + curve store 슬라이스
+def bench_viewer_app(data, timer):
+    with timer("excel_load"):
+        df = load_frames(data)["reference data"]
+    with timer("normalize"):
+        df = viewer.clean_frame(df)
+        store = CurveStore.from_frame(df[["Model", "Capacity", "Total Head"]])
+    with timer("filter"):
+        curves = [(m, store.curve("data", m)) for m in df["Model"].dropna().astype(str).unique()]
+    with timer("figure"):
+        fig = go.Figure()
+        for m, (q, h, _) in curves:
+            fig.add_trace(viewer.labelled_trace(m, q, h))
+        viewer.curve_layout(fig, height=800, width=None, title="Pump Performance Curves")
+    return fig
+
+
+# pump_curve_viewer_with_tabs.py / tabs_fixed.py: 전체 시트 로드 + clean_frame + Total 탭
+def bench_with_tabs(data, timer):
+    with timer("excel_load"):
+        frames = load_frames(data)
+    with timer("normalize"):
+        store = CurveStore.from_frames({label: viewer.clean_frame(frames[name])
+                                        for label, name in zip(TAB_LABELS, SHEETS)})
+    with timer("filter"):
+        models = store.models_in("Reference")
+        curves = [(label, m, store.curve(label, m)) for label in TAB_LABELS for m in models]
+    with timer("figure"):
+        fig = go.Figure()
+        for label, m, (q, h, _) in curves:
+            if len(q):
+                fig.add_trace(viewer.labelled_trace(m, q, h, name=f"{m} ({label})"))
+        viewer.curve_layout(fig)
+    return fig
+
+
+# pump_curve_viewer_final_app.py / stable / use_discharge_head: reference + 편집기 트레이스 캐시
+def bench_final_app(data, timer):
+    with timer("excel_load"):
+        df = load_frames(data)["reference data"]
+    with timer("normalize"):
+        df = viewer.clean_frame(df)
+    with timer("filter"):
+        def build(model, subset):
+            q, h, _ = CurveStore.from_frame(subset).curve("data", str(model))
+            return subset["Series"].iloc[0], viewer.labelled_trace(model, q, h)
+        entries = IncrementalCache().update("bench", df, df, None, "Model", build)
+    with timer("figure"):
+        fig = go.Figure([trace for _, (_, trace) in entries])
+        viewer.curve_layout(fig)
+    return fig
+
+
+# pump_curve_editor_app.py: 시리즈 하나 선택 후 모델별 곡선
+def bench_editor(data, timer):
+    with timer("excel_load"):
+        df = load_frames(data)["reference data"]
+    with timer("normalize"):
+        df = df.rename(columns=lambda x: x.strip())
+        df = df[df["모델"].notna()]
+        df["Series"] = df["모델"].str.extract(r"(XRF\d+)")
+        df["토출량(L/min)"] = df["Capacity"]
+        df["토출양정"] = df["Total Head"]
+    with timer("filter"):
+        df_series = df[df["Series"] == SERIES_ORDER[0]]
+        store = CurveStore.from_frame(df_series[["모델", "토출량(L/min)", "토출양정"]])
+        models = store.models_in("data")
+    with timer("figure"):
+        fig = go.Figure()
+        for m in models:
+            q, h, _ = store.curve("data", m)
+            fig.add_trace(go.Scatter(x=q, y=h, mode="lines+markers", name=m,
+                                     hovertemplate=plotting.model_hovertemplate("h")))
+        viewer.curve_layout(fig, height=800, width=1400, title=f"{SERIES_ORDER[0]} Performance Curves",
+                            dragmode="pan")
+    return fig
+
+
+# pump_streamlit_app.py: 마스터 DB 로드 + deviation 전체 판정 + 켤레 사후분포 (그래프는 matplotlib 이라 제외)
+def bench_streamlit_app(data, timer):
+    with tempfile.TemporaryDirectory() as tmp:
+        with timer("excel_load"):
+            master = master_db.MasterDB.from_workbook(data, cache_dir=tmp, db_dir=tmp)
+    with timer("normalize"):
+        store = master.store(["reference data", "deviation data"])
+    with timer("deviation"):
+        deviation.evaluate(store)
+    with timer("posterior"):
+        dev = master.store(["deviation data"])
+        bayes.conjugate_posterior(dev, "deviation data", "h")
+        bayes.conjugate_posterior(dev, "deviation data", "kw")
+    return None
+
+
+VARIANTS = {
+    "mask_baseline": bench_mask_baseline,
+    "tabs_fixed_updated": bench_tabs_fixed_updated,
+    "tabs_fixed_updated[webgl]": lambda data, timer: bench_tabs_fixed_updated(data, timer, batched=True),
+    "viewer_app": bench_viewer_app,
+    "with_tabs": bench_with_tabs,
+    "final_app": bench_final_app,
+    "editor": bench_editor,
+    "streamlit_app": bench_streamlit_app,
+}
+
+
+def run_variant(name, data, repeat=3):
+    best = {}
+    for _ in range(repeat):
+        timer = StageTimer()
+        fig = VARIANTS[name](data, timer)
+        with timer("serialize"):
+            payload = fig.to_json() if fig is not None else ""
+        for stage, sec in timer.stages.items():
+            best[stage] = min(best.get(stage, float("inf")), sec)
+    best["total"] = sum(v for k, v in best.items() if k != "cache_load")
+    return best, len(payload), len(fig.data) if fig is not None else 0
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="뷰어 파이프라인 단계별 벤치마크")
+    parser.add_argument("--models", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--points", type=int, nargs="+", default=[10])
+    parser.add_argument("--variants", nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_models in args.models:
+            for n_points in args.points:
+                path = write_master_workbook(os.path.join(tmp, f"master_{n_models}_{n_points}.xlsx"),
+                                             n_models, n_points)
+                with open(path, "rb") as f:
+                    data = f.read()
+                for name in args.variants:
+                    stages, json_bytes, traces = run_variant(name, data, args.repeat)
+                    results.append({"variant": name, "models": n_models, "points": n_points,
+                                    "traces": traces, "json_bytes": json_bytes,
+                                    "seconds": {k: round(v, 6) for k, v in stages.items()}})
+                    print(f"{name:28s} models={n_models:<6d} points={n_points:<4d} "
+                          f"total={stages['total'] * 1000:9.1f} ms  json={json_bytes / 1024:8.1f} KiB")
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    main()
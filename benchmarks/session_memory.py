@@ -0,0 +1,100 @@
+import argparse
+import gc
+import json
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks.run_viewers import git_revision
+from benchmarks.synthetic import make_master_frames
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ["cache_data", "master_db"]
+
+
+# 현재 프로세스 RSS (MB)
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# 한 모드에서 N개 세션이 마스터 데이터를 들고 있을 때의 RSS 증가량
+# cache_data: 세션마다 pickle 로 복원한 복사본 (st.cache_data 동작)
+# master_db: 프로세스 공유 Arrow 테이블 위의 view
+def run_mode(mode, sessions, n_models, n_points):
+    from pumpcurve.master_db import MasterDB
+
+    frames = make_master_frames(n_models, n_points)
+    gc.collect()
+    base = rss_mb()
+    if mode == "cache_data":
+        shared = pickle.dumps(frames)
+        open_session = lambda: pickle.loads(shared)
+    else:
+        db = MasterDB.from_frames(frames)
+        open_session = db.frames
+    del frames
+    gc.collect()
+    loaded = rss_mb()
+    held = [open_session() for _ in range(sessions)]
+    gc.collect()
+    total = rss_mb()
+    return {
+        "mode": mode,
+        "sessions": len(held),
+        "shared_mb": round(loaded - base, 2),
+        "total_mb": round(total - base, 2),
+        "per_session_mb": round((total - loaded) / sessions, 3),
+    }
+
+
+# 모드별로 새 인터프리터에서 측정 (서로의 할당이 섞이지 않게)
+def measure(mode, sessions, n_models, n_points):
+    code = ("import json, sys\nfrom benchmarks.session_memory import run_mode\n"
+            f"print(json.dumps(run_mode({mode!r}, {sessions}, {n_models}, {n_points})))")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                          env={**os.environ, "PYTHONPATH": ROOT})
+    if proc.returncode != 0:
+        return {"mode": mode, "error": proc.stderr.strip().splitlines()[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="세션 수에 따른 마스터 데이터 메모리 사용량 비교")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--models", type=int, default=2000)
+    parser.add_argument("--points", type=int, default=50)
+    parser.add_argument("--out", default="bench_results_session_memory.json")
+    args = parser.parse_args(argv)
+
+    results = []
+    for sessions in args.sessions:
+        for mode in MODES:
+            res = measure(mode, sessions, args.models, args.points)
+            results.append({"models": args.models, "points": args.points, **res})
+            if "error" in res:
+                print(f"{mode:12s} sessions={sessions:3d} 실패: {res['error']}")
+            else:
+                print(f"{mode:12s} sessions={sessions:3d} total={res['total_mb']:8.1f} MB "
+                      f"per_session={res['per_session_mb']:7.3f} MB")
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from pumpcurve.curve_store import SERIES_ORDER
+
+
+# 시리즈/임펠러 조합으로 모델명 생성 (XRF3-1, XRF3-2, ...)
+def model_names(n_models):
+    per_series = -(-n_models // len(SERIES_ORDER))
+    names = [f"{s}-{i + 1}" for s in SERIES_ORDER for i in range(per_series)]
+    return names[:n_models]
+
+
+# 모델 × 점 수만큼 실제 시트/컬럼 이름을 가진 합성 마스터 데이터
+def make_master_frames(n_models=100, n_points=10, seed=0):
+    rng = np.random.default_rng(seed)
+    models = np.repeat(model_names(n_models), n_points)
+    t = np.tile(np.linspace(0, 1, n_points), n_models)
+    q_max = np.repeat(rng.uniform(50, 3000, n_models), n_points)
+    h0 = np.repeat(rng.uniform(20, 200, n_models), n_points)
+    p0 = np.repeat(rng.uniform(0.5, 50, n_models), n_points)
+    q = t * q_max
+    h = h0 * (1 - 0.5 * t ** 2)
+    kw = p0 * (0.5 + 0.6 * t)
+
+    reference = pd.DataFrame({"모델": models, "토출량": q, "토출양정": h, "축동력": kw,
+                              "Capacity": q, "Total Head": h})
+    catalog = pd.DataFrame({"모델명": models, "유량": q, "토출양정&전양정": h * 1.02, "축동력": kw})
+    deviation = pd.DataFrame({
+        "모델명": models,
+        "유량": q * rng.normal(1, 0.01, len(q)),
+        "토출양정": h * rng.normal(1, 0.03, len(q)),
+        "축동력": kw * rng.normal(1.02, 0.02, len(q)),
+    })
+    return {"reference data": reference, "catalog data": catalog, "deviation data": deviation}
+
+
+def write_master_workbook(path, n_models=100, n_points=10, seed=0):
+    frames = make_master_frames(n_models, n_points, seed)
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for name, df in frames.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="합성 마스터 워크북 생성")
+    parser.add_argument("path")
+    parser.add_argument("--models", type=int, default=100)
+    parser.add_argument("--points", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    write_master_workbook(args.path, args.models, args.points, args.seed)
+
+
+if __name__ == "__main__":
+    main()
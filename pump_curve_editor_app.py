@@ -3,49 +3,104 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objs as go
 import numpy as np
+from pumpcurve import affinity, fitting, perf, plotting, viewer, workbook_cache, writeback
+from pumpcurve.curve_store import CurveStore
+from pumpcurve.editor_diff import IncrementalCache
 
 st.set_page_config(layout="wide")
+perf_rec = perf.session_recorder(st.session_state, "editor")
 st.title("🚀 Interactive Pump Performance Curve Viewer")
 
 # 파일 업로드
-uploaded_file = st.file_uploader("Upload Excel file with 'reference data' sheet", type=["xls", "xlsx"])
+uploaded_file = st.file_uploader("Upload Excel file with 'reference data' sheet", type=["xls", "xlsx", "xlsm"])
 if uploaded_file:
-    df = pd.read_excel(uploaded_file, sheet_name="reference data")
+    with perf.stage("excel_load"):
+        # 업로드 내용 해시 (이름/크기가 같은 다른 파일도 구분)
+        digest = workbook_cache.content_hash(uploaded_file.getvalue())
+        df = workbook_cache.load_workbook(uploaded_file, digest=digest)["reference data"]
 
     # 전처리
-    df = df.rename(columns=lambda x: x.strip())
-    df = df[df["모델"].notna()]
-    df["Series"] = df["모델"].str.extract(r"(XRF\d+)")
-    df["Impeller"] = df["모델"].str.extract(r"XRF\d+-(.*)")
-    df["토출량(L/min)"] = df["Capacity"]
-    df["토출양정"] = df["Total Head"]
+    with perf.stage("normalize"):
+        df = df.rename(columns=lambda x: x.strip())
+        df = df[df["모델"].notna()]
+        df["Series"] = df["모델"].str.extract(r"(XRF\d+)")
+        df["Impeller"] = df["모델"].str.extract(r"XRF\d+-(.*)")
+        df["토출량(L/min)"] = df["Capacity"]
+        df["토출양정"] = df["Total Head"]
 
     # 시리즈 선택
     series_options = df["Series"].dropna().unique()
     selected_series = st.selectbox("Select Series", sorted(series_options))
 
-    df_series = df[df["Series"] == selected_series].copy()
+    with perf.stage("filter"):
+        df_series = df[df["Series"] == selected_series].copy()
+    batched = st.sidebar.checkbox("⚡ WebGL 일괄 렌더링", value=False,
+                                  help=f"모델 {plotting.BATCH_THRESHOLD}개 초과 시 자동 적용")
 
-    # 모델별로 시각화
-    fig = go.Figure()
-
-    for model, group in df_series.groupby("모델"):
-        group_sorted = group.sort_values("토출량(L/min)")
-        fig.add_trace(go.Scatter(
-            x=group_sorted["토출량(L/min)"],
-            y=group_sorted["토출양정"],
+    # 모델 하나의 곡선 트레이스 (hover 는 hovertemplate 로 처리)
+    def model_trace(model, q, h):
+        return go.Scatter(
+            x=q,
+            y=h,
             mode="lines+markers",
             name=model,
-            text=[f"{model}<br>Capacity: {x} L/min<br>Head: {y:.1f} m"
-                  for x, y in zip(group_sorted["토출량(L/min)"], group_sorted["토출양정"])],
-            hoverinfo="text"
-        ))
+            hovertemplate=plotting.model_hovertemplate("h")
+        )
+
+    # 모델별 곡선 Figure
+    @perf.timed("traces")
+    def build_figure(data):
+        store = CurveStore.from_frame(data[["모델", "토출량(L/min)", "토출양정"]])
+        models = store.models_in("data")
+        fig = go.Figure()
+        if batched or len(models) > plotting.BATCH_THRESHOLD:
+            fig.add_trace(plotting.batched_trace(store, "data", "h", models, name=selected_series))
+            return fig
+        for model in models:
+            q, h, _ = store.curve("data", model)
+            fig.add_trace(model_trace(model, q, h))
+        return fig
+
+    # 편집된 모델 하나의 트레이스 + 피팅 (변경된 모델만 다시 호출됨)
+    def build_model(model, group):
+        store = CurveStore.from_frame(group[["모델", "토출량(L/min)", "토출양정"]])
+        q, h, _ = store.curve("data", str(model))
+        return {"trace": model_trace(str(model), q, h), "fit": fitting.fit_source(store, "data", "h")}
+
+    # 상사법칙 곡선군 (모델, 격자 단위로 캐시)
+    @perf.cached(st.cache_data(show_spinner=False))
+    def affinity_curves(model, q, h, kw, speeds, diameters):
+        return affinity.family(q, h, kw, speeds, diameters)
+
+    # 모델별로 시각화
+    fig = build_figure(df_series)
 
     # 사용자 입력으로 보조선 추가
     st.sidebar.markdown("### ➕ Add Custom Guide Lines")
     xline = st.sidebar.number_input("Vertical Line (Capacity, L/min)", value=None, step=10.0, format="%.1f")
     yline = st.sidebar.number_input("Horizontal Line (Head, m)", value=None, step=5.0, format="%.1f")
 
+    # 회전수(VFD) / 임펠러 트림 곡선군
+    st.sidebar.markdown("### 🔁 Affinity Law Curve Family")
+    family_model = st.sidebar.selectbox("Base Model", ["(none)"] + sorted(df_series["모델"].unique()))
+    speed_lo, speed_hi = st.sidebar.slider("Speed Range (%)", 30, 120, (60, 100), step=5)
+    speed_step = st.sidebar.number_input("Speed Step (%)", value=10, min_value=1, max_value=50)
+    trims = st.sidebar.multiselect("Impeller Diameter (%)", list(range(70, 101, 5)), default=[100])
+
+    family = None
+    if family_model != "(none)" and trims:
+        base = CurveStore.from_frame(df_series[["모델", "토출량(L/min)", "토출양정"]
+                                              + [c for c in ["축동력"] if c in df_series.columns]])
+        q, h, kw = base.curve("data", family_model)
+        speeds = tuple(np.arange(speed_lo, speed_hi + 1e-9, speed_step) / 100)
+        diameters = tuple(d / 100 for d in sorted(trims))
+        fq, fh, fkw = affinity_curves(family_model, tuple(q), tuple(h), tuple(kw), speeds, diameters)
+        labels = affinity.family_labels(speeds, diameters)
+        impeller = df_series.loc[df_series["모델"] == family_model, "Impeller"].dropna()
+        family_name = f"{family_model} family" + (f" (Impeller {impeller.iloc[0]})" if len(impeller) else "")
+        fig.add_trace(plotting.family_trace(fq, fh, labels, family_name, "h", line=dict(dash="dash")))
+        family = (fq, fkw, labels, family_name)
+
     shapes = []
     if xline:
         shapes.append(dict(type="line", x0=xline, x1=xline, y0=0, y1=1, yref='paper',
@@ -54,47 +109,47 @@ if uploaded_file:
         shapes.append(dict(type="line", y0=yline, y1=yline, x0=0, x1=1, xref='paper',
                            line=dict(color="blue", width=1, dash="dot")))
 
-    fig.update_layout(
-        title=f"{selected_series} Performance Curves",
-        xaxis_title="Capacity (L/min)",
-        yaxis_title="Total Head (m)",
-        hovermode="closest",
-        height=800,
-        width=1400,
-        dragmode="pan",
-        xaxis=dict(showgrid=True),
-        yaxis=dict(showgrid=True),
-        shapes=shapes
-    )
-
-    st.plotly_chart(fig, use_container_width=True)
+    viewer.curve_layout(fig, height=800, width=1400, title=f"{selected_series} Performance Curves",
+                        dragmode="pan", shapes=shapes)
+
+    with perf.stage("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+    if family is not None and np.isfinite(family[1]).any():
+        fq, fkw, labels, family_name = family
+        fig_kw = go.Figure(plotting.family_trace(fq, fkw, labels, family_name, "kw"))
+        viewer.curve_layout(fig_kw, height=500, width=None, yaxis_title="Shaft Power (kW)",
+                            title=f"{family_name} - Shaft Power", dragmode="pan")
+        with perf.stage("plotly_chart"):
+            st.plotly_chart(fig_kw, use_container_width=True)
 
     st.markdown("### 📋 Edit Backdata for This Series")
-    edited_df = st.data_editor(df_series[["모델", "Impeller", "토출량(L/min)", "토출양정"]], num_rows="dynamic")
+    editor_key = f"editor_{selected_series}"
+    base_df = df_series[["모델", "Impeller", "토출량(L/min)", "토출양정"]]
+    edited_df = st.data_editor(base_df, num_rows="dynamic", key=editor_key)
+    # 화면 컬럼 -> 원본 시트 컬럼 (Impeller 는 모델명에서 추출한 값이라 저장 안 함)
+    writeback.save_panel(uploaded_file, "reference data", base_df, editor_key,
+                         {"모델": "모델", "토출량(L/min)": "Capacity", "토출양정": "Total Head"})
 
-    # 실시간 반영 그래프
+    # 실시간 반영 그래프 (편집 내역 기준으로 바뀐 모델만 다시 계산)
     if st.checkbox("🔄 Update Graph with Edited Data"):
-        fig2 = go.Figure()
-        for model, group in edited_df.groupby("모델"):
-            group_sorted = group.sort_values("토출량(L/min)")
-            fig2.add_trace(go.Scatter(
-                x=group_sorted["토출량(L/min)"],
-                y=group_sorted["토출양정"],
-                mode="lines+markers",
-                name=model,
-                text=[f"{model}<br>Capacity: {x} L/min<br>Head: {y:.1f} m"
-                      for x, y in zip(group_sorted["토출량(L/min)"], group_sorted["토출양정"])],
-                hoverinfo="text"
-            ))
-        fig2.update_layout(
-            title=f"{selected_series} (Updated)",
-            xaxis_title="Capacity (L/min)",
-            yaxis_title="Total Head (m)",
-            hovermode="closest",
-            height=800,
-            width=1400,
-            dragmode="pan",
-            xaxis=dict(showgrid=True),
-            yaxis=dict(showgrid=True),
-        )
-        st.plotly_chart(fig2, use_container_width=True)
+        cache = st.session_state.setdefault("editor_trace_cache", IncrementalCache())
+        with perf.stage("model_entries"):
+            entries = cache.update((digest, selected_series), base_df, edited_df,
+                                   st.session_state.get(editor_key), "모델", build_model)
+        models = [m for m, _ in entries]
+        if batched or len(models) > plotting.BATCH_THRESHOLD:
+            fig2 = build_figure(edited_df)
+        else:
+            fig2 = go.Figure([e["trace"] for _, e in entries])
+        st.caption(f"재계산 모델: {cache.rebuilt} / {len(models)}")
+        viewer.curve_layout(fig2, height=800, width=1400, title=f"{selected_series} (Updated)", dragmode="pan")
+        with perf.stage("plotly_chart"):
+            st.plotly_chart(fig2, use_container_width=True)
+
+        with st.expander("📐 Fitted Q-H Curves (Edited)"):
+            fits = [e["fit"] for _, e in entries if len(e["fit"])]
+            if fits:
+                st.dataframe(pd.concat(fits, ignore_index=True), use_container_width=True)
+
+perf.sidebar_panel(perf_rec)
@@ -1,48 +1,57 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objs as go
+from pumpcurve import perf, viewer, workbook_cache
+from pumpcurve.curve_store import CurveStore
 
 st.set_page_config(page_title="Dooch XRL(F) 성능 곡선 뷰어", layout="wide")
+perf_rec = perf.session_recorder(st.session_state, "viewer")
 st.title("📊 Dooch XRL(F) 성능 곡선 뷰어")
 
 # 파일 업로드
 uploaded_file = st.file_uploader("Excel 파일 업로드 (.xlsx 또는 .xlsm)", type=["xlsx", "xlsm"])
 
 if uploaded_file:
-    xls = pd.ExcelFile(uploaded_file)
+    with perf.stage("excel_load"):
+        frames = workbook_cache.load_workbook(uploaded_file)
+
+    # 세 시트를 (source, 모델, Q) 순 정렬 배열로 한 번만 변환
+    with perf.stage("normalize"):
+        store = CurveStore.from_frames({"Reference": frames["reference data"],
+                                        "Catalog": frames["catalog data"],
+                                        "Deviation": frames["deviation data"]})
 
     tabs = st.tabs(["Total", "Reference", "Catalog", "Deviation"])
 
-    def plot_curves(df, model_col, x_col, y_col, selected_models):
+    # curves: [(모델, source, 트레이스 이름)]
+    def plot_curves(curves, key):
         fig = go.Figure()
-        for model in selected_models:
-            model_df = df[df[model_col] == model].sort_values(by=x_col)
-            fig.add_trace(go.Scatter(x=model_df[x_col], y=model_df[y_col],
-                                     mode='lines+markers', name=str(model)))
-        fig.update_layout(xaxis_title=x_col, yaxis_title=y_col,
-                          hovermode='closest', height=600)
-        st.plotly_chart(fig, use_container_width=True)
-
-    def process_and_plot(sheet_name, model_col, x_col, y_col, x_label, y_label, convert_columns=None):
-        df = pd.read_excel(uploaded_file, sheet_name=sheet_name)
+        with perf.stage("traces"):
+            for model, source, name in curves:
+                q, h, _ = store.curve(source, str(model))
+                if len(q):
+                    fig.add_trace(viewer.labelled_trace(str(model), q, h, name=name))
+        viewer.curve_layout(fig, height=600, width=None)
+        with perf.stage("plotly_chart"):
+            st.plotly_chart(fig, use_container_width=True, key=key)
+
+    def process_and_plot(sheet_name, source, model_col, convert_columns=None):
+        df = frames[sheet_name]
         if convert_columns:
             df = df.rename(columns=convert_columns)
         models = df[model_col].dropna().unique().tolist()
-        selected_models = st.multiselect("모델 선택", models, default=models[:5])
+        selected_models = st.multiselect("모델 선택", models, default=models[:5], key=f"{sheet_name}_models")
         st.dataframe(df, use_container_width=True, height=300)
         if selected_models:
-            plot_curves(df, model_col, x_col, y_col, selected_models)
+            plot_curves([(m, source, str(m)) for m in selected_models], key=sheet_name)
 
     # Reference 탭
     with tabs[1]:
         st.subheader("📘 Reference Data")
         process_and_plot(
             sheet_name="reference data",
-            model_col="모델",
-            x_col="토출량",
-            y_col="토출양정",
-            x_label="Capacity",
-            y_label="Total Head"
+            source="Reference",
+            model_col="모델"
         )
 
     # Catalog 탭
@@ -50,11 +59,8 @@ if uploaded_file:
         st.subheader("📙 Catalog Data")
         process_and_plot(
             sheet_name="catalog data",
+            source="Catalog",
             model_col="모델명",
-            x_col="유량",
-            y_col="토출양정&전양정",
-            x_label="Capacity",
-            y_label="Total Head",
             convert_columns={"유량": "토출량", "토출양정&전양정": "토출양정"}
         )
 
@@ -63,20 +69,17 @@ if uploaded_file:
         st.subheader("📕 Deviation Data")
         process_and_plot(
             sheet_name="deviation data",
+            source="Deviation",
             model_col="모델명",
-            x_col="유량",
-            y_col="토출양정",
-            x_label="Capacity",
-            y_label="Total Head",
             convert_columns={"유량": "토출량"}
         )
 
     # Total 탭 (Series 무관하게 전체 비교)
     with tabs[0]:
         st.subheader("📗 Total Comparison View")
-        ref_df = pd.read_excel(uploaded_file, sheet_name="reference data")
-        cat_df = pd.read_excel(uploaded_file, sheet_name="catalog data")
-        dev_df = pd.read_excel(uploaded_file, sheet_name="deviation data")
+        ref_df = frames["reference data"].copy()
+        cat_df = frames["catalog data"]
+        dev_df = frames["deviation data"]
 
         cat_df = cat_df.rename(columns={"유량": "토출량", "토출양정&전양정": "토출양정"})
         dev_df = dev_df.rename(columns={"유량": "토출량"})
@@ -98,18 +101,12 @@ if uploaded_file:
         selected_models = st.multiselect("모델 선택", models, default=models[:5])
         sources = st.multiselect("데이터 종류 선택", ['Reference', 'Catalog', 'Deviation'], default=['Reference'])
 
-        df_filtered = combined[(combined['Model'].isin(selected_models)) &
-                               (combined['source'].isin(sources))]
+        with perf.stage("filter"):
+            df_filtered = combined[(combined['Model'].isin(selected_models)) &
+                                   (combined['source'].isin(sources))]
 
         st.dataframe(df_filtered, use_container_width=True, height=300)
         if not df_filtered.empty:
-            fig = go.Figure()
-            for model in selected_models:
-                for src in sources:
-                    temp = df_filtered[(df_filtered['Model'] == model) & (df_filtered['source'] == src)]
-                    fig.add_trace(go.Scatter(x=temp['토출량'], y=temp['토출양정'],
-                                             mode='lines+markers', name=f"{model} ({src})"))
-            fig.update_layout(xaxis_title="Capacity", yaxis_title="Total Head",
-                              hovermode='closest', height=600)
-            st.plotly_chart(fig, use_container_width=True)
+            plot_curves([(m, src, f"{m} ({src})") for m in selected_models for src in sources], key="total")
 
+perf.sidebar_panel(perf_rec)
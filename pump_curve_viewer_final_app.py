@@ -1,34 +1,36 @@
 
 import streamlit as st
-import pandas as pd
 import plotly.graph_objects as go
+from pumpcurve import perf, viewer, workbook_cache, writeback
+from pumpcurve.curve_store import CurveStore
+from pumpcurve.editor_diff import IncrementalCache
 
 st.set_page_config(layout="wide")
+perf_rec = perf.session_recorder(st.session_state, "final_app")
 st.title("📊 펌프 성능 곡선 뷰어 (인터랙티브 완성형)")
 
 uploaded_file = st.file_uploader("Excel 파일 업로드 (.xlsx 또는 .xlsm)", type=["xlsx", "xlsm"])
 if uploaded_file:
     try:
-        df = pd.read_excel(uploaded_file, sheet_name="reference data")
-        df.columns = df.columns.str.strip()
+        with perf.stage("excel_load"):
+            # 업로드 내용 해시 (이름/크기가 같은 다른 파일도 구분)
+            digest = workbook_cache.content_hash(uploaded_file.getvalue())
+            df = workbook_cache.load_workbook(uploaded_file, digest=digest)["reference data"]
 
-        # 열 이름 매핑
-        df.rename(columns={
-            "토출량": "Capacity",
-            "토출양정": "Total Head",
-            "전양정": "Total Head",
-            "모델": "Model"
-        }, inplace=True)
+        # 편집 내용 저장용 원본 시트 컬럼
+        source_cols = viewer.source_columns(df.columns)
+
+        # 열 이름 매핑 + 시리즈 추출
+        df = viewer.clean_frame(df)
 
         # 필수 열 확인
         if not {"Capacity", "Total Head", "Model"}.issubset(df.columns):
             st.error("필수 열(Capacity, Total Head, Model)이 누락되었습니다.")
         else:
-            df["Series"] = df["Model"].str.extract(r"(XRF\d+)", expand=False)
-
             # 데이터 편집기
             st.subheader("📋 백데이터 편집")
-            edited_df = st.data_editor(df, num_rows="dynamic")
+            edited_df = st.data_editor(df, num_rows="dynamic", key="backdata_editor")
+            writeback.save_panel(uploaded_file, "reference data", df, "backdata_editor", source_cols)
 
             # 보조선 추가
             st.sidebar.header("📐 보조선 추가")
@@ -41,40 +43,32 @@ if uploaded_file:
                 default=sorted(edited_df["Series"].dropna().unique())
             )
 
+            # 모델 하나의 트레이스 (편집 내역 기준으로 바뀐 모델만 다시 생성)
+            def build_model(model, subset):
+                q, h, _ = CurveStore.from_frame(subset).curve("data", str(model))
+                return subset["Series"].iloc[0], viewer.labelled_trace(
+                    model, q, h, hovertemplate="Model: %{text}<br>Capacity: %{x} L/min<br>Head: %{y} m")
+
+            cache = st.session_state.setdefault("trace_cache", IncrementalCache())
+            with perf.stage("traces"):
+                entries = cache.update(digest, df, edited_df,
+                                       st.session_state.get("backdata_editor"), "Model", build_model)
+
             fig = go.Figure()
 
-            for model in edited_df["Model"].unique():
-                subset = edited_df[edited_df["Model"] == model]
-                if subset["Series"].iloc[0] not in selected_series:
+            for model, (series, trace) in entries:
+                if series not in selected_series:
                     continue
-                fig.add_trace(go.Scatter(
-                    x=subset["Capacity"],
-                    y=subset["Total Head"],
-                    mode="lines+markers+text",
-                    name=model,
-                    text=[model] + [""] * (len(subset) - 1),
-                    textposition="top left",
-                    hovertemplate="Model: %{text}<br>Capacity: %{x} L/min<br>Head: %{y} m"
-                ))
+                fig.add_trace(trace)
 
             # 보조선 추가
-            if x_line > 0:
-                fig.add_vline(x=x_line, line_width=2, line_dash="dash", line_color="red")
-            if y_line > 0:
-                fig.add_hline(y=y_line, line_width=2, line_dash="dash", line_color="blue")
-
-            fig.update_layout(
-                xaxis_title="Capacity (L/min)",
-                yaxis_title="Total Head (m)",
-                height=900,
-                width=1500,
-                hovermode="closest",
-                showlegend=True
-            )
-            fig.update_xaxes(showgrid=True)
-            fig.update_yaxes(showgrid=True)
+            viewer.add_guide_lines(fig, x_line, y_line)
+            viewer.curve_layout(fig)
 
             st.subheader("📈 성능 곡선 시각화")
-            st.plotly_chart(fig, use_container_width=True)
+            with perf.stage("plotly_chart"):
+                st.plotly_chart(fig, use_container_width=True)
     except Exception as e:
         st.error(f"오류 발생: {e}")
+
+perf.sidebar_panel(perf_rec)
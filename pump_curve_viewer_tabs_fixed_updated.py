@@ -1,45 +1,193 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objs as go
+from pumpcurve import (combination, curve_store, efficiency, figure_cache, fitting, perf, plotting, selection,
+                       system_curve, viewer, workbook_cache)
+from pumpcurve.curve_store import COLUMN_CANDIDATES, SERIES_ORDER, match_column
 
 st.set_page_config(page_title="Dooch XRL(F) 성능 곡선 뷰어", layout="wide")
+perf_rec = perf.session_recorder(st.session_state, "tabs_fixed_updated")
 st.title("📊 Dooch XRL(F) 성능 곡선 뷰어")
 
-uploaded_file = st.file_uploader("Excel 파일 업로드 (.xlsx 또는 .xlsm)", type=["xlsx", "xlsm"])
+uploaded_files = st.file_uploader("Excel 파일 업로드 (.xlsx 또는 .xlsm, 여러 개 선택 시 Total 탭에서 비교)",
+                                  type=["xlsx", "xlsm"], accept_multiple_files=True)
 
-# 고정된 시리즈 순서
-SERIES_ORDER = [
-    "XRF3", "XRF5", "XRF10", "XRF15", "XRF20", "XRF32",
-    "XRF45", "XRF64", "XRF95", "XRF125", "XRF155", "XRF185",
-    "XRF215", "XRF255"
-]
+# 업로드 파일 내용 해시 (업로드 id 당 한 번만 계산)
+def upload_digest(f):
+    digests = st.session_state.setdefault("upload_digests", {})
+    if f.file_id not in digests:
+        digests[f.file_id] = workbook_cache.content_hash(f.getvalue())
+    return digests[f.file_id]
 
-# 컬럼 명 자동 매칭
-def get_best_match_column(df, names):
-    for n in names:
-        for col in df.columns:
-            if n in col:
-                return col
-    return None
+# 업로드 파일 라벨 (같은 이름이 여러 개면 업로드 순번을 붙여 구분)
+def upload_labels(files):
+    names = [f.name for f in files]
+    return [f"{name} ({i + 1})" if names.count(name) > 1 else name for i, name in enumerate(names)]
+
+# 해시 기준 시트 묶음 (rerun 마다 다시 읽지 않도록 메모리 캐시, 없으면 Parquet 캐시/엑셀에서 로드)
+@perf.cached(st.cache_data(show_spinner=False, max_entries=16))
+def load_upload(digest, _data):
+    return workbook_cache.load_workbook(_data, digest=digest)
+
+# 업로드 파일 해시 기준으로 워크북을 한 번만 파싱
+# 아직 Parquet 캐시에 없는 파일만 프로세스 풀에서 동시에 파싱하고 끝나는 대로 표시
+@perf.timed("excel_load")
+def load_workbooks():
+    uploads = [(label, f, upload_digest(f)) for label, f in zip(upload_labels(uploaded_files), uploaded_files)]
+    errors = st.session_state.setdefault("workbook_errors", {})
+    new = [(label, f) for label, f, digest in uploads
+           if digest not in errors and not workbook_cache.is_cached(digest)]
+    if new:
+        with st.status(f"워크북 {len(new)}개 로드 중...", expanded=False) as status:
+            for label, digest, _, error in workbook_cache.iter_workbooks(new):
+                if error:
+                    errors[digest] = error
+                    status.write(f"❌ {label}: {error}")
+                else:
+                    status.write(f"✅ {label}")
+            status.update(label=f"워크북 {len(new)}개 로드 완료", state="complete")
+    # 업로드 순서 유지 (첫 파일이 기준)
+    loaded = {}
+    for label, f, digest in uploads:
+        if digest in errors:
+            st.warning(f"❌ {label}: {errors[digest]}")
+            loaded[label] = (digest, {})
+        else:
+            loaded[label] = (digest, load_upload(digest, f))
+    return loaded
+
+# 세 시트를 정렬된 곡선 저장소로 변환 (파일 해시당 한 번)
+@perf.cached(st.cache_resource(show_spinner=False))
+def load_curve_store(digest, _frames):
+    return curve_store.CurveStore.from_frames(
+        {name: _frames.get(name) for name in workbook_cache.SHEETS})
+
+# 전체 모델 Q-H / Q-kW 곡선 피팅 (파일 해시 기준 디스크 캐시)
+@perf.cached(st.cache_resource(show_spinner=False))
+def load_fits(digest, _store):
+    return fitting.load_or_fit(_store, digest)
+
+# 모델별 효율/BEP 요약 (파일 해시 기준 디스크 캐시)
+@perf.cached(st.cache_resource(show_spinner=False))
+def load_efficiency(digest, _store, _fits):
+    return efficiency.load_or_summarize(_store, _fits, digest)
+
+# 운전점 검색 인덱스 (reference 피팅 곡선 기준, BEP 는 효율 요약에서)
+@perf.cached(st.cache_resource(show_spinner=False))
+def load_duty_index(digest, _fits, _summary):
+    return selection.DutyIndex(_fits, summary=_summary)
+
+# 선택 모델의 BEP 점 (source 당 트레이스 하나)
+def add_bep_markers(fig, summary, source, ycol, models):
+    bep = efficiency.select(summary, source).reindex(models).dropna(subset=["q_bep"])
+    if bep.empty:
+        return
+    fig.add_trace(go.Scatter(
+        x=bep["q_bep"], y=bep["h_bep" if ycol == "h" else "kw_bep"],
+        customdata=bep["eta_bep"] * 100,
+        text=bep.index,
+        mode="markers",
+        name=f"BEP ({source.split()[0].title()})",
+        marker=dict(symbol="diamond", size=10),
+        hovertemplate="%{text}<br>BEP: %{x:.1f} L/min<br>η = %{customdata:.1f}%<extra></extra>",
+    ))
+
+# 병렬/직렬 합성 곡선 ((모델, 구성, 대수) 별 캐시)
+@perf.cached(st.cache_data(show_spinner=False))
+def load_combination(digest, models, topology, count, mixed, _index):
+    return combination.build(_index, list(models), topology, count, mixed)
+
+# 다중 펌프 구성 입력, 합성 곡선 (라벨, Q, H, kW) 반환
+def render_combination(index, models, prefix):
+    with st.expander("🔗 다중 펌프 구성 (병렬/직렬)"):
+        c1, c2, c3 = st.columns(3)
+        topology = c1.radio("구성", ["없음"] + list(combination.TOPOLOGIES.values()), horizontal=True,
+                            key=prefix+"_topology")
+        count = c2.number_input("대수", value=2, min_value=1, max_value=10, step=1, key=prefix+"_count")
+        mixed = c3.checkbox("선택 모델 혼합 구성", help="선택한 모델을 각 대수만큼 한 세트로 합성",
+                            key=prefix+"_mixed")
+        if topology == "없음" or not models:
+            return None
+        key = {v: k for k, v in combination.TOPOLOGIES.items()}[topology]
+        result = load_combination(digest, tuple(models), key, int(count), mixed, index)
+        if not np.isfinite(result[1]).any():
+            st.warning(f"{topology} 합성 곡선을 만들 수 없습니다 (선택 모델의 공통 유량 범위 없음).")
+            return None
+        return key, result
+
+# 운전점 기반 모델 선정 패널
+def render_duty_search(index, prefix):
+    with st.expander("🎯 운전점 기반 모델 선정"):
+        c1, c2, c3, c4 = st.columns(4)
+        dq = c1.number_input("요구 토출량 Q", value=0.0, step=10.0, key=prefix+"_dq")
+        dh = c2.number_input("요구 양정 H", value=0.0, step=1.0, key=prefix+"_dh")
+        tol = c3.number_input("허용 오차 (%)", value=5.0, min_value=0.5, step=0.5, key=prefix+"_tol")
+        top_k = c4.number_input("상위 개수", value=10, min_value=1, step=1, key=prefix+"_topk")
+        under = st.checkbox("요구 양정 미달 허용", key=prefix+"_under")
+        if dq <= 0 or dh <= 0:
+            st.caption("요구 운전점(Q, H)을 입력하세요.")
+            return None
+        result = index.query(dq, dh, tol=tol / 100, top_k=int(top_k), allow_under=under)
+        if result.empty:
+            st.warning("조건을 만족하는 모델이 없습니다.")
+        else:
+            st.dataframe(result, use_container_width=True, hide_index=True)
+        return dq, dh
+
+# 시스템 곡선 입력 + 선택 모델 운전점 (Q, H, kW, η)
+def render_system_curves(index, models, prefix):
+    with st.expander("🔧 시스템 곡선 / 운전점"):
+        st.caption("시스템 곡선 H = Hs + k·Q² (k 는 설계점 Q, H 로 계산), 행을 추가하면 여러 곡선을 비교")
+        table = st.data_editor(
+            pd.DataFrame({"정압 Hs (m)": [0.0], "설계 Q (L/min)": [0.0], "설계 H (m)": [0.0]}),
+            num_rows="dynamic", use_container_width=True, key=prefix+"_systems")
+        table = table.dropna()
+        systems = pd.DataFrame({
+            "h_static": table["정압 Hs (m)"].to_numpy(dtype=float),
+            "k": system_curve.k_from_duty(table["정압 Hs (m)"], table["설계 Q (L/min)"], table["설계 H (m)"]),
+        })
+        systems = systems[systems["k"] > 0].reset_index(drop=True)
+        systems["label"] = [f"System {i + 1}" for i in range(len(systems))]
+        if systems.empty or not models:
+            st.caption("설계점과 모델을 입력하면 운전점을 계산합니다.")
+            return None, systems
+        ops = system_curve.operating_points(index, systems, models, systems["label"])
+        st.dataframe(ops, use_container_width=True, hide_index=True)
+        return ops, systems
+
+# 운전점 표시 (시스템 곡선당 트레이스 하나)
+def add_operating_points(fig, ops, ycol):
+    col = "H (m)" if ycol == "h" else "축동력 (kW)"
+    for label, part in ops.dropna(subset=["Q (L/min)"]).groupby("시스템", sort=False):
+        fig.add_trace(go.Scatter(
+            x=part["Q (L/min)"], y=part[col],
+            customdata=part["효율 (%)"],
+            text=part["모델"],
+            mode="markers",
+            name=f"운전점 ({label})",
+            marker=dict(symbol="x", size=11),
+            hovertemplate="%{text}<br>Q = %{x:.1f} L/min<br>%{y:.2f}<br>η = %{customdata:.1f}%<extra></extra>",
+        ))
 
 # 시트 로드 및 전처리
-def load_sheet(name):
-    try:
-        df = pd.read_excel(uploaded_file, sheet_name=name)
-    except Exception:
+@perf.timed("normalize")
+def load_sheet(frames, name):
+    df = frames.get(name)
+    if df is None:
         return None, None, None, None, pd.DataFrame()
-    mcol = get_best_match_column(df, ["모델명","모델","Model"])
-    qcol = get_best_match_column(df, ["토출량","유량"])
-    hcol = get_best_match_column(df, ["토출양정","전양정"])
-    kcol = get_best_match_column(df, ["축동력"])
+    df = df.copy()
+    # 곡선 저장소와 같은 컬럼 후보 사용
+    mcol, qcol, hcol, kcol = (match_column(df, COLUMN_CANDIDATES[k]) for k in ("model", "q", "h", "kw"))
     if not mcol or not qcol or not hcol:
         return None, None, None, None, pd.DataFrame()
-    df['Series'] = df[mcol].astype(str).str.extract(r"(XRF\d+)")
+    df['Series'] = curve_store.extract_series(df[mcol]).to_numpy()
     df['Series'] = pd.Categorical(df['Series'], categories=SERIES_ORDER, ordered=True)
     df = df.sort_values('Series')
     return mcol, qcol, hcol, kcol, df
 
 # 필터 UI
+@perf.timed("filter")
 def render_filters(df, mcol, prefix):
     mode = st.radio("분류 기준", ["시리즈별","모델별"], key=prefix+"_mode")
     if mode == "시리즈별":
@@ -52,57 +200,86 @@ def render_filters(df, mcol, prefix):
         df_f = df[df[mcol].isin(sel)] if sel else pd.DataFrame()
     return df_f
 
-# 트레이스 추가
-def add_traces(fig, df, mcol, xcol, ycol, models, mode, line_style=None, marker_style=None):
+# 트레이스 추가 (모델별 곡선은 store 의 오프셋 슬라이스)
+# 일괄 모드: source 당 Scattergl 하나로 묶어서 추가
+# tag: 비교 파일 이름 (트레이스 이름 뒤에 표시)
+@perf.timed("traces")
+def add_traces(fig, store, source, ycol, models, mode, line_style=None, marker_style=None, tag=None):
+    suffix = f" [{tag}]" if tag else ""
+    if batched or len(models) > plotting.BATCH_THRESHOLD:
+        fig.add_trace(plotting.batched_trace(
+            store, source, ycol, models, name=source.split()[0].title() + suffix, mode=mode,
+            line=line_style, marker=marker_style))
+        return
+    y_all = store.field(ycol)
     for m in models:
-        sub = df[df[mcol]==m].sort_values(xcol)
+        sl = store.slice(source, m)
         fig.add_trace(go.Scatter(
-            x=sub[xcol], y=sub[ycol],
+            x=store.q[sl], y=y_all[sl],
             mode=mode,
-            name=m,
+            name=m + suffix,
             line=line_style or {},
             marker=marker_style or {}
         ))
 
-# 보조선 추가
-def add_guides(fig, hline, vline):
-    if hline is not None:
-        fig.add_shape(type="line", xref="paper", x0=0, x1=1, yref="y", y0=hline, y1=hline,
-                      line=dict(color="red", dash="dash"))
-    if vline is not None:
-        fig.add_shape(type="line", xref="x", x0=vline, x1=vline, yref="paper", y0=0, y1=1,
-                      line=dict(color="blue", dash="dash"))
+# 완성된 그림 캐시 (세션 간 공유, LRU + 크기 상한 PUMP_FIGURE_CACHE_MB)
+@st.cache_resource(show_spinner=False)
+def load_figure_cache():
+    return figure_cache.FigureCache()
 
 # Plot 설정 (줌/팬 강제)
-def render_chart(fig, key):
-    fig.update_layout(
-        dragmode='pan',
-        xaxis=dict(fixedrange=False),
-        yaxis=dict(fixedrange=False)
-    )
-    config = {
-        'scrollZoom': True,
-        'modeBarButtonsToAdd': ['zoom2d', 'pan2d'],
-        'displaylogo': False
-    }
-    st.plotly_chart(fig, use_container_width=True, config=config, key=key)
-
-if uploaded_file:
+# parts: 그림을 결정하는 값 (파일 해시, 선택 모델, 표시 옵션 ...), 같으면 build() 없이 캐시된 그림 사용
+def render_chart(build, key, parts):
+    fig = figures.figure(figure_cache.figure_key(key, *parts), lambda: viewer.enable_pan_zoom(build()))
+    with perf.stage("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True, config=viewer.CHART_CONFIG, key=key)
+
+figures = load_figure_cache()
+
+if uploaded_files:
+    workbooks = load_workbooks()
+    primary = next(iter(workbooks))
+    digest, frames = workbooks[primary]
+    store = load_curve_store(digest, frames)
+    batched = st.sidebar.checkbox("⚡ WebGL 일괄 렌더링", value=False,
+                                  help=f"모델 {plotting.BATCH_THRESHOLD}개 초과 선택 시 자동 적용")
+    sheets = {name: load_sheet(frames, name) for name in workbook_cache.SHEETS}
     tabs = st.tabs(["Total","Reference","Catalog","Deviation"])
 
     with tabs[0]:  # Total 탭
         st.subheader("📊 Total - 통합 곡선 분석")
         # 데이터 로드
-        m_r,q_r,h_r,k_r,df_r = load_sheet("reference data")
-        m_c,q_c,h_c,k_c,df_c = load_sheet("catalog data")
-        m_d,q_d,h_d,k_d,df_d = load_sheet("deviation data")
+        m_r,q_r,h_r,k_r,df_r = sheets["reference data"]
         # 필터
         df_f = render_filters(df_r, m_r, "total")
         models = df_f[m_r].unique().tolist() if not df_f.empty else []
+        # 운전점 검색
+        fits = load_fits(digest, store)
+        eff = load_efficiency(digest, store, fits)
+        index = load_duty_index(digest, fits, eff)
+        duty = render_duty_search(index, "total")
+        # 시스템 곡선 운전점
+        ops, systems = render_system_curves(index, models, "total")
+        # 병렬/직렬 합성 곡선
+        combo = render_combination(index, models, "total")
         # 체크박스
         ref_show = st.checkbox("Reference 표시", key="total_ref")
         cat_show = st.checkbox("Catalog 표시", key="total_cat")
         dev_show = st.checkbox("Deviation 표시", key="total_dev")
+        bep_show = st.checkbox("BEP 표시", key="total_bep")
+        bep_sources = [src for src, show in (("reference data", ref_show), ("catalog data", cat_show))
+                       if show and bep_show]
+        shown = [(src, mode, style) for src, show, mode, style in (
+            ("reference data", ref_show, 'lines+markers', None),
+            ("catalog data", cat_show, 'lines+markers', dict(dash='dot')),
+            ("deviation data", dev_show, 'markers', None)) if show]
+        # 다른 업로드 파일 겹쳐 보기 (파일 이름으로 구분)
+        overlays = []
+        if len(workbooks) > 1:
+            others = [label for label in workbooks if label != primary]
+            for label in st.multiselect(f"비교 파일 (기준: {primary})", others, default=others, key="total_files"):
+                other = load_curve_store(*workbooks[label])
+                overlays.append((label, other, [m for m in models if other.model_code(m) >= 0]))
         # 보조선 입력
         col1, col2 = st.columns(2)
         with col1:
@@ -111,52 +288,93 @@ if uploaded_file:
         with col2:
             hk = st.number_input("Q-kW 수평선", key="total_hk")
             vk = st.number_input("Q-kW 수직선", key="total_vk")
+        # 그림 캐시 키 (운전점/합성 곡선은 파일 해시 + 선택 모델 + 입력값으로 결정됨)
+        total_parts = (
+            digest, batched, tuple(models), tuple(shown), tuple(bep_sources),
+            tuple((label, workbooks[label][0], tuple(other_models)) for label, _, other_models in overlays),
+            (combo[0], tuple(combo[1][0])) if combo else None,
+            systems[["h_static", "k"]].to_numpy().tolist() if ops is not None else None,
+            duty,
+        )
         # Q-H 그래프
         st.markdown("#### Q-H (토출량-토출양정)")
-        fig_h = go.Figure()
-        if ref_show:
-            add_traces(fig_h, df_r, m_r, q_r, h_r, models, 'lines+markers')
-        if cat_show:
-            add_traces(fig_h, df_c, m_c, q_c, h_c, models, 'lines+markers', line_style=dict(dash='dot'))
-        if dev_show:
-            add_traces(fig_h, df_d, m_d, q_d, h_d, models, 'markers')
-        add_guides(fig_h, hh, vh)
-        render_chart(fig_h, key="total_qh")
+        def build_total_h():
+            fig_h = go.Figure()
+            for src, mode, style in shown:
+                add_traces(fig_h, store, src, "h", models, mode, line_style=style)
+                for label, other, other_models in overlays:
+                    add_traces(fig_h, other, src, "h", other_models, mode, line_style=style, tag=label)
+            for src in bep_sources:
+                add_bep_markers(fig_h, eff, src, "h", models)
+            if combo:
+                topology, (labels, cq, ch, ckw) = combo
+                fig_h.add_trace(plotting.family_trace(cq, ch, labels, combination.TOPOLOGIES[topology], "h",
+                                                      line=dict(width=3)))
+            if ops is not None:
+                pos = pd.Index(index.models).get_indexer(models)
+                q_end = float(index.q_max[pos[pos >= 0]].max()) if (pos >= 0).any() else 0.0
+                for row in systems.itertuples():
+                    viewer.add_system_curve(fig_h, row.h_static, row.k, q_end, name=row.label)
+                add_operating_points(fig_h, ops, "h")
+            viewer.add_guides(fig_h, hh, vh)
+            if duty:
+                fig_h.add_trace(go.Scatter(x=[duty[0]], y=[duty[1]], mode="markers", name="운전점",
+                                           marker=dict(symbol="star", size=14, color="red")))
+            return fig_h
+        render_chart(build_total_h, "total_qh", total_parts + (hh, vh))
         # Q-kW 그래프
         st.markdown("#### Q-kW (토출량-축동력)")
-        fig_k = go.Figure()
-        if ref_show:
-            add_traces(fig_k, df_r, m_r, q_r, k_r, models, 'lines+markers')
-        if cat_show:
-            add_traces(fig_k, df_c, m_c, q_c, k_c, models, 'lines+markers', line_style=dict(dash='dot'))
-        if dev_show:
-            add_traces(fig_k, df_d, m_d, q_d, k_d, models, 'markers')
-        add_guides(fig_k, hk, vk)
-        render_chart(fig_k, key="total_qk")
+        def build_total_k():
+            fig_k = go.Figure()
+            for src, mode, style in shown:
+                add_traces(fig_k, store, src, "kw", models, mode, line_style=style)
+                for label, other, other_models in overlays:
+                    add_traces(fig_k, other, src, "kw", other_models, mode, line_style=style, tag=label)
+            for src in bep_sources:
+                add_bep_markers(fig_k, eff, src, "kw", models)
+            if combo:
+                topology, (labels, cq, ch, ckw) = combo
+                fig_k.add_trace(plotting.family_trace(cq, ckw, labels, combination.TOPOLOGIES[topology], "kw",
+                                                      line=dict(width=3)))
+            if ops is not None:
+                add_operating_points(fig_k, ops, "kw")
+            viewer.add_guides(fig_k, hk, vk)
+            return fig_k
+        render_chart(build_total_k, "total_qk", total_parts + (hk, vk))
+        # 피팅 결과
+        with st.expander("📐 곡선 피팅 계수 (2차, x = Q / q_scale)"):
+            st.dataframe(fits[fits["model"].isin(models)], use_container_width=True)
+        # 효율 / BEP 요약 (η = ρgQH / P)
+        with st.expander("⚙️ 효율 / BEP 요약"):
+            st.dataframe(eff[eff["model"].isin(models)], use_container_width=True, hide_index=True)
 
     # 개별 탭들
     for idx, sheet in enumerate(["reference data","catalog data","deviation data"]):
         with tabs[idx+1]:
             st.subheader(sheet.title())
-            mcol,qcol,hcol,kcol,df = load_sheet(sheet)
+            mcol,qcol,hcol,kcol,df = sheets[sheet]
             df_f = render_filters(df, mcol, sheet)
             models = df_f[mcol].unique().tolist() if not df_f.empty else []
             if not models:
                 st.info("모델을 선택해주세요.")
                 continue
-            # Q-H
-            st.markdown("#### Q-H (토출량-토출양정)")
-            fig1 = go.Figure()
             mode1 = 'markers' if sheet=='deviation data' else 'lines+markers'
             style1 = dict(dash='dot') if sheet=='catalog data' else None
-            add_traces(fig1, df_f, mcol, qcol, hcol, models, mode1, line_style=style1)
-            render_chart(fig1, key=f"{sheet}_qh")
+            # 시트 그림 (source 와 선택 모델이 같으면 캐시된 JSON 사용)
+            def build_sheet(ycol):
+                fig = go.Figure()
+                add_traces(fig, store, sheet, ycol, models, mode1, line_style=style1)
+                return fig
+            sheet_parts = (digest, batched, sheet, tuple(models))
+            # Q-H
+            st.markdown("#### Q-H (토출량-토출양정)")
+            render_chart(lambda: build_sheet("h"), f"{sheet}_qh", sheet_parts)
             # Q-kW
             if kcol:
                 st.markdown("#### Q-kW (토출량-축동력)")
-                fig2 = go.Figure()
-                add_traces(fig2, df_f, mcol, qcol, kcol, models, mode1, line_style=style1)
-                render_chart(fig2, key=f"{sheet}_qk")
+                render_chart(lambda: build_sheet("kw"), f"{sheet}_qk", sheet_parts)
             # 데이터 테이블
             st.markdown("#### 데이터 확인")
             st.dataframe(df_f, use_container_width=True, height=300, key=f"df_{sheet}")
+
+perf.sidebar_panel(perf_rec, caches=[figures])
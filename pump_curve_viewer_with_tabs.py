@@ -2,32 +2,36 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
+from pumpcurve import perf, plotting, viewer, workbook_cache, writeback
+from pumpcurve.curve_store import CurveStore
 
 st.set_page_config(layout="wide")
+perf_rec = perf.session_recorder(st.session_state, "with_tabs")
 st.title("📊 펌프 성능 곡선 뷰어 (인터랙티브 완성형)")
 
 uploaded_file = st.file_uploader("Excel 파일 업로드 (.xlsx 또는 .xlsm)", type=["xlsx", "xlsm"])
 
 if uploaded_file:
     try:
-        sheets = pd.read_excel(uploaded_file, sheet_name=None)
+        with perf.stage("excel_load"):
+            sheets = workbook_cache.load_workbook(uploaded_file)
         ref_df = sheets.get("reference data")
         cat_df = sheets.get("catalog data")
         dev_df = sheets.get("deviation data")
 
-        def clean_df(df):
-            df.columns = df.columns.str.strip()
-            df = df.rename(columns={
-                "토출양정": "Total Head",
-                "토출량": "Capacity",
-                "모델": "Model"
-            })
-            df["Series"] = df["Model"].str.extract(r"(XRF\d+)", expand=False)
-            return df
+        # 편집 내용 저장용 원본 시트 컬럼
+        ref_cols = viewer.source_columns(ref_df.columns) if ref_df is not None else {}
 
-        ref_df = clean_df(ref_df) if ref_df is not None else pd.DataFrame()
-        cat_df = clean_df(cat_df) if cat_df is not None else pd.DataFrame()
-        dev_df = clean_df(dev_df) if dev_df is not None else pd.DataFrame()
+        with perf.stage("normalize"):
+            ref_df = viewer.clean_frame(ref_df) if ref_df is not None else pd.DataFrame()
+            cat_df = viewer.clean_frame(cat_df) if cat_df is not None else pd.DataFrame()
+            dev_df = viewer.clean_frame(dev_df) if dev_df is not None else pd.DataFrame()
+
+            # 세 시트를 (source, 모델, Q) 순 정렬 배열로 한 번만 변환
+            store = CurveStore.from_frames({"Reference": ref_df, "Catalog": cat_df, "Deviation": dev_df})
+
+        batched = st.sidebar.checkbox("⚡ WebGL 일괄 렌더링", value=False,
+                                      help=f"모델 {plotting.BATCH_THRESHOLD}개 초과 선택 시 자동 적용")
 
         tab1, tab2, tab3, tab4 = st.tabs(["📊 Total", "📋 Reference", "📘 Catalog", "📐 Deviation"])
 
@@ -44,32 +48,22 @@ if uploaded_file:
             y_line = st.number_input("수평 보조선 (Head)", value=0.0, step=5.0)
 
             fig_ref = go.Figure()
-            for model in ref_df["Model"].unique():
-                subset = ref_df[ref_df["Model"] == model]
-                if subset.empty or subset["Series"].iloc[0] not in selected_series:
-                    continue
-                fig_ref.add_trace(go.Scatter(
-                    x=subset["Capacity"],
-                    y=subset["Total Head"],
-                    mode="lines+markers+text",
-                    name=model,
-                    text=[model] + [""] * (len(subset) - 1),
-                    textposition="top left"
-                ))
-            if x_line > 0:
-                fig_ref.add_vline(x=x_line, line_width=2, line_dash="dash", line_color="red")
-            if y_line > 0:
-                fig_ref.add_hline(y=y_line, line_width=2, line_dash="dash", line_color="blue")
-            fig_ref.update_layout(
-                xaxis_title="Capacity (L/min)", yaxis_title="Total Head (m)",
-                height=900, width=1500, hovermode="closest", showlegend=True
-            )
-            fig_ref.update_xaxes(showgrid=True)
-            fig_ref.update_yaxes(showgrid=True)
-            st.plotly_chart(fig_ref, use_container_width=True)
+            with perf.stage("traces"):
+                ref_models = store.models_in_series(selected_series, "Reference")
+                if batched or len(ref_models) > plotting.BATCH_THRESHOLD:
+                    fig_ref.add_trace(plotting.batched_trace(store, "Reference", "h", ref_models))
+                    ref_models = []
+                for model in ref_models:
+                    q, h, _ = store.curve("Reference", model)
+                    fig_ref.add_trace(viewer.labelled_trace(model, q, h))
+            viewer.add_guide_lines(fig_ref, x_line, y_line)
+            viewer.curve_layout(fig_ref)
+            with perf.stage("plotly_chart"):
+                st.plotly_chart(fig_ref, use_container_width=True, key="ref_chart")
 
             st.subheader("📝 백데이터 편집")
-            st.data_editor(ref_df, num_rows="dynamic")
+            st.data_editor(ref_df, num_rows="dynamic", key="ref_editor")
+            writeback.save_panel(uploaded_file, "reference data", ref_df, "ref_editor", ref_cols)
 
         # ===== Total Tab =====
         with tab1:
@@ -84,29 +78,21 @@ if uploaded_file:
             fig_total = go.Figure()
             sources = [("Reference", ref_df, show_ref), ("Catalog", cat_df, show_cat), ("Deviation", dev_df, show_dev)]
 
-            for label, df_src, show in sources:
-                if not show or df_src.empty:
-                    continue
-                for model in df_src["Model"].unique():
-                    if model not in selected_models:
+            with perf.stage("traces"):
+                for label, df_src, show in sources:
+                    if not show or df_src.empty:
                         continue
-                    subset = df_src[df_src["Model"] == model]
-                    if subset.empty:
+                    if batched or len(selected_models) > plotting.BATCH_THRESHOLD:
+                        fig_total.add_trace(plotting.batched_trace(store, label, "h", selected_models, name=label))
                         continue
-                    fig_total.add_trace(go.Scatter(
-                        x=subset["Capacity"],
-                        y=subset["Total Head"],
-                        mode="lines+markers",
-                        name=f"{model} ({label})"
-                    ))
-
-            fig_total.update_layout(
-                xaxis_title="Capacity (L/min)", yaxis_title="Total Head (m)",
-                height=900, width=1500, hovermode="closest", showlegend=True
-            )
-            fig_total.update_xaxes(showgrid=True)
-            fig_total.update_yaxes(showgrid=True)
-            st.plotly_chart(fig_total, use_container_width=True)
+                    for model in selected_models:
+                        q, h, _ = store.curve(label, model)
+                        if len(q):
+                            fig_total.add_trace(viewer.labelled_trace(model, q, h, name=f"{model} ({label})"))
+
+            viewer.curve_layout(fig_total)
+            with perf.stage("plotly_chart"):
+                st.plotly_chart(fig_total, use_container_width=True, key="total_chart")
 
         # ===== Catalog Tab =====
         with tab3:
@@ -120,3 +106,5 @@ if uploaded_file:
 
     except Exception as e:
         st.error(f"오류 발생: {e}")
+
+perf.sidebar_panel(perf_rec)
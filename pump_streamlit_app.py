@@ -1,51 +1,56 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import pymc as pm
-import arviz as az
+from pumpcurve import bayes, deviation, master_db, perf, reports
+from pumpcurve.curve_store import CurveStore
 
 # 파일 경로 설정
 MASTER_FILE = "대외비 - 성능 검토용mk2_REV0.1_closebeta0.1.xlsx.xlsm"
 SAMPLE_FILE = "3FS-XRF64-4_주_22120885_월드펌프시스템_구미확장3블럭중흥_(20230227).xlsx"
 
-@st.cache_data
-def load_master_data():
-    deviation = pd.read_excel(MASTER_FILE, sheet_name="deviation data")
-    reference = pd.read_excel(MASTER_FILE, sheet_name="reference data")
-    catalog = pd.read_excel(MASTER_FILE, sheet_name="catalog data")
-    return deviation, reference, catalog
+perf_rec = perf.session_recorder(st.session_state, "streamlit_app")
 
-@st.cache_data
+# 마스터 DB 는 프로세스당 한 번만 로드해서 모든 세션이 공유 (읽기 전용)
+# cache_data 는 세션마다 pickle 복사본을 만들기 때문에 cache_resource 사용
+@perf.cached(st.cache_resource)
+def load_master_db():
+    return master_db.MasterDB.from_workbook(MASTER_FILE)
+
+@perf.cached(st.cache_data)
 def extract_sample_data(file_path):
-    df = pd.read_excel(file_path, sheet_name="DATA SHEET", header=None)
-    cols = list(range(8, 23, 2))  # I, K, M, ..., W열
-    flow = pd.to_numeric(df.iloc[19, cols], errors='coerce')       # 20행
-    head = pd.to_numeric(df.iloc[21, cols], errors='coerce')       # 22행
-    total_head = pd.to_numeric(df.iloc[23, cols], errors='coerce') # 24행
-    power = pd.to_numeric(df.iloc[33, cols], errors='coerce')      # 34행
-    product = df.iloc[7, 6]  # 제품명
-    test_id = df.iloc[5, 18] # 시험번호
-    sample = pd.DataFrame({
-        "Flow Rate": flow,
-        "Head": head,
-        "Total Head": total_head,
-        "Shaft Power": power
-    })
-    sample["Product"] = product
-    sample["Test ID"] = test_id
-    return sample.dropna()
+    return reports.extract_report(file_path)
 
 # 데이터베이스 로드
-deviation_df, reference_df, catalog_df = load_master_data()
+master = load_master_db()
+# 파일이 수정됐으면 바뀐 시트만 다시 읽음 (mtime 확인 후 시트별 해시 비교)
+changed_sheets = master.refresh()
+if changed_sheets:
+    st.toast(f"마스터 파일 변경 감지: {', '.join(changed_sheets)} 다시 로드")
+deviation_df = master.frame("deviation data")
+reference_df = master.frame("reference data")
+catalog_df = master.frame("catalog data")
 sample_df = extract_sample_data(SAMPLE_FILE)
 
-@st.cache_data
 def get_models():
-    dev = deviation_df.get('모델명', pd.Series()).dropna().unique()
-    ref = reference_df.get('모델', pd.Series()).dropna().unique()
-    cat = catalog_df.get('모델명', pd.Series()).dropna().unique()
-    return sorted(set(list(dev) + list(ref) + list(cat)))
+    return master.models()
+
+# 전체 모델 Q-H / Q-P 켤레 사후분포 (한 번에 계산)
+def deviation_store():
+    return master.store(["deviation data"])
+
+# 캐시 키에 시트 버전을 넣어서 해당 시트가 바뀔 때만 다시 계산
+@perf.cached(st.cache_data)
+def conjugate_posteriors(version):
+    store = deviation_store()
+    post_qh = bayes.conjugate_posterior(store, "deviation data", "h").set_index("model")
+    post_qp = bayes.conjugate_posterior(store, "deviation data", "kw").set_index("model")
+    return post_qh, post_qp
+
+def master_store():
+    return master.store(["reference data", "deviation data"])
+
+# deviation data 전체 점을 기준 곡선과 한 번에 비교
+@perf.cached(st.cache_data)
+def deviation_results(grade, version):
+    return deviation.evaluate(master_store(), grade=grade)
 
 # 앱 타이틀 및 네비게이션
 st.title("펌프 성능 분석 및 시각화")
@@ -57,8 +62,10 @@ page = st.sidebar.radio("메뉴 선택", [
     "앱 소스 다운로드"
 ])
 
+# matplotlib / arviz / pymc 는 import 가 느려서 해당 페이지에서만 로드
 # 1. 실측 vs 기준 비교
 if page == "실측 vs 기준 비교":
+    import matplotlib.pyplot as plt
     model = st.selectbox("모델 선택", get_models())
     dev = deviation_df[deviation_df['모델명'] == model]
     ref = reference_df[reference_df['모델'] == model]
@@ -73,10 +80,12 @@ if page == "실측 vs 기준 비교":
     ax.set_xlabel("유량 (Q)")
     ax.set_ylabel("양정 (H)")
     ax.legend()
-    st.pyplot(fig)
+    with perf.stage("pyplot"):
+        st.pyplot(fig)
 
 # 2. 성능 이탈 감지
 elif page == "성능 이탈 감지":
+    import matplotlib.pyplot as plt
     st.write("신규 성적서 업로드 또는 기본 샘플 데이터 사용")
     uploaded = st.file_uploader("엑셀 파일 업로드", type=['xlsx','xlsm'])
     if uploaded:
@@ -94,38 +103,105 @@ elif page == "성능 이탈 감지":
     ax.set_ylabel("양정 (H)")
     ax.set_title(f"{model} 성능 이탈 검토")
     ax.legend()
-    st.pyplot(fig)
+    with perf.stage("pyplot"):
+        st.pyplot(fig)
+
+    # ISO 9906 등급 기준 합격/불합격 판정
+    grade = st.selectbox("허용 등급 (ISO 9906)", list(deviation.ISO9906_GRADES), index=1)
+    tol = deviation.ISO9906_GRADES[grade]
+    st.caption(f"양정 ±{tol['head']:.0%}, 축동력 +{tol['power']:.0%} (측정 유량에서 기준 곡선 보간값 대비)")
+    report_store = CurveStore.from_frames({
+        "reference data": reference_df,
+        "report": new_df.rename(columns=reports.DEVIATION_COLUMNS),
+    })
+    st.dataframe(deviation.evaluate(report_store, "report", grade=grade), use_container_width=True)
+
+    st.subheader("deviation data 전체 판정")
+    result = deviation_results(grade, master.version(["reference data", "deviation data"]))
+    only_fail = st.checkbox("FAIL 모델만 보기")
+    summary = deviation.summarize(result)
+    st.dataframe(summary[summary["판정"] == "FAIL"] if only_fail else summary, use_container_width=True)
+    with st.expander("측정점별 상세"):
+        st.dataframe(result, use_container_width=True)
 
 # 3. 베이지안 추정 학습
 elif page == "베이지안 추정 학습":
+    import arviz as az
+    import matplotlib.pyplot as plt
+    mode = st.radio("추정 방식", ["빠른 추정 (해석해)", "계층 모델 (시리즈 단위)", "정확 추정 (MCMC)"],
+                    horizontal=True)
     model = st.selectbox("모델 선택 (Bayesian)", deviation_df['모델명'].dropna().unique())
-    dev = deviation_df[deviation_df['모델명'] == model].dropna(subset=['유량','토출양정','축동력'])
-    st.subheader("Q-H 곡선 베이지안 추정")
-    with pm.Model() as mod_qh:
-        alpha = pm.Normal('alpha', mu=0, sigma=100)
-        beta = pm.Normal('beta', mu=0, sigma=10)
-        sigma = pm.HalfNormal('sigma', sigma=10)
-        mu = alpha + beta * dev['유량'].values
-        pm.Normal('y_obs', mu=mu, sigma=sigma, observed=dev['토출양정'].values)
-        trace_qh = pm.sample(1000, tune=1000, chains=2, target_accept=0.9)
-    fig1, ax1 = plt.subplots()
-    az.plot_posterior(trace_qh, var_names=['alpha','beta'], ax=ax1)
-    st.pyplot(fig1)
-
-    st.subheader("Q-P 곡선 베이지안 추정")
-    with pm.Model() as mod_qp:
-        a = pm.Normal('a', mu=0, sigma=100)
-        b = pm.Normal('b', mu=0, sigma=10)
-        s2 = pm.HalfNormal('s2', sigma=10)
-        mu2 = a + b * dev['유량'].values
-        pm.Normal('y2', mu=mu2, sigma=s2, observed=dev['축동력'].values)
-        trace_qp = pm.sample(1000, tune=1000, chains=2, target_accept=0.9)
-    fig2, ax2 = plt.subplots()
-    az.plot_posterior(trace_qp, var_names=['a','b'], ax=ax2)
-    st.pyplot(fig2)
+    if mode == "빠른 추정 (해석해)":
+        post_qh, post_qp = conjugate_posteriors(master.version(["deviation data"]))
+        if model not in post_qh.index:
+            st.warning("선택한 모델의 유효한 실측 데이터가 없습니다.")
+            st.stop()
+        for title, post, names in (("Q-H 곡선 베이지안 추정", post_qh, ('alpha', 'beta', 'sigma')),
+                                   ("Q-P 곡선 베이지안 추정", post_qp, ('a', 'b', 's2'))):
+            st.subheader(title)
+            row = post.loc[model]
+            st.dataframe(bayes.posterior_summary(row, names=names))
+            trace = az.from_dict(posterior=bayes.posterior_draws(row, names=names))
+            fig, axes = plt.subplots(1, 2, figsize=(10, 3.5))
+            az.plot_posterior(trace, var_names=list(names[:2]), ax=axes)
+            with perf.stage("pyplot"):
+                st.pyplot(fig)
+    elif mode == "계층 모델 (시리즈 단위)":
+        # 같은 시리즈 모델을 함께 피팅, 사후분포는 시리즈 데이터가 바뀔 때만 다시 샘플링
+        store = deviation_store()
+        series = store.series_of(str(model))
+        if not isinstance(series, str):
+            st.warning("시리즈를 알 수 없는 모델입니다.")
+            st.stop()
+        for title, field in (("Q-H 곡선 계층 베이지안 추정", "h"), ("Q-P 곡선 계층 베이지안 추정", "kw")):
+            st.subheader(f"{title} ({series})")
+            with st.spinner(f"{series} 사후분포 로드 중..."):
+                idata = bayes.load_or_fit_hierarchical(store, "deviation data", series, field)
+            if idata is None:
+                st.warning("유효한 실측 데이터가 없습니다.")
+                continue
+            var_names = ['mu_alpha', 'mu_beta', 'alpha', 'beta', 'sigma']
+            st.dataframe(az.summary(idata, var_names=var_names, coords={'model': [model]}, kind='stats'))
+            fig, axes = plt.subplots(1, 2, figsize=(10, 3.5))
+            az.plot_posterior(idata, var_names=['alpha', 'beta'], coords={'model': [model]}, ax=axes)
+            with perf.stage("pyplot"):
+                st.pyplot(fig)
+    else:
+        import pymc as pm
+        dev = deviation_df[deviation_df['모델명'] == model].dropna(subset=['유량','토출양정','축동력'])
+        st.subheader("Q-H 곡선 베이지안 추정")
+        with pm.Model() as mod_qh:
+            alpha = pm.Normal('alpha', mu=0, sigma=100)
+            beta = pm.Normal('beta', mu=0, sigma=10)
+            sigma = pm.HalfNormal('sigma', sigma=10)
+            mu = alpha + beta * dev['유량'].to_numpy(dtype=float)
+            pm.Normal('y_obs', mu=mu, sigma=sigma, observed=dev['토출양정'].to_numpy(dtype=float))
+            with perf.stage("mcmc_sample"):
+                trace_qh = pm.sample(1000, tune=1000, chains=2, target_accept=0.9)
+        st.dataframe(az.summary(trace_qh, var_names=['alpha','beta','sigma'], kind='stats'))
+        fig1, ax1 = plt.subplots()
+        az.plot_posterior(trace_qh, var_names=['alpha','beta'], ax=ax1)
+        with perf.stage("pyplot"):
+            st.pyplot(fig1)
+
+        st.subheader("Q-P 곡선 베이지안 추정")
+        with pm.Model() as mod_qp:
+            a = pm.Normal('a', mu=0, sigma=100)
+            b = pm.Normal('b', mu=0, sigma=10)
+            s2 = pm.HalfNormal('s2', sigma=10)
+            mu2 = a + b * dev['유량'].to_numpy(dtype=float)
+            pm.Normal('y2', mu=mu2, sigma=s2, observed=dev['축동력'].to_numpy(dtype=float))
+            with perf.stage("mcmc_sample"):
+                trace_qp = pm.sample(1000, tune=1000, chains=2, target_accept=0.9)
+        st.dataframe(az.summary(trace_qp, var_names=['a','b','s2'], kind='stats'))
+        fig2, ax2 = plt.subplots()
+        az.plot_posterior(trace_qp, var_names=['a','b'], ax=ax2)
+        with perf.stage("pyplot"):
+            st.pyplot(fig2)
 
 # 4. 시각화 분석
 elif page == "시각화 분석":
+    import matplotlib.pyplot as plt
     option = st.selectbox("보기 종류", ["Reference Q-H", "Reference Q-P", "Catalog Q-H", "Catalog Q-P"])
     model = st.selectbox("모델 선택", get_models())
     fig, ax = plt.subplots()
@@ -141,10 +217,13 @@ elif page == "시각화 분석":
     ax.set_xlabel("유량 (Q)")
     ax.set_ylabel("양정 (H)" if 'Q-H' in option else "축동력 (kW)")
     ax.set_title(f"{model} {option}")
-    st.pyplot(fig)
+    with perf.stage("pyplot"):
+        st.pyplot(fig)
 
 # 5. 앱 소스 다운로드
 else:
     with open(__file__, 'r') as f:
         code = f.read()
     st.download_button("앱 소스 코드 다운로드", code, file_name="pump_streamlit_app.py", mime="text/plain")
+
+perf.sidebar_panel(perf_rec)
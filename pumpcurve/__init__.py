@@ -0,0 +1 @@
+# 펌프 성능 곡선 뷰어 공용 모듈
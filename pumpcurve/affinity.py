@@ -0,0 +1,28 @@
+import numpy as np
+
+# 기본 회전수 / 임펠러 외경 비율 격자 (정격 대비)
+DEFAULT_SPEEDS = (0.6, 0.7, 0.8, 0.9, 1.0)
+DEFAULT_DIAMETERS = (1.0,)
+
+
+# 상사법칙으로 기준 곡선 하나에서 (회전수 × 외경) 격자 전체 곡선군을 한 번에 생성
+# 회전수: Q ∝ n, H ∝ n², P ∝ n³ / 임펠러 트림: Q ∝ D, H ∝ D², P ∝ D³
+# 반환 배열 shape: (회전수 수, 외경 수, 점 수)
+def family(q, h, kw, speeds=DEFAULT_SPEEDS, diameters=DEFAULT_DIAMETERS):
+    n = np.asarray(speeds, dtype=np.float64)[:, None, None]
+    d = np.asarray(diameters, dtype=np.float64)[None, :, None]
+    q = np.asarray(q, dtype=np.float64)[None, None, :]
+    h = np.asarray(h, dtype=np.float64)[None, None, :]
+    kw = np.asarray(kw, dtype=np.float64)[None, None, :]
+    r = n * d
+    return q * r, h * r ** 2, kw * r ** 3
+
+
+# 곡선군 라벨 (회전수 × 외경 순서)
+def family_labels(speeds=DEFAULT_SPEEDS, diameters=DEFAULT_DIAMETERS):
+    return [f"n {s:.0%} / D {d:.0%}" for s in speeds for d in diameters]
+
+
+# 정격 회전수(rpm) 기준 격자 -> 비율
+def speed_ratios(rated_rpm, rpms):
+    return tuple(float(r) / float(rated_rpm) for r in rpms)
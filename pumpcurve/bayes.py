@@ -0,0 +1,193 @@
+import glob
+import hashlib
+import json
+import os
+from math import lgamma
+
+import numpy as np
+import pandas as pd
+
+from pumpcurve import perf, workbook_cache
+
+# y = 절편 + 기울기·Q 선형 회귀의 Normal-Inverse-Gamma 사전분포
+# 계수 ~ N(mu, σ²·diag(sd²)), σ² ~ InvGamma(a0, b0)
+PRIOR = {"mu": (0.0, 0.0), "sd": (100.0, 10.0), "a0": 1.0, "b0": 1.0}
+
+HDI_PROB = 0.94
+
+
+# 모든 모델의 켤레 사후분포를 한 번에 계산 (store 의 오프셋 구간별 합)
+def conjugate_posterior(store, source, field, prior=None):
+    prior = {**PRIOR, **(prior or {})}
+    s = store.source_code(source)
+    present = np.flatnonzero(store.stops[s] > store.starts[s])
+    if not len(present):
+        return pd.DataFrame(columns=["model", "n", "m0", "m1", "v00", "v01", "v11", "a_n", "b_n"])
+
+    lo, hi = int(store.starts[s, present[0]]), int(store.stops[s, present[-1]])
+    seg = store.starts[s, present] - lo
+    q = store.q[lo:hi]
+    y = store.field(field)[lo:hi]
+    w = (np.isfinite(q) & np.isfinite(y)).astype(np.float64)
+    q = np.where(w > 0, q, 0.0)
+    y = np.where(w > 0, y, 0.0)
+
+    X = np.stack([w, q * w], axis=1)
+    XtX = np.add.reduceat(X[:, :, None] * X[:, None, :], seg, axis=0)
+    Xty = np.add.reduceat(X * y[:, None], seg, axis=0)
+    yty = np.add.reduceat(w * y * y, seg)
+    n = np.add.reduceat(w, seg)
+
+    mu0 = np.asarray(prior["mu"], dtype=np.float64)
+    prec0 = np.diag(1.0 / np.asarray(prior["sd"], dtype=np.float64) ** 2)
+    prec_n = prec0 + XtX
+    V_n = np.linalg.inv(prec_n)
+    m_n = np.einsum("mij,mj->mi", V_n, prec0 @ mu0 + Xty)
+    a_n = prior["a0"] + n / 2
+    b_n = prior["b0"] + 0.5 * (yty + mu0 @ prec0 @ mu0 - np.einsum("mi,mij,mj->m", m_n, prec_n, m_n))
+
+    return pd.DataFrame({
+        "model": np.asarray(store.models[present], dtype=object),
+        "n": n.astype(np.int64),
+        "m0": m_n[:, 0], "m1": m_n[:, 1],
+        "v00": V_n[:, 0, 0], "v01": V_n[:, 0, 1], "v11": V_n[:, 1, 1],
+        "a_n": a_n, "b_n": b_n,
+    })
+
+
+# 한 모델의 사후 요약 (계수는 Student-t 주변분포, σ 는 InvGamma 에서 변환)
+def posterior_summary(row, names=("alpha", "beta", "sigma"), hdi_prob=HDI_PROB):
+    from scipy import stats
+    nu = 2 * row["a_n"]
+    s2 = row["b_n"] / row["a_n"]
+    tail = (1 - hdi_prob) / 2
+    rows = []
+    for name, m, v in ((names[0], row["m0"], row["v00"]), (names[1], row["m1"], row["v11"])):
+        dist = stats.t(df=nu, loc=m, scale=np.sqrt(s2 * v))
+        rows.append((name, m, dist.std(), dist.ppf(tail), dist.ppf(1 - tail)))
+    sig2 = stats.invgamma(a=row["a_n"], scale=row["b_n"])
+    lo, hi = np.sqrt(sig2.ppf(tail)), np.sqrt(sig2.ppf(1 - tail))
+    # E[σ] = √b · Γ(a - 1/2) / Γ(a)
+    sigma_mean = np.sqrt(row["b_n"]) * np.exp(lgamma(row["a_n"] - 0.5) - lgamma(row["a_n"]))
+    sigma_sd = np.sqrt(max(sig2.mean() - sigma_mean ** 2, 0.0)) if row["a_n"] > 1 else np.nan
+    rows.append((names[2], sigma_mean, sigma_sd, lo, hi))
+    pct = int(round(tail * 100))
+    return pd.DataFrame(rows, columns=["param", "mean", "sd", f"hdi_{pct}%", f"hdi_{100 - pct}%"]).set_index("param")
+
+
+# 사후분포에서 직접 독립 표본 추출 (ArviZ 그림용)
+def posterior_draws(row, names=("alpha", "beta", "sigma"), draws=2000, chains=2, seed=0):
+    rng = np.random.default_rng(seed)
+    size = (chains, draws)
+    sig2 = row["b_n"] / rng.gamma(row["a_n"], 1.0, size=size)
+    cov = np.array([[row["v00"], row["v01"]], [row["v01"], row["v11"]]])
+    L = np.linalg.cholesky(cov)
+    z = rng.standard_normal(size + (2,)) @ L.T
+    coef = np.array([row["m0"], row["m1"]]) + z * np.sqrt(sig2)[..., None]
+    return {names[0]: coef[..., 0], names[1]: coef[..., 1], names[2]: np.sqrt(sig2)}
+
+
+# 시리즈 계층 모델 사전분포 (모델별 절편/기울기가 시리즈 평균을 공유)
+# Q, y 를 시리즈 단위로 표준화한 척도 기준 (원 단위 α/β/σ 는 Deterministic 으로 환산)
+HIER_PRIOR = {"mu_alpha_sd": 2.0, "mu_beta_sd": 2.0,
+              "tau_alpha_sd": 1.0, "tau_beta_sd": 1.0, "sigma_sd": 1.0}
+
+SAMPLE_KWARGS = {"draws": 1000, "tune": 1000, "chains": 2, "target_accept": 0.9}
+
+POSTERIOR_DIR = "posteriors"
+
+
+# 한 시리즈의 실측점 (모델 목록, 점별 모델 인덱스, Q, y)
+def series_points(store, source, series, field):
+    s = store.source_code(source)
+    models = store.models_in_series([series], source)
+    codes = np.array([store.model_code(m) for m in models], dtype=np.int64)
+    parts = [np.arange(store.starts[s, c], store.stops[s, c]) for c in codes]
+    rows = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+    idx = np.repeat(np.arange(len(codes)), [len(p) for p in parts])
+    q, y = store.q[rows], store.field(field)[rows]
+    ok = np.isfinite(q) & np.isfinite(y)
+    return models, idx[ok], q[ok], y[ok]
+
+
+# 시리즈 데이터 + 사전분포 + 샘플링 설정의 해시 (사후분포 캐시 키)
+def series_key(models, idx, q, y, prior, sample_kwargs):
+    h = hashlib.sha256()
+    h.update("\x1f".join(models).encode("utf-8"))
+    for arr in (idx.astype(np.int64), q, y):
+        h.update(np.ascontiguousarray(arr).tobytes())
+    h.update(json.dumps([prior, sample_kwargs], sort_keys=True).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+# 표준화용 (중심, 척도), 값이 모두 같으면 척도 1
+def _standardize(values):
+    scale = float(np.std(values))
+    return float(np.mean(values)), scale if scale > 0 else 1.0
+
+
+# Q 는 수천 L/min 까지 가므로 원 단위 그대로면 사전분포 척도가 맞지 않아 NUTS 가 최대 트리 깊이에 걸림
+# 표준화한 x = (Q - Q̄)/s_Q, z = (y - ȳ)/s_y 로 샘플링하고 α, β, σ, μ_α, μ_β 는 원 단위로 환산해서 저장
+def fit_hierarchical(models, idx, q, y, prior=None, sample_kwargs=None):
+    import pymc as pm
+    prior = {**HIER_PRIOR, **(prior or {})}
+    sample_kwargs = {**SAMPLE_KWARGS, **(sample_kwargs or {})}
+    q_c, q_s = _standardize(q)
+    y_c, y_s = _standardize(y)
+    x = (q - q_c) / q_s
+    z = (y - y_c) / y_s
+    with pm.Model(coords={"model": list(models)}):
+        mu_alpha_z = pm.Normal("mu_alpha_z", mu=0, sigma=prior["mu_alpha_sd"])
+        mu_beta_z = pm.Normal("mu_beta_z", mu=0, sigma=prior["mu_beta_sd"])
+        tau_alpha = pm.HalfNormal("tau_alpha_z", sigma=prior["tau_alpha_sd"])
+        tau_beta = pm.HalfNormal("tau_beta_z", sigma=prior["tau_beta_sd"])
+        # 비중심 매개화
+        z_alpha = pm.Normal("z_alpha", 0, 1, dims="model")
+        z_beta = pm.Normal("z_beta", 0, 1, dims="model")
+        alpha_z = mu_alpha_z + tau_alpha * z_alpha
+        beta_z = mu_beta_z + tau_beta * z_beta
+        sigma_z = pm.HalfNormal("sigma_z", sigma=prior["sigma_sd"])
+        pm.Normal("y_obs", mu=alpha_z[idx] + beta_z[idx] * x, sigma=sigma_z, observed=z)
+
+        # 원 단위 y = α + β·Q
+        beta = pm.Deterministic("beta", beta_z * y_s / q_s, dims="model")
+        pm.Deterministic("alpha", y_c + y_s * alpha_z - beta * q_c, dims="model")
+        mu_beta = pm.Deterministic("mu_beta", mu_beta_z * y_s / q_s)
+        pm.Deterministic("mu_alpha", y_c + y_s * mu_alpha_z - mu_beta * q_c)
+        pm.Deterministic("sigma", sigma_z * y_s)
+        return pm.sample(**sample_kwargs)
+
+
+# 시리즈 계층 모델 사후분포 - 디스크(netCDF)에 있으면 읽고, 없으면 샘플링 후 저장
+def load_or_fit_hierarchical(store, source, series, field, prior=None, sample_kwargs=None,
+                             cache_dir=None):
+    import arviz as az
+    prior = {**HIER_PRIOR, **(prior or {})}
+    sample_kwargs = {**SAMPLE_KWARGS, **(sample_kwargs or {})}
+    models, idx, q, y = series_points(store, source, series, field)
+    if not len(q):
+        return None
+    key = series_key(models, idx, q, y, prior, sample_kwargs)
+    folder = os.path.join(cache_dir or workbook_cache.CACHE_DIR, POSTERIOR_DIR)
+    prefix = f"{source.replace(' ', '_')}_{series}_{field}_"
+    path = os.path.join(folder, f"{prefix}{key}.nc")
+    if os.path.exists(path):
+        perf.current().cache_event("posterior_netcdf", hit=True)
+        return az.from_netcdf(path)
+    perf.current().cache_event("posterior_netcdf", hit=False)
+    with perf.stage("mcmc_sample"):
+        idata = fit_hierarchical(models, idx, q, y, prior, sample_kwargs)
+    os.makedirs(folder, exist_ok=True)
+    tmp = path + ".tmp"
+    idata.to_netcdf(tmp)
+    os.replace(tmp, path)
+    # 같은 (source, 시리즈, 값) 의 이전 데이터로 만든 사후분포는 다시 쓰이지 않으므로 삭제
+    # (source 가 없던 이전 이름 형식 포함)
+    for pattern in (prefix, f"{series}_{field}_"):
+        for old in glob.glob(os.path.join(glob.escape(folder), glob.escape(pattern) + "?" * len(key) + ".nc")):
+            if old != path:
+                try:
+                    os.remove(old)
+                except FileNotFoundError:
+                    pass
+    return idata
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from pumpcurve import fitting
+
+TOPOLOGIES = {"parallel": "병렬", "series": "직렬"}
+
+# 피팅 곡선 재샘플링 / 합성 곡선 점 수
+GRID_POINTS = 64
+
+
+# 선택 모델의 피팅 곡선을 (M, K) 격자로 재샘플링 (index: selection.DutyIndex)
+# 격자는 Q=0 부터 시작 (첫 실측 유량 아래는 피팅 곡선을 외삽해서 체절 양정/동력 추정)
+# 역보간을 위해 양정은 유량에 대해 비증가가 되도록 누적 최소값으로 보정
+def pump_grid(index, models, points=GRID_POINTS):
+    pos = pd.Index(index.models).get_indexer(list(models))
+    pos = pos[pos >= 0]
+    t = np.linspace(0.0, 1.0, points)
+    q_lo = np.minimum(index.q_min[pos], 0.0)
+    q = q_lo[:, None] + (index.q_max[pos] - q_lo)[:, None] * t
+    h = np.minimum.accumulate(fitting.evaluate(index.coef_h[pos], index.q_scale[pos], q), axis=1)
+    kw = fitting.evaluate(index.coef_kw[pos], index.kw_scale[pos], q)
+    return index.models[pos], q, h, kw
+
+
+# 모든 펌프 곡선에서 양정 H (T,) 일 때의 유량/축동력을 한 번에 역보간 -> (M, T)
+# 체절 양정보다 높은 H 에서는 유량 0 (체크 밸브 닫힘, 체절 동력), 최대 유량 밖은 NaN
+def inverse_flow(q, h, kw, head):
+    m, k = h.shape
+    rows = np.arange(m)[:, None]
+    i = np.clip((h[:, :, None] >= head).sum(axis=1) - 1, 0, k - 2)
+    h0, h1 = h[rows, i], h[rows, i + 1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frac = np.where(h0 > h1, (h0 - head) / (h0 - h1), 0.0)
+    frac = np.clip(frac, 0.0, 1.0)
+    flow = q[rows, i] + frac * (q[rows, i + 1] - q[rows, i])
+    power = kw[rows, i] + frac * (kw[rows, i + 1] - kw[rows, i])
+
+    shut = head > h[:, :1]
+    flow = np.where(shut, 0.0, flow)
+    power = np.where(shut, kw[:, :1], power)
+    beyond = head < h[:, -1:]
+    return np.where(beyond, np.nan, flow), np.where(beyond, np.nan, power)
+
+
+# 병렬: 같은 양정에서 유량 합산 (counts: 펌프별 대수)
+# 양정 격자 상단은 가장 높은 체절 양정 (pump_grid 가 Q=0 까지 외삽한 값)
+def parallel(q, h, kw, counts, points=GRID_POINTS):
+    counts = np.asarray(counts, dtype=np.float64)[:, None]
+    head = np.linspace(np.nanmax(h[:, -1]), np.nanmax(h[:, 0]), points)
+    flow, power = inverse_flow(q, h, kw, head)
+    return (counts * flow).sum(axis=0), head, (counts * power).sum(axis=0)
+
+
+# 직렬: 같은 유량에서 양정 합산 (공통 유량 범위만, 겹치는 범위가 없으면 NaN 곡선)
+def series(q, h, kw, counts, points=GRID_POINTS):
+    counts = np.asarray(counts, dtype=np.float64)[:, None]
+    lo, hi = np.nanmax(q[:, 0]), np.nanmin(q[:, -1])
+    if not lo < hi:
+        empty = np.full(points, np.nan)
+        return empty, empty.copy(), empty.copy()
+    flow = np.linspace(lo, hi, points)
+    rows = np.arange(len(q))[:, None]
+    i = np.clip((q[:, :, None] <= flow).sum(axis=1) - 1, 0, q.shape[1] - 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frac = np.clip((flow - q[rows, i]) / (q[rows, i + 1] - q[rows, i]), 0.0, 1.0)
+    head = h[rows, i] + frac * (h[rows, i + 1] - h[rows, i])
+    power = kw[rows, i] + frac * (kw[rows, i + 1] - kw[rows, i])
+    return flow, (counts * head).sum(axis=0), (counts * power).sum(axis=0)
+
+
+# 합성 곡선 묶음: (라벨, Q, H, kW) 배열, Q/H/kW 는 (곡선 수, 점 수)
+# mixed=False: 선택 모델마다 같은 모델 count 대 / mixed=True: 선택 모델을 각 count 대씩 한 세트로
+def build(index, models, topology, count, mixed=False, points=GRID_POINTS):
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"알 수 없는 구성: {topology}")
+    names, q, h, kw = pump_grid(index, models, points)
+    if not len(names):
+        empty = np.empty((0, points))
+        return np.empty(0, dtype=object), empty, empty, empty
+
+    if mixed:
+        combine = parallel if topology == "parallel" else series
+        cq, ch, ckw = combine(q, h, kw, np.full(len(names), count), points)
+        label = f"{TOPOLOGIES[topology]}: " + " + ".join(f"{m}×{count}" for m in names)
+        return np.array([label], dtype=object), cq[None], ch[None], ckw[None]
+
+    # 같은 모델 N 대: 병렬은 유량 N 배, 직렬은 양정 N 배, 축동력은 N 배
+    labels = np.array([f"{m} ×{count} ({TOPOLOGIES[topology]})" for m in names], dtype=object)
+    if topology == "parallel":
+        return labels, q * count, h, kw * count
+    return labels, q, h * count, kw * count
@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from pumpcurve import workbook_cache
+from pumpcurve.curve_store import CurveStore
+
+# 빌드된 곡선 DB 위치 (워커 프로세스가 모두 같은 경로를 사용)
+CURVE_DB = os.environ.get("PUMP_CURVE_DB", "curve_db")
+CURRENT = "CURRENT"
+META = "meta.json"
+
+# 형식이 바뀌면 올려서 전체 재빌드
+DB_VERSION = 1
+
+# CurveStore 의 정렬된 배열 + (source, model) 오프셋 인덱스
+ARRAYS = ("source_codes", "model_codes", "q", "h", "kw", "starts", "stops")
+
+
+def _read_meta(path):
+    with open(os.path.join(path, META), encoding="utf-8") as f:
+        return json.load(f)
+
+
+# CurveStore 를 digest 디렉터리에 .npy 로 저장 (다른 프로세스가 읽는 중인 기존 버전은 그대로 둠)
+def write_store(store, digest, db_dir=CURVE_DB):
+    os.makedirs(db_dir, exist_ok=True)
+    path = os.path.join(db_dir, digest)
+    if not os.path.exists(os.path.join(path, META)):
+        tmp = tempfile.mkdtemp(dir=db_dir)
+        try:
+            for name in ARRAYS:
+                np.save(os.path.join(tmp, name + ".npy"), np.ascontiguousarray(getattr(store, name)))
+            with open(os.path.join(tmp, META), "w", encoding="utf-8") as f:
+                json.dump({"version": DB_VERSION, "digest": digest, "sources": store.sources,
+                           "models": [str(m) for m in store.models]}, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            # 다른 프로세스가 먼저 빌드한 경우
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    # CURRENT 는 마지막으로 빌드한 워크북의 digest
+    pointer = os.path.join(db_dir, CURRENT + ".tmp")
+    with open(pointer, "w", encoding="utf-8") as f:
+        f.write(digest)
+    os.replace(pointer, os.path.join(db_dir, CURRENT))
+    return path
+
+
+# 마스터 워크북을 곡선 DB 로 컴파일
+def build(workbook, db_dir=CURVE_DB, cache_dir=None):
+    data = workbook_cache._read_bytes(workbook)
+    digest = workbook_cache.content_hash(data)
+    store = CurveStore.from_frames(workbook_cache.load_workbook(data, digest=digest, cache_dir=cache_dir))
+    return write_store(store, digest, db_dir)
+
+
+def current_digest(db_dir=CURVE_DB):
+    path = os.path.join(db_dir, CURRENT)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read().strip() or None
+
+
+# 곡선 DB 를 읽기 전용으로 매핑 (digest 생략 시 CURRENT, 없거나 형식이 다르면 None)
+# 배열은 np.memmap 이라 같은 파일을 여는 프로세스끼리 OS 페이지 캐시 한 벌을 공유한다
+def open_store(digest=None, db_dir=CURVE_DB):
+    digest = digest or current_digest(db_dir)
+    if digest is None:
+        return None
+    path = os.path.join(db_dir, digest)
+    if not os.path.exists(os.path.join(path, META)):
+        return None
+    meta = _read_meta(path)
+    if meta.get("version") != DB_VERSION:
+        return None
+    arrays = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in ARRAYS}
+    return CurveStore.from_sorted(meta["sources"], meta["models"], **arrays)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="마스터 워크북을 memory-map 곡선 DB 로 빌드")
+    parser.add_argument("workbook", help="마스터 워크북 (.xlsx / .xlsm)")
+    parser.add_argument("--out", default=CURVE_DB, help="곡선 DB 디렉터리")
+    args = parser.parse_args(argv)
+
+    path = build(args.workbook, args.out)
+    store = open_store(os.path.basename(path), args.out)
+    print(f"{path}: {len(store)}점, 모델 {len(store.models)}개, 시트 {len(store.sources)}개")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
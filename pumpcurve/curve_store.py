@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+# 고정된 시리즈 순서
+SERIES_ORDER = [
+    "XRF3", "XRF5", "XRF10", "XRF15", "XRF20", "XRF32",
+    "XRF45", "XRF64", "XRF95", "XRF125", "XRF155", "XRF185",
+    "XRF215", "XRF255"
+]
+
+# 시트별 컬럼 후보 (앞쪽이 우선)
+COLUMN_CANDIDATES = {
+    "model": ["모델명", "모델", "Model"],
+    "q": ["토출량", "유량", "Capacity"],
+    "h": ["토출양정", "Total Head", "전양정", "양정"],
+    "kw": ["축동력", "Shaft Power"],
+}
+
+FIELDS = ("q", "h", "kw")
+
+
+# 컬럼 명 자동 매칭
+def match_column(df, names):
+    for n in names:
+        for col in df.columns:
+            if n in str(col):
+                return col
+    return None
+
+
+def extract_series(models):
+    return pd.Series(models, dtype="object").astype(str).str.extract(r"(XRF\d+)", expand=False)
+
+
+# 시트들을 (source, model, Q) 순으로 정렬된 하나의 배열 묶음으로 보관
+# 모델별 곡선은 offset 인덱스로 복사 없이 슬라이스해서 꺼낸다
+class CurveStore:
+
+    def __init__(self, sources, models, source_codes, model_codes, q, h, kw):
+        order = np.lexsort((q, model_codes, source_codes))
+        self.sources = list(sources)
+        self.models = pd.Index(models)
+        self.source_codes = np.ascontiguousarray(source_codes[order], dtype=np.int8)
+        self.model_codes = np.ascontiguousarray(model_codes[order], dtype=np.int32)
+        self.q = np.ascontiguousarray(q[order], dtype=np.float64)
+        self.h = np.ascontiguousarray(h[order], dtype=np.float64)
+        self.kw = np.ascontiguousarray(kw[order], dtype=np.float64)
+        self._init_lookup()
+
+        # (source, model) -> [start, stop) 오프셋 인덱스
+        shape = (len(self.sources), len(self.models))
+        self.starts = np.zeros(shape, dtype=np.int64)
+        self.stops = np.zeros(shape, dtype=np.int64)
+        key = self.source_codes.astype(np.int64) * len(self.models) + self.model_codes
+        if len(key):
+            bounds = np.flatnonzero(np.diff(key)) + 1
+            first = np.r_[0, bounds]
+            last = np.r_[bounds, len(key)]
+            self.starts.flat[key[first]] = first
+            self.stops.flat[key[first]] = last
+
+    def _init_lookup(self):
+        self.series_names = extract_series(self.models).to_numpy(dtype=object)
+        self.series = pd.Categorical(self.series_names, categories=SERIES_ORDER, ordered=True)
+        self._model_code = {m: i for i, m in enumerate(self.models)}
+        self._source_code = {s: i for i, s in enumerate(self.sources)}
+
+    # 이미 정렬된 배열과 오프셋 인덱스로 생성 (memmap 배열도 복사 없이 그대로 사용)
+    @classmethod
+    def from_sorted(cls, sources, models, source_codes, model_codes, q, h, kw, starts, stops):
+        store = cls.__new__(cls)
+        store.sources = list(sources)
+        store.models = pd.Index(models)
+        store.source_codes = source_codes
+        store.model_codes = model_codes
+        store.q, store.h, store.kw = q, h, kw
+        store.starts, store.stops = starts, stops
+        store._init_lookup()
+        return store
+
+    # 시트(DataFrame) 묶음으로부터 생성: {source 이름: DataFrame}
+    @classmethod
+    def from_frames(cls, frames):
+        sources, parts = [], []
+        for code, (name, df) in enumerate(frames.items()):
+            sources.append(name)
+            if df is None or df.empty:
+                continue
+            cols = {k: match_column(df, v) for k, v in COLUMN_CANDIDATES.items()}
+            if not cols["model"] or not cols["q"] or not cols["h"]:
+                continue
+            part = pd.DataFrame({
+                "source": code,
+                "model": df[cols["model"]].astype("string"),
+                "q": pd.to_numeric(df[cols["q"]], errors="coerce"),
+                "h": pd.to_numeric(df[cols["h"]], errors="coerce"),
+                "kw": pd.to_numeric(df[cols["kw"]], errors="coerce") if cols["kw"] else np.nan,
+            })
+            parts.append(part.dropna(subset=["model", "q", "h"]))
+        if parts:
+            data = pd.concat(parts, ignore_index=True)
+        else:
+            data = pd.DataFrame({"source": [], "model": [], "q": [], "h": [], "kw": []})
+        model = pd.Categorical(data["model"].astype(object))
+        return cls(
+            sources,
+            model.categories,
+            data["source"].to_numpy(dtype=np.int8),
+            model.codes.astype(np.int32),
+            data["q"].to_numpy(dtype=np.float64),
+            data["h"].to_numpy(dtype=np.float64),
+            data["kw"].to_numpy(dtype=np.float64),
+        )
+
+    # 단일 시트용
+    @classmethod
+    def from_frame(cls, df, source="data"):
+        return cls.from_frames({source: df})
+
+    def __len__(self):
+        return len(self.q)
+
+    def source_code(self, source):
+        return self._source_code[source]
+
+    def model_code(self, model):
+        return self._model_code.get(model, -1)
+
+    def slice(self, source, model):
+        i = self._model_code.get(model)
+        if i is None or source not in self._source_code:
+            return slice(0, 0)
+        s = self._source_code[source]
+        return slice(int(self.starts[s, i]), int(self.stops[s, i]))
+
+    # 한 모델의 곡선 (Q, H, kW) - 정렬된 배열의 view
+    def curve(self, source, model):
+        sl = self.slice(source, model)
+        return self.q[sl], self.h[sl], self.kw[sl]
+
+    def field(self, name):
+        return getattr(self, name)
+
+    # 해당 source 에 데이터가 있는 모델 목록
+    def models_in(self, source):
+        s = self._source_code[source]
+        return self.models[self.stops[s] > self.starts[s]].tolist()
+
+    def series_of(self, model):
+        i = self._model_code.get(model)
+        return None if i is None else self.series_names[i]
+
+    def models_in_series(self, series, source=None):
+        mask = np.isin(self.series_names, list(series))
+        if source is not None:
+            s = self._source_code[source]
+            mask &= self.stops[s] > self.starts[s]
+        return self.models[mask].tolist()
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# ISO 9906:2012 허용 공차 (비율) - 유량 tQ, 양정 tH, 축동력 tP (+ 방향만)
+ISO9906_GRADES = {
+    "1B": {"flow": 0.05, "head": 0.03, "power": 0.04},
+    "2B": {"flow": 0.08, "head": 0.05, "power": 0.08},
+    "3B": {"flow": 0.09, "head": 0.07, "power": 0.09},
+}
+
+
+# 정렬된 (모델, Q) 배열에서 측정점 위치의 기준값을 한 번에 선형 보간
+# 모델 코드 + 정규화 Q 를 합친 키로 searchsorted, 모델 범위를 벗어난 점은 NaN
+def interpolate_reference(store, source, model_codes, q):
+    s = store.source_code(source)
+    lo, hi = store.starts[s], store.stops[s]
+    present = hi > lo
+    out = {f: np.full(len(q), np.nan) for f in ("h", "kw")}
+    if not present.any() or not len(q):
+        return out
+
+    first, last = int(lo[present].min()), int(hi[present].max())
+    ref_code = store.model_codes[first:last].astype(np.float64)
+    ref_q = store.q[first:last]
+    span = np.nanmax(np.abs(np.r_[ref_q, q])) * 2 + 1
+    ref_key = ref_code + (ref_q / span + 0.5)
+    key = model_codes + (q / span + 0.5)
+    pos = np.searchsorted(ref_key, key) + first
+
+    codes = np.where(model_codes >= 0, model_codes, 0)
+    m_lo, m_hi = lo[codes], hi[codes]
+    inside = (model_codes >= 0) & (m_hi - m_lo >= 2) & np.isfinite(q)
+    inside &= (q >= store.q[np.minimum(m_lo, len(store.q) - 1)]) & \
+              (q <= store.q[np.maximum(m_hi - 1, 0)])
+    right = np.clip(pos, m_lo + 1, np.maximum(m_hi - 1, m_lo + 1))
+    right = np.minimum(right, len(store.q) - 1)
+    left = right - 1
+    x0, x1 = store.q[left], store.q[right]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.where(x1 > x0, (q - x0) / (x1 - x0), 0.0)
+    for f in out:
+        y = store.field(f)
+        out[f] = np.where(inside, y[left] + t * (y[right] - y[left]), np.nan)
+    return out
+
+
+# 측정 source 의 모든 점을 기준 곡선과 비교해서 등급별 합격/불합격 판정
+def evaluate(store, measured_source="deviation data", reference_source="reference data", grade="2B"):
+    tol = ISO9906_GRADES[grade]
+    s = store.source_code(measured_source)
+    lo, hi = store.starts[s], store.stops[s]
+    present = np.flatnonzero(hi > lo)
+    if not len(present):
+        return pd.DataFrame(columns=["모델", "유량", "양정", "기준 양정", "양정 편차 (%)", "축동력",
+                                     "기준 축동력", "축동력 편차 (%)", "양정 판정", "축동력 판정", "판정"])
+    first, last = int(lo[present].min()), int(hi[present].max())
+    codes = store.model_codes[first:last]
+    q = store.q[first:last]
+    h = store.h[first:last]
+    kw = store.kw[first:last]
+
+    ref = interpolate_reference(store, reference_source, codes, q)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dh = (h - ref["h"]) / ref["h"]
+        dp = (kw - ref["kw"]) / ref["kw"]
+    has_ref = np.isfinite(dh)
+    head_ok = np.abs(dh) <= tol["head"]
+    power_ok = ~np.isfinite(dp) | (dp <= tol["power"])
+    verdict = np.where(~has_ref, "기준없음", np.where(head_ok & power_ok, "PASS", "FAIL"))
+
+    return pd.DataFrame({
+        "모델": np.asarray(store.models, dtype=object)[codes],
+        "유량": q,
+        "양정": h,
+        "기준 양정": ref["h"],
+        "양정 편차 (%)": dh * 100,
+        "축동력": kw,
+        "기준 축동력": ref["kw"],
+        "축동력 편차 (%)": dp * 100,
+        "양정 판정": np.where(has_ref, head_ok, False),
+        "축동력 판정": np.where(np.isfinite(dp), power_ok, True),
+        "판정": verdict,
+    })
+
+
+# 모델별 합격/불합격 집계
+def summarize(result):
+    if result.empty:
+        return pd.DataFrame(columns=["모델", "측정점", "PASS", "FAIL", "기준없음", "판정"])
+    counts = pd.crosstab(result["모델"], result["판정"]).reindex(
+        columns=["PASS", "FAIL", "기준없음"], fill_value=0)
+    counts.insert(0, "측정점", counts.sum(axis=1))
+    counts["판정"] = np.where(counts["FAIL"] > 0, "FAIL",
+                            np.where(counts["PASS"] > 0, "PASS", "기준없음"))
+    return counts.reset_index()
@@ -0,0 +1,69 @@
+import copy
+
+from pumpcurve import perf
+
+
+def _row_models(base_df, model_col, rows, *edit_maps):
+    models = set()
+    for r in rows:
+        if 0 <= r < len(base_df):
+            models.add(base_df[model_col].iloc[r])
+        for edits in edit_maps:
+            new = edits.get(r, {}).get(model_col)
+            if new is not None:
+                models.add(new)
+    return models
+
+
+# st.data_editor 편집 상태(session_state[key])를 이전 rerun 과 비교해서 영향받은 모델 목록
+# state: {"edited_rows": {행: {컬럼: 값}}, "added_rows": [...], "deleted_rows": [...]}
+def changed_models(base_df, prev, cur, model_col):
+    prev, cur = prev or {}, cur or {}
+    pe = {int(k): v for k, v in prev.get("edited_rows", {}).items()}
+    ce = {int(k): v for k, v in cur.get("edited_rows", {}).items()}
+    rows = {r for r in set(pe) | set(ce) if pe.get(r) != ce.get(r)}
+    rows |= set(prev.get("deleted_rows", [])) ^ set(cur.get("deleted_rows", []))
+    models = _row_models(base_df, model_col, rows, pe, ce)
+
+    pa, ca = prev.get("added_rows", []), cur.get("added_rows", [])
+    for i in range(max(len(pa), len(ca))):
+        old = pa[i] if i < len(pa) else {}
+        new = ca[i] if i < len(ca) else {}
+        if old != new:
+            models.update(m for m in (old.get(model_col), new.get(model_col)) if m is not None)
+    return models
+
+
+# 모델별 결과(트레이스, 피팅 등)를 보관하고 편집된 모델만 다시 계산
+# 인스턴스는 st.session_state 에 두고 rerun 마다 update() 호출
+class IncrementalCache:
+
+    def __init__(self):
+        self.base_key = None
+        self.state = None
+        self.entries = {}
+        self.rebuilt = 0
+
+    # base_key: 원본 데이터 식별자 (파일/시리즈가 바뀌면 전체 재계산)
+    # build(model, group) -> 모델 하나의 결과
+    def update(self, base_key, base_df, edited_df, state, model_col, build):
+        if base_key != self.base_key:
+            self.base_key = base_key
+            self.entries = {}
+            dirty = set()
+        else:
+            dirty = changed_models(base_df, self.state, state, model_col)
+        self.state = copy.deepcopy(state)
+
+        models = edited_df[model_col].dropna().unique().tolist()
+        needed = [m for m in models if m in dirty or m not in self.entries]
+        if needed:
+            sub = edited_df[edited_df[model_col].isin(needed)]
+            for model, group in sub.groupby(model_col, sort=False):
+                self.entries[model] = build(model, group)
+        for model in set(self.entries) - set(models):
+            del self.entries[model]
+        self.rebuilt = len(needed)
+        perf.current().cache_event("model_entries", hit=True, count=len(models) - len(needed))
+        perf.current().cache_event("model_entries", hit=False, count=len(needed))
+        return [(m, self.entries[m]) for m in models]
@@ -0,0 +1,140 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from pumpcurve import fitting, perf, workbook_cache
+from pumpcurve.curve_store import extract_series
+
+# 물 (20℃) 밀도와 중력 가속도
+RHO = 998.2
+G = 9.80665
+
+# L/min -> m³/s
+LPM = 1 / 60000
+
+# BEP 탐색용 재샘플링 점 수 (유량 범위의 5% ~ 100%)
+GRID_POINTS = 64
+
+# 요약 결과가 바뀌는 수정 시 올려서 디스크 캐시 재생성
+EFFICIENCY_VERSION = 1
+
+
+# 수동력 (kW): Q [L/min], H [m]
+def hydraulic_kw(q, h, rho=RHO):
+    return rho * G * np.asarray(q, dtype=np.float64) * LPM * np.asarray(h, dtype=np.float64) / 1000
+
+
+# 펌프 효율 η = ρgQH / P (0~1), 축동력이 없거나 0 이하면 NaN
+def efficiency(q, h, kw, rho=RHO):
+    kw = np.asarray(kw, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(kw > 0, hydraulic_kw(q, h, rho) / kw, np.nan)
+
+
+# store 의 전체 점 효율 (store.q 와 같은 순서)
+def point_efficiency(store, rho=RHO):
+    return efficiency(store.q, store.h, store.kw, rho)
+
+
+# 피팅 곡선 위 BEP: 재샘플링 격자에서 η 최대점을 찾고 이웃 세 점의 포물선 꼭짓점으로 보정
+# 모델 축 배열 (M,) 을 받아 (q, h, kw, η) 를 반환
+def bep(coef_h, h_scale, coef_kw, kw_scale, q_min, q_max, rho=RHO, points=GRID_POINTS):
+    m = len(q_min)
+    if not m:
+        empty = np.empty(0)
+        return empty, empty, empty, empty
+    t = np.linspace(0.05, 1.0, points)
+    grid = q_min[:, None] + (q_max - q_min)[:, None] * t
+    eta = efficiency(grid, fitting.evaluate(coef_h, h_scale, grid),
+                     fitting.evaluate(coef_kw, kw_scale, grid), rho)
+    valid = np.isfinite(eta).any(axis=1)
+    eta = np.where(np.isfinite(eta), eta, -np.inf)
+    best = np.argmax(eta, axis=1)
+
+    rows = np.arange(m)
+    mid = np.clip(best, 1, points - 2)
+    e0, e1, e2 = eta[rows, mid - 1], eta[rows, mid], eta[rows, mid + 1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        denom = e0 - 2 * e1 + e2
+        shift = np.where(np.isfinite(denom) & (denom < 0), 0.5 * (e0 - e2) / denom, 0.0)
+    shift = np.where(best == mid, np.clip(shift, -1, 1), 0.0)
+    step = (q_max - q_min) * (t[1] - t[0])
+    q = np.where(valid, grid[rows, best] + shift * step, np.nan)
+
+    h = fitting.evaluate(coef_h, h_scale, q[:, None])[:, 0]
+    kw = fitting.evaluate(coef_kw, kw_scale, q[:, None])[:, 0]
+    return q, h, kw, efficiency(q, h, kw, rho)
+
+
+# source 별 모델 요약: 피팅 곡선 BEP + 측정점 최대 효율
+def summarize_source(store, fits, source, rho=RHO):
+    h = fitting.select(fits, source, "h").dropna(subset=["c0"])
+    kw = fitting.select(fits, source, "kw").reindex(h.index)
+    cols = [c for c in h.columns if c.startswith("c") and c[1:].isdigit()]
+    q_min = h["q_min"].to_numpy(dtype=np.float64)
+    q_max = h["q_max"].to_numpy(dtype=np.float64)
+    q_bep, h_bep, kw_bep, eta_bep = bep(
+        h[cols].to_numpy(dtype=np.float64), h["q_scale"].to_numpy(dtype=np.float64),
+        kw[cols].to_numpy(dtype=np.float64), kw["q_scale"].to_numpy(dtype=np.float64),
+        q_min, q_max, rho)
+
+    # 측정점 효율의 모델별 최대값 (source 구간을 reduceat 로 한 번에)
+    eta_max = np.full(len(h), np.nan)
+    if len(h):
+        s = store.source_code(source)
+        codes = np.array([store.model_code(m) for m in h.index], dtype=np.int64)
+        starts, stops = store.starts[s, codes], store.stops[s, codes]
+        present = stops > starts
+        if present.any():
+            lo, hi = int(starts[present].min()), int(stops[present].max())
+            eta = efficiency(store.q[lo:hi], store.h[lo:hi], store.kw[lo:hi], rho)
+            # 구간 사이에 낀 (피팅 없는) 모델의 점은 제외
+            eta[~np.isin(store.model_codes[lo:hi], codes[present])] = np.nan
+            order = np.argsort(starts[present])
+            seg = starts[present][order] - lo
+            peak = np.fmax.reduceat(eta, seg)
+            eta_max[np.flatnonzero(present)[order]] = peak
+
+    models = h.index.to_numpy(dtype=object)
+    return pd.DataFrame({
+        "model": models,
+        "series": extract_series(models).to_numpy(dtype=object),
+        "source": source,
+        "q_bep": q_bep,
+        "h_bep": h_bep,
+        "kw_bep": kw_bep,
+        "eta_bep": eta_bep,
+        "eta_max": eta_max,
+        "q_min": q_min,
+        "q_max": q_max,
+    })
+
+
+# 피팅된 전체 source 의 모델별 효율 요약 테이블
+def summarize(store, fits, sources=fitting.FIT_SOURCES, rho=RHO):
+    tables = [summarize_source(store, fits, src, rho) for src in sources
+              if src in store.sources and (fits["source"] == src).any()]
+    if not tables:
+        return summarize_source(store, fits.iloc[0:0], sources[0], rho)
+    return pd.concat(tables, ignore_index=True)
+
+
+# 데이터 해시 기준으로 디스크에 캐시된 효율 요약 (피팅 결과에서 계산하므로 FIT_VERSION 도 파일 이름에 포함)
+def load_or_summarize(store, fits, digest, cache_dir=None):
+    degree = int(fits["degree"].iloc[0]) if len(fits) else 2
+    name = f"efficiency_v{EFFICIENCY_VERSION}_fit{fitting.FIT_VERSION}_deg{degree}.parquet"
+    path = workbook_cache.derived_path(digest, name, cache_dir)
+    if os.path.exists(path):
+        perf.current().cache_event("efficiency_parquet", hit=True)
+        return pd.read_parquet(path)
+    perf.current().cache_event("efficiency_parquet", hit=False)
+    with perf.stage("efficiency"):
+        table = summarize(store, fits)
+    table.to_parquet(path, index=False)
+    return table
+
+
+# 요약 테이블에서 source 부분을 모델 인덱스로
+def select(table, source):
+    return table[table["source"] == source].set_index("model")
@@ -0,0 +1,105 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from pumpcurve import perf
+
+# 직렬화된 그림을 보관할 전체 크기 상한 (MB)
+MAX_MB = float(os.environ.get("PUMP_FIGURE_CACHE_MB", "64"))
+
+
+# 그림을 결정하는 값들 (데이터 해시, source, 모델/시리즈 선택, 그림 종류 ...) -> 캐시 키
+# repr 로 비교하므로 DataFrame 등은 튜플로 바꿔서 넘길 것
+def figure_key(*parts):
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+# 캐시에 보관하는 완성된 그림
+# st.plotly_chart 는 Figure 를 to_dict() 로 깊은 복사하고 dict 는 Figure(**dict) 로 다시 검증하므로,
+# build() 결과를 dict 로 한 번만 변환해 두고 to_dict() 는 그 dict 를 그대로 돌려준다 (읽기 전용으로 사용할 것)
+class FrozenFigure(go.Figure):
+
+    def __init__(self, fig):
+        super().__init__()
+        self._spec = fig.to_dict()
+
+    def to_dict(self):
+        return self._spec
+
+    # 전송되는 JSON 크기 (캐시 상한 계산용)
+    def wire_size(self):
+        return len(pio.to_json(self._spec, validate=False))
+
+
+# Plotly 그림의 LRU 캐시 (세션 간 공유, 전송 JSON 크기 합이 상한을 넘으면 오래 안 쓴 것부터 제거)
+class FigureCache:
+
+    def __init__(self, max_bytes=None, name="figure_cache"):
+        self.max_bytes = int(MAX_MB * 2 ** 20) if max_bytes is None else max_bytes
+        self.name = name
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        perf.current().cache_event(self.name, hit=entry is not None)
+        return entry[0] if entry is not None else None
+
+    def put(self, key, fig):
+        size = fig.wire_size()
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            # 상한보다 큰 그림은 다른 항목을 모두 밀어내므로 보관하지 않음
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (fig, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, old_size) = self._entries.popitem(last=False)
+                self.nbytes -= old_size
+                self.evictions += 1
+
+    # 캐시에 없을 때만 build() 로 그림을 만들어 FrozenFigure 로 보관
+    def figure(self, key, build):
+        fig = self.get(key)
+        if fig is None:
+            fig = FrozenFigure(build())
+            self.put(key, fig)
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    # 누적 적중률 (사이드바 성능 패널 / 상한 조정용)
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "캐시": self.name,
+            "항목": len(self._entries),
+            "MB": round(self.nbytes / 2 ** 20, 2),
+            "상한 MB": round(self.max_bytes / 2 ** 20, 1),
+            "hit": self.hits,
+            "miss": self.misses,
+            "evict": self.evictions,
+            "hit율 (%)": round(100 * self.hits / total, 1) if total else 0.0,
+        }
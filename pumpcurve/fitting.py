@@ -0,0 +1,122 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from pumpcurve import perf, workbook_cache
+
+FIT_SOURCES = ("reference data", "catalog data")
+FIT_FIELDS = ("h", "kw")
+
+# 피팅 결과가 바뀌는 수정 시 올려서 디스크 캐시 재생성
+FIT_VERSION = 1
+
+
+def coef_columns(degree):
+    return [f"c{i}" for i in range(degree + 1)]
+
+
+# 한 source 의 모든 모델을 한 번에 다항식 최소제곱 피팅
+# Q 는 모델별 최대 유량으로 정규화 (x = Q / q_scale), 계수는 오름차순 c0 + c1·x + c2·x² ...
+def fit_source(store, source, field, degree=2, constrained=True):
+    s = store.source_code(source)
+    present = np.flatnonzero(store.stops[s] > store.starts[s])
+    columns = ["model", "source", "field", "degree"] + coef_columns(degree) + \
+              ["q_scale", "q_min", "q_max", "n", "r2", "rmse"]
+    if not len(present):
+        return pd.DataFrame(columns=columns)
+
+    lo, hi = int(store.starts[s, present[0]]), int(store.stops[s, present[-1]])
+    q = store.q[lo:hi]
+    y = store.field(field)[lo:hi]
+    seg = store.starts[s, present] - lo
+    lengths = store.stops[s, present] - store.starts[s, present]
+    owner = np.repeat(np.arange(len(present)), lengths)
+
+    valid = np.isfinite(q) & np.isfinite(y)
+    w = valid.astype(np.float64)
+    q0 = np.where(valid, q, 0.0)
+    y0 = np.where(valid, y, 0.0)
+
+    q_min = np.fmin.reduceat(np.where(valid, q, np.nan), seg)
+    q_max = np.fmax.reduceat(np.where(valid, q, np.nan), seg)
+    q_scale = np.where(np.abs(q_max) > 0, np.abs(q_max), 1.0)
+    x = q0 / q_scale[owner]
+
+    # 점별 Vandermonde -> 모델별 정규방정식 (reduceat 로 구간 합)
+    V = (x[:, None] ** np.arange(degree + 1)) * w[:, None]
+    XtX = np.add.reduceat(V[:, :, None] * V[:, None, :], seg, axis=0)
+    Xty = np.add.reduceat(V * y0[:, None], seg, axis=0)
+    n = np.add.reduceat(w, seg)
+
+    coef = np.einsum("mij,mj->mi", np.linalg.pinv(XtX), Xty)
+
+    # Q-H 2차 곡선은 아래로 볼록(c2 <= 0)이어야 함 - 위반 시 c2 = 0 으로 재피팅
+    if constrained and field == "h" and degree == 2:
+        bad = coef[:, 2] > 0
+        if bad.any():
+            sub = np.einsum("mij,mj->mi", np.linalg.pinv(XtX[bad][:, :2, :2]), Xty[bad][:, :2])
+            coef[bad] = np.c_[sub, np.zeros(bad.sum())]
+
+    coef[n <= degree] = np.nan
+
+    fitted = np.einsum("pi,pi->p", x[:, None] ** np.arange(degree + 1), coef[owner])
+    ss_res = np.add.reduceat(w * (y0 - fitted) ** 2, seg)
+    mean = np.add.reduceat(y0, seg) / np.where(n > 0, n, 1)
+    ss_tot = np.add.reduceat(w * (y0 - mean[owner]) ** 2, seg)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r2 = np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.nan)
+        rmse = np.sqrt(ss_res / n)
+
+    table = pd.DataFrame(coef, columns=coef_columns(degree))
+    table.insert(0, "model", np.asarray(store.models[present], dtype=object))
+    table.insert(1, "source", source)
+    table.insert(2, "field", field)
+    table.insert(3, "degree", degree)
+    table["q_scale"] = q_scale
+    table["q_min"] = q_min
+    table["q_max"] = q_max
+    table["n"] = n.astype(np.int64)
+    table["r2"] = r2
+    table["rmse"] = rmse
+    return table
+
+
+# reference / catalog 의 Q-H, Q-kW 전체 피팅 결과
+def fit_all(store, sources=FIT_SOURCES, fields=FIT_FIELDS, degree=2, constrained=True):
+    tables = [fit_source(store, src, f, degree, constrained)
+              for src in sources if src in store.sources for f in fields]
+    tables = [t for t in tables if len(t)]
+    if not tables:
+        return fit_source(store, store.sources[0], fields[0], degree, constrained).iloc[0:0]
+    return pd.concat(tables, ignore_index=True)
+
+
+# 데이터 해시 기준으로 디스크에 캐시된 피팅 테이블
+def load_or_fit(store, digest, degree=2, constrained=True, cache_dir=None):
+    name = f"fits_v{FIT_VERSION}_deg{degree}{'_c' if constrained else ''}.parquet"
+    path = workbook_cache.derived_path(digest, name, cache_dir)
+    if os.path.exists(path):
+        perf.current().cache_event("fits_parquet", hit=True)
+        return pd.read_parquet(path)
+    perf.current().cache_event("fits_parquet", hit=False)
+    with perf.stage("curve_fit"):
+        table = fit_all(store, degree=degree, constrained=constrained)
+    table.to_parquet(path, index=False)
+    return table
+
+
+# 피팅 곡선 계산: coefs (M, d+1), q_scale (M,), q (K,) 또는 (M, K) -> (M, K)
+def evaluate(coefs, q_scale, q):
+    coefs = np.asarray(coefs, dtype=np.float64)
+    x = np.asarray(q, dtype=np.float64) / np.asarray(q_scale, dtype=np.float64)[:, None]
+    out = np.zeros(np.broadcast_shapes(x.shape, (coefs.shape[0], 1)))
+    for i in range(coefs.shape[1] - 1, -1, -1):
+        out = out * x + coefs[:, i:i + 1]
+    return out
+
+
+# 피팅 테이블에서 (source, field) 부분을 모델 인덱스로
+def select(table, source, field):
+    sub = table[(table["source"] == source) & (table["field"] == field)]
+    return sub.set_index("model")
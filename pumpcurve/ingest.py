@@ -0,0 +1,175 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from pumpcurve import reports
+
+REPORT_EXTENSIONS = (".xlsx", ".xlsm")
+
+TABLE_COLUMNS = ["모델명", "시험번호", "유량", "토출양정", "전양정", "축동력", "원본파일", "파일해시"]
+
+LEDGER = "ingested.jsonl"
+FAILURES = "failures.jsonl"
+
+# 한 번에 Parquet 파트 파일로 내보낼 성적서 수
+FLUSH_EVERY = 200
+
+
+def _is_report(name):
+    base = os.path.basename(name)
+    return base.lower().endswith(REPORT_EXTENSIONS) and not base.startswith("~$")
+
+
+# 디렉터리 또는 zip 안의 성적서 파일 (라벨, 파일 바이트)
+def iter_report_files(path):
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and _is_report(info.filename):
+                    yield f"{path}!{info.filename}", zf.read(info)
+        return
+    for root, _, files in os.walk(path):
+        for name in sorted(files):
+            if _is_report(name):
+                full = os.path.join(root, name)
+                with open(full, "rb") as f:
+                    yield full, f.read()
+
+
+def _read_jsonl(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def read_ledger(out_dir):
+    return {rec["hash"] for rec in _read_jsonl(os.path.join(out_dir, LEDGER))}
+
+
+def _append_jsonl(path, records, mode="a"):
+    with open(path, mode, encoding="utf-8") as f:
+        for rec in records:
+            f.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+
+
+# 실패 목록 갱신: (파일, 해시) 당 한 줄만 유지 (다시 실패하면 이번 오류로 교체)
+# 실패한 파일은 원장에 없어서 매 실행마다 다시 시도되므로, 이후 수집된 해시는 목록에서 제거
+def _update_failures(out_dir, failures):
+    path = os.path.join(out_dir, FAILURES)
+    records = {(rec["file"], rec["hash"]): rec for rec in _read_jsonl(path)}
+    if not records and not failures:
+        return
+    records.update(((rec["file"], rec["hash"]), rec) for rec in failures)
+    ingested = read_ledger(out_dir)
+    tmp = path + ".tmp"
+    _append_jsonl(tmp, [rec for rec in records.values() if rec["hash"] not in ingested], mode="w")
+    os.replace(tmp, path)
+
+
+# 워커 프로세스: 성적서 한 장 파싱
+def _parse_one(label, digest, data):
+    try:
+        sample = reports.extract_report(data)
+    except Exception as e:
+        return label, digest, None, f"{type(e).__name__}: {e}"
+    sample = sample.rename(columns=reports.DEVIATION_COLUMNS)[TABLE_COLUMNS[:-2]].copy()
+    sample["원본파일"] = label
+    sample["파일해시"] = digest
+    return label, digest, sample, None
+
+
+def _flush(out_dir, name, frames, done):
+    if not frames:
+        return
+    part = pd.concat(frames, ignore_index=True)
+    for col in ("모델명", "시험번호", "원본파일"):
+        part[col] = part[col].astype("string")
+    part.to_parquet(os.path.join(out_dir, name), index=False)
+    # 파트 파일이 저장된 뒤에 원장 기록 (중단되어도 재실행 시 다시 처리)
+    _append_jsonl(os.path.join(out_dir, LEDGER), done)
+    frames.clear()
+    done.clear()
+
+
+# 디렉터리/zip 의 성적서를 병렬 파싱해서 out_dir 의 deviation 테이블에 추가
+def ingest(path, out_dir, workers=None, flush_every=FLUSH_EVERY, log=print):
+    os.makedirs(out_dir, exist_ok=True)
+    seen = read_ledger(out_dir)
+    summary = {"ingested": 0, "skipped": 0, "failed": 0, "rows": 0}
+    failures = []
+    frames, done = [], []
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    parts = 0
+
+    def collect(fut):
+        nonlocal parts
+        label, digest, sample, error = fut.result()
+        if error is not None:
+            summary["failed"] += 1
+            failures.append({"file": label, "hash": digest, "error": error})
+            log(f"[실패] {label}: {error}")
+            return
+        summary["ingested"] += 1
+        summary["rows"] += len(sample)
+        frames.append(sample)
+        done.append({"hash": digest, "file": label, "rows": len(sample)})
+        if len(frames) >= flush_every:
+            _flush(out_dir, f"part-{stamp}-{os.getpid()}-{parts:05d}.parquet", frames, done)
+            parts += 1
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # 메모리에 올라가는 파일 수를 제한하면서 제출
+        limit = 4 * workers
+        pending = set()
+        for label, data in iter_report_files(path):
+            digest = hashlib.sha256(data).hexdigest()
+            if digest in seen:
+                summary["skipped"] += 1
+                continue
+            seen.add(digest)
+            pending.add(pool.submit(_parse_one, label, digest, data))
+            if len(pending) >= limit:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    collect(fut)
+        for fut in wait(pending).done:
+            collect(fut)
+
+    _flush(out_dir, f"part-{stamp}-{os.getpid()}-{parts:05d}.parquet", frames, done)
+    _update_failures(out_dir, failures)
+    summary["failures"] = failures
+    return summary
+
+
+# 누적된 deviation 테이블 읽기
+def load_deviation_table(out_dir):
+    parts = sorted(f for f in os.listdir(out_dir) if f.endswith(".parquet"))
+    if not parts:
+        return pd.DataFrame(columns=TABLE_COLUMNS)
+    return pd.concat([pd.read_parquet(os.path.join(out_dir, f)) for f in parts], ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="성적서(DATA SHEET) 일괄 수집")
+    parser.add_argument("path", help="성적서 디렉터리 또는 zip 파일")
+    parser.add_argument("--out", default="deviation_store", help="deviation 테이블 저장 디렉터리")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    args = parser.parse_args(argv)
+
+    summary = ingest(args.path, args.out, workers=args.workers)
+    print(f"수집 {summary['ingested']}건 ({summary['rows']}행), "
+          f"중복 건너뜀 {summary['skipped']}건, 실패 {summary['failed']}건")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+from pumpcurve import curve_db, perf, workbook_cache
+from pumpcurve.curve_store import CurveStore, match_column, COLUMN_CANDIDATES
+
+
+def _file_stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _to_tables(frames):
+    return {name: pa.Table.from_pandas(df, preserve_index=False)
+            for name, df in frames.items() if df is not None}
+
+
+# 프로세스당 한 번 로드하는 읽기 전용 마스터 DB
+# 시트는 불변 Arrow 테이블로 보관하고, 세션에는 같은 버퍼를 참조하는 DataFrame view 를 넘긴다
+class MasterDB:
+
+    def __init__(self, tables, digest=None, curves=None, hashes=None):
+        self.tables = dict(tables)
+        self.digest = digest
+        self.curves = curves
+        self.hashes = dict(hashes or {})
+        self._stores = {}
+        self._models = None
+        # 파일 감시 (from_workbook 에 경로를 준 경우만)
+        self.path = None
+        self.sheets = list(self.tables)
+        self.cache_dir = None
+        self.db_dir = curve_db.CURVE_DB
+        self._stat = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frames(cls, frames, digest=None, curves=None, hashes=None):
+        return cls(_to_tables(frames), digest, curves, hashes)
+
+    # 워크북 해시 기준 Parquet 캐시를 거쳐 로드
+    # 같은 워크북으로 빌드된 곡선 DB 가 있으면 곡선은 그 파일을 매핑해서 사용
+    @classmethod
+    def from_workbook(cls, source, sheets=workbook_cache.SHEETS, cache_dir=None, db_dir=curve_db.CURVE_DB):
+        stat = _file_stat(source) if isinstance(source, (str, os.PathLike)) else None
+        data = workbook_cache._read_bytes(source)
+        digest = workbook_cache.content_hash(data)
+        frames = workbook_cache.load_workbook(data, digest=digest, sheets=sheets, cache_dir=cache_dir)
+        db = cls.from_frames(frames, digest, curve_db.open_store(digest, db_dir),
+                             workbook_cache.sheet_hashes(data, sheets))
+        db.sheets, db.cache_dir, db.db_dir = list(sheets), cache_dir, db_dir
+        if stat is not None:
+            db.path, db._stat = os.fspath(source), stat
+        return db
+
+    # 원본 파일이 바뀌었으면 내용이 바뀐 시트만 다시 읽고, 그 시트로 만든 곡선 저장소만 버린다
+    # 반환: 다시 읽은 시트 목록 (변경 없으면 빈 목록)
+    def refresh(self):
+        if self.path is None or _file_stat(self.path) == self._stat:
+            return []
+        with self._lock:
+            stat = _file_stat(self.path)
+            if stat is None or stat == self._stat:
+                return []
+            with open(self.path, "rb") as f:
+                data = f.read()
+            self._stat = stat
+            digest = workbook_cache.content_hash(data)
+            if digest == self.digest:
+                return []
+            hashes = workbook_cache.sheet_hashes(data, self.sheets)
+            changed = [name for name in self.sheets if hashes.get(name) != self.hashes.get(name)]
+            perf.current().cache_event("master_sheets", hit=True, count=len(self.sheets) - len(changed))
+            perf.current().cache_event("master_sheets", hit=False, count=len(changed))
+
+            tables = dict(self.tables)
+            if changed:
+                with perf.stage("excel_parse"):
+                    frames = workbook_cache.parse_workbook(data, changed)
+                for name in changed:
+                    tables.pop(name, None)
+                tables.update(_to_tables(frames))
+            # 읽는 중인 세션이 있을 수 있으므로 dict 는 교체만 한다
+            self.tables = tables
+            self._stores = {key: store for key, store in self._stores.items() if not set(key) & set(changed)}
+            if changed:
+                self._models = None
+            self.digest, self.hashes = digest, hashes
+            self.curves = curve_db.open_store(digest, self.db_dir)
+            # 다른 프로세스는 새 해시로 Parquet 캐시를 바로 읽도록 저장
+            workbook_cache.save_frames(digest, {name: self.tables[name].to_pandas() if name in self.tables
+                                                else None for name in self.sheets}, self.cache_dir)
+            return changed
+
+    # 시트 조합의 내용 버전 (파생 캐시 키로 사용)
+    def version(self, sources):
+        return tuple(self.hashes.get(name) for name in sources)
+
+    def __contains__(self, name):
+        return name in self.tables
+
+    @property
+    def nbytes(self):
+        return sum(t.nbytes for t in self.tables.values())
+
+    # Arrow 버퍼를 그대로 쓰는 DataFrame (복사 없음, 값 변경 시에만 해당 컬럼 복사)
+    def frame(self, name):
+        table = self.tables.get(name)
+        if table is None:
+            return pd.DataFrame()
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+    def frames(self):
+        return {name: self.frame(name) for name in self.tables}
+
+    # 전체 시트의 모델명 (정렬)
+    def models(self):
+        if self._models is None:
+            names = set()
+            for name in self.tables:
+                df = self.frame(name)
+                col = match_column(df, COLUMN_CANDIDATES["model"])
+                if col:
+                    names.update(df[col].dropna().astype(str))
+            self._models = sorted(names)
+        return list(self._models)
+
+    # 시트 조합별 곡선 저장소 (프로세스 내에서 공유, 곡선 DB 가 있으면 프로세스 간 공유)
+    def store(self, sources):
+        key = tuple(sources)
+        if self.curves is not None and all(s in self.curves.sources for s in key):
+            return self.curves
+        if key not in self._stores:
+            self._stores[key] = CurveStore.from_frames({name: self.frame(name) for name in key})
+        return self._stores[key]
@@ -0,0 +1,164 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# 체크박스를 켜면 rerun 마다 한 줄씩 추가
+PERF_LOG = os.environ.get("PUMP_PERF_LOG", "perf_log.jsonl")
+HISTORY = 20
+
+_local = threading.local()
+
+
+# rerun 한 번의 단계별 시간과 캐시 적중/실패 기록 (세션마다 하나, session_state 에 보관)
+class PerfRecorder:
+
+    def __init__(self, app):
+        self.app = app
+        self.history = deque(maxlen=HISTORY)
+        self.start_run()
+
+    def start_run(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.cache = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def cache_event(self, name, hit, count=1):
+        counts = self.cache.setdefault(name, {"hit": 0, "miss": 0})
+        counts["hit" if hit else "miss"] += count
+
+    def misses(self, name):
+        return self.cache.get(name, {}).get("miss", 0)
+
+    def finish_run(self, log_path=None):
+        record = {
+            "app": self.app,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "total": time.perf_counter() - self.started,
+            "stages": dict(self.stages),
+            "cache": {k: dict(v) for k, v in self.cache.items()},
+        }
+        self.history.append(record)
+        if log_path:
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return record
+
+
+# 활성화된 recorder 가 없을 때 (CLI, 벤치마크) 쓰는 빈 recorder
+class _NullRecorder(PerfRecorder):
+
+    def __init__(self):
+        super().__init__(None)
+
+    @contextmanager
+    def stage(self, name):
+        yield
+
+    def cache_event(self, name, hit, count=1):
+        pass
+
+
+_NULL = _NullRecorder()
+
+
+# 스크립트 스레드마다 현재 rerun 의 recorder 지정
+def activate(recorder):
+    _local.recorder = recorder
+    return recorder
+
+
+def current():
+    return getattr(_local, "recorder", None) or _NULL
+
+
+# rerun 시작 시 호출: 세션 recorder 를 꺼내 새 rerun 기록을 시작
+def session_recorder(state, app, key="perf_recorder"):
+    if key not in state:
+        state[key] = PerfRecorder(app)
+    recorder = state[key]
+    recorder.start_run()
+    return activate(recorder)
+
+
+def stage(name):
+    return current().stage(name)
+
+
+# 함수 전체를 한 단계로 기록하는 데코레이터
+def timed(name=None):
+    def decorator(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with current().stage(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# st.cache_data / st.cache_resource 로 감싼 함수의 시간과 적중 여부 기록
+# 사용: @perf.cached(st.cache_data) - 본문이 실행되면 miss, 아니면 hit
+def cached(cache_decorator, name=None):
+    def decorator(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def on_miss(*args, **kwargs):
+            current().cache_event(label, hit=False)
+            return fn(*args, **kwargs)
+
+        inner = cache_decorator(on_miss)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            recorder = current()
+            before = recorder.misses(label)
+            with recorder.stage(label):
+                result = inner(*args, **kwargs)
+            if recorder.misses(label) == before:
+                recorder.cache_event(label, hit=True)
+            return result
+
+        wrapper.clear = inner.clear
+        return wrapper
+    return decorator
+
+
+# 사이드바 성능 패널 (스크립트 마지막에 호출, rerun 기록을 마감하고 표시)
+# caches: stats() 로 누적 적중률을 돌려주는 세션 공유 캐시 (figure_cache.FigureCache 등)
+def sidebar_panel(recorder, caches=()):
+    import pandas as pd
+    import streamlit as st
+
+    with st.sidebar.expander("⏱ 성능", expanded=False):
+        log = st.checkbox("JSONL 로그 기록", key=f"{recorder.app}_perf_log",
+                          help=f"rerun 마다 {PERF_LOG} 에 단계별 시간 추가")
+        record = recorder.finish_run(PERF_LOG if log else None)
+        st.caption(f"이번 rerun: {record['total'] * 1000:.0f} ms")
+        if record["stages"]:
+            stages = pd.DataFrame({"단계": list(record["stages"]),
+                                   "ms": [v * 1000 for v in record["stages"].values()]})
+            st.dataframe(stages.sort_values("ms", ascending=False).round(1),
+                         hide_index=True, use_container_width=True)
+        if record["cache"]:
+            cache = pd.DataFrame([{"캐시": k, "hit": v["hit"], "miss": v["miss"]}
+                                  for k, v in record["cache"].items()])
+            st.dataframe(cache, hide_index=True, use_container_width=True)
+        if caches:
+            st.caption("누적 캐시")
+            st.dataframe(pd.DataFrame([c.stats() for c in caches]), hide_index=True, use_container_width=True)
+        if len(recorder.history) > 1:
+            st.line_chart(pd.DataFrame({"rerun (ms)": [r["total"] * 1000 for r in recorder.history]}))
@@ -0,0 +1,88 @@
+import numpy as np
+import plotly.graph_objs as go
+
+# 모델 수가 이 값을 넘으면 WebGL 일괄 렌더링을 기본으로 사용
+BATCH_THRESHOLD = 30
+
+AXIS_LABELS = {"q": "Capacity (L/min)", "h": "Total Head (m)", "kw": "Shaft Power (kW)"}
+HOVER_UNITS = {"q": "Capacity: %{x} L/min", "h": "Head: %{y:.1f} m", "kw": "Power: %{y:.2f} kW"}
+
+
+# 선택 모델들의 곡선을 NaN 구분자로 이어 붙인 배열 (x, y, 점별 모델명)
+# NaN 구분자 점의 모델명은 ""
+def batched_arrays(store, source, ycol, models):
+    codes = np.array([store.model_code(m) for m in models], dtype=np.int64)
+    codes = codes[codes >= 0]
+    s = store.source_code(source)
+    starts = store.starts[s, codes]
+    lengths = store.stops[s, codes] - starts
+    keep = lengths > 0
+    codes, starts, lengths = codes[keep], starts[keep], lengths[keep]
+    if not len(codes):
+        empty = np.empty(0)
+        return empty, empty, np.empty(0, dtype=object)
+
+    # 각 모델 구간 뒤에 NaN 한 칸씩
+    out_len = lengths + 1
+    out_start = np.r_[0, np.cumsum(out_len)[:-1]]
+    total = int(out_len.sum())
+    pos = np.arange(total) - np.repeat(out_start, out_len)
+    src = np.repeat(starts, out_len) + pos
+    is_gap = pos == np.repeat(lengths, out_len)
+    src[is_gap] = 0
+
+    x = np.where(is_gap, np.nan, store.q[src])
+    y = np.where(is_gap, np.nan, store.field(ycol)[src])
+    labels = np.repeat(np.asarray(store.models, dtype=object)[codes], out_len)
+    labels[is_gap] = ""
+    return x, y, labels
+
+
+# 일괄 트레이스 좌표는 float32 로 전송 (Plotly 가 base64 typed array 로 직렬화, 표시 정밀도는 충분)
+def _wire(values):
+    return np.asarray(values, dtype=np.float32)
+
+
+# 일괄 트레이스 hover (점마다 customdata 의 모델명 + 값)
+def _batched_hovertemplate(ycol, name):
+    return "%{customdata}<br>" + HOVER_UNITS["q"] + "<br>" + HOVER_UNITS[ycol] + "<extra>" + name + "</extra>"
+
+
+# source 하나당 Scattergl 트레이스 하나 (모델명은 점별 customdata 로 hover 에 표시)
+def batched_trace(store, source, ycol, models, name=None, mode="lines+markers",
+                  line=None, marker=None):
+    x, y, labels = batched_arrays(store, source, ycol, models)
+    return go.Scattergl(
+        x=_wire(x), y=_wire(y),
+        customdata=labels,
+        mode=mode,
+        name=name or source,
+        connectgaps=False,
+        line=line or {},
+        marker=marker or {},
+        hovertemplate=_batched_hovertemplate(ycol, name or source),
+    )
+
+
+# 모델별 트레이스용 hover (트레이스 이름을 그대로 사용하므로 점별 text 불필요)
+def model_hovertemplate(ycol="h"):
+    return "%{fullData.name}<br>" + HOVER_UNITS["q"] + "<br>" + HOVER_UNITS[ycol] + "<extra></extra>"
+
+
+# (곡선 수, 점 수) 배열 묶음을 NaN 구분자로 이어서 Scattergl 하나로 (곡선군 표시용)
+def family_trace(x, y, labels, name, ycol="h", mode="lines", line=None):
+    x = np.asarray(x, dtype=np.float64).reshape(len(labels), -1)
+    y = np.asarray(y, dtype=np.float64).reshape(len(labels), -1)
+    gap = np.full((len(labels), 1), np.nan)
+    text = np.repeat(np.asarray(labels, dtype=object)[:, None], x.shape[1] + 1, axis=1)
+    text[:, -1] = ""
+    return go.Scattergl(
+        x=_wire(np.hstack([x, gap]).ravel()),
+        y=_wire(np.hstack([y, gap]).ravel()),
+        customdata=text.ravel(),
+        mode=mode,
+        name=name,
+        connectgaps=False,
+        line=line or {},
+        hovertemplate=_batched_hovertemplate(ycol, name),
+    )
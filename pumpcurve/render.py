@@ -0,0 +1,154 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from pumpcurve import workbook_cache
+from pumpcurve.curve_store import SERIES_ORDER, CurveStore
+
+FORMATS = ("png", "svg", "pdf")
+MANIFEST = "manifest.json"
+
+# 렌더링 결과가 바뀌는 수정 시 올려서 전체 재생성
+RENDER_VERSION = 1
+
+# 뷰어(add_traces)와 같은 source 별 표시 방식
+SOURCE_STYLES = {
+    "reference data": {"label": "Reference", "linestyle": "-", "marker": "o"},
+    "catalog data": {"label": "Catalog", "linestyle": ":", "marker": "o"},
+    "deviation data": {"label": "Deviation", "linestyle": "none", "marker": "x"},
+}
+
+
+# 시리즈 하나의 곡선 데이터 {source: [(모델, q, h, kw), ...]}
+def series_payload(store, series):
+    payload = {}
+    for source in store.sources:
+        curves = []
+        for model in store.models_in_series([series], source):
+            q, h, kw = store.curve(source, model)
+            curves.append((model, q.copy(), h.copy(), kw.copy()))
+        if curves:
+            payload[source] = curves
+    return payload
+
+
+def payload_hash(payload, formats, dpi):
+    h = hashlib.sha256(json.dumps([RENDER_VERSION, list(formats), dpi]).encode())
+    for source in sorted(payload):
+        for model, q, hd, kw in payload[source]:
+            h.update(f"{source}\x1f{model}".encode("utf-8"))
+            for arr in (q, hd, kw):
+                h.update(np.ascontiguousarray(arr).tobytes())
+    return h.hexdigest()
+
+
+# 워커 프로세스: 시리즈 하나의 Q-H / Q-kW 곡선 시트 저장
+def render_series(series, payload, out_dir, formats=("png",), dpi=150):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, (ax_h, ax_k) = plt.subplots(1, 2, figsize=(16, 7))
+    for source, curves in payload.items():
+        style = SOURCE_STYLES.get(source, {"label": source, "linestyle": "-", "marker": "o"})
+        for i, (model, q, h, kw) in enumerate(curves):
+            kwargs = dict(linestyle=style["linestyle"], marker=style["marker"], markersize=3,
+                          color=f"C{i % 10}", label=f"{model} ({style['label']})")
+            ax_h.plot(q, h, **kwargs)
+            if np.isfinite(kw).any():
+                ax_k.plot(q, kw, **kwargs)
+    ax_h.set_title(f"{series} Q-H")
+    ax_h.set_xlabel("Capacity (L/min)")
+    ax_h.set_ylabel("Total Head (m)")
+    ax_k.set_title(f"{series} Q-kW")
+    ax_k.set_xlabel("Capacity (L/min)")
+    ax_k.set_ylabel("Shaft Power (kW)")
+    for ax in (ax_h, ax_k):
+        ax.grid(True, alpha=0.3)
+    ax_h.legend(fontsize=7, ncol=2, loc="upper right")
+    fig.tight_layout()
+
+    paths = []
+    for fmt in formats:
+        path = os.path.join(out_dir, f"{series}.{fmt}")
+        fig.savefig(path, dpi=dpi)
+        paths.append(path)
+    plt.close(fig)
+    return series, paths
+
+
+def _read_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# 워크북의 전체 시리즈 곡선 시트를 병렬 렌더링 (데이터가 그대로인 시리즈는 건너뜀)
+def render_catalog(workbook, out_dir, formats=("png",), series=None, workers=None, dpi=150,
+                   force=False, log=print):
+    os.makedirs(out_dir, exist_ok=True)
+    store = CurveStore.from_frames(workbook_cache.load_workbook(workbook))
+    manifest = _read_manifest(out_dir)
+    summary = {"rendered": [], "skipped": [], "failed": {}}
+
+    jobs = {}
+    for name in series or SERIES_ORDER:
+        payload = series_payload(store, name)
+        if not payload:
+            continue
+        digest = payload_hash(payload, formats, dpi)
+        outputs = [os.path.join(out_dir, f"{name}.{fmt}") for fmt in formats]
+        if not force and manifest.get(name) == digest and all(map(os.path.exists, outputs)):
+            summary["skipped"].append(name)
+            continue
+        jobs[name] = (payload, digest)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(render_series, name, payload, out_dir, formats, dpi): name
+                   for name, (payload, _) in jobs.items()}
+        for fut in as_completed(futures):
+            name = futures[fut]
+            try:
+                fut.result()
+            except Exception as e:
+                summary["failed"][name] = f"{type(e).__name__}: {e}"
+                log(f"[실패] {name}: {e}")
+                continue
+            manifest[name] = jobs[name][1]
+            summary["rendered"].append(name)
+            log(f"[완료] {name}")
+
+    tmp = os.path.join(out_dir, MANIFEST + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, os.path.join(out_dir, MANIFEST))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="시리즈별 성능 곡선 시트 일괄 렌더링")
+    parser.add_argument("workbook", help="마스터 워크북 (.xlsx / .xlsm)")
+    parser.add_argument("--out", default="curve_sheets", help="출력 디렉터리")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=["png"], dest="formats")
+    parser.add_argument("--series", nargs="+", default=None, help="렌더링할 시리즈 (기본: 전체)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--force", action="store_true", help="변경 여부와 관계없이 다시 렌더링")
+    args = parser.parse_args(argv)
+
+    summary = render_catalog(args.workbook, args.out, args.formats, args.series,
+                             args.workers, args.dpi, args.force)
+    print(f"렌더링 {len(summary['rendered'])}건, 변경 없음 {len(summary['skipped'])}건, "
+          f"실패 {len(summary['failed'])}건")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
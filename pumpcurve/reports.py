@@ -0,0 +1,86 @@
+import io
+
+import openpyxl
+import pandas as pd
+from openpyxl.utils import column_index_from_string, coordinate_to_tuple
+
+# 성적서(DATA SHEET) 셀 위치 템플릿 (엑셀 좌표)
+REPORT_TEMPLATE = {
+    "sheet": "DATA SHEET",
+    "columns": ["I", "K", "M", "O", "Q", "S", "U", "W"],
+    "rows": {
+        "Flow Rate": 20,
+        "Head": 22,
+        "Total Head": 24,
+        "Shaft Power": 34,
+    },
+    "cells": {
+        "Product": "G8",   # 제품명
+        "Test ID": "S6",   # 시험번호
+    },
+}
+
+# 성적서 컬럼 -> deviation data 시트 컬럼
+DEVIATION_COLUMNS = {
+    "Product": "모델명",
+    "Flow Rate": "유량",
+    "Head": "토출양정",
+    "Total Head": "전양정",
+    "Shaft Power": "축동력",
+    "Test ID": "시험번호",
+}
+
+
+def _as_excel_source(source):
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
+
+# 템플릿에 필요한 셀 좌표 {(행, 열): None}
+def _needed_cells(template):
+    cols = [column_index_from_string(c) for c in template["columns"]]
+    cells = {(r, c) for r in template["rows"].values() for c in cols}
+    cells |= {coordinate_to_tuple(ref) for ref in template["cells"].values()}
+    return cells
+
+
+# 읽기 전용(스트리밍) 모드로 필요한 셀만 읽음 - 마지막 행 이후는 읽지 않음
+def read_cells(source, template=REPORT_TEMPLATE):
+    needed = _needed_cells(template)
+    min_row = min(r for r, _ in needed)
+    max_row = max(r for r, _ in needed)
+    min_col = min(c for _, c in needed)
+    max_col = max(c for _, c in needed)
+
+    wb = openpyxl.load_workbook(_as_excel_source(source), read_only=True, data_only=True)
+    try:
+        if template["sheet"] not in wb.sheetnames:
+            raise ValueError(f"Worksheet named '{template['sheet']}' not found")
+        ws = wb[template["sheet"]]
+        values = {}
+        rows = ws.iter_rows(min_row=min_row, max_row=max_row,
+                            min_col=min_col, max_col=max_col, values_only=True)
+        for r, row in enumerate(rows, start=min_row):
+            for c, value in enumerate(row, start=min_col):
+                if (r, c) in needed:
+                    values[(r, c)] = value
+    finally:
+        wb.close()
+    return values
+
+
+# 성적서 한 장에서 측정값 추출
+def extract_report(source, template=REPORT_TEMPLATE):
+    values = read_cells(source, template)
+    cols = [column_index_from_string(c) for c in template["columns"]]
+    sample = pd.DataFrame({
+        name: pd.to_numeric(pd.Series([values.get((row, c)) for c in cols], dtype=object),
+                            errors="coerce").astype("float64")
+        for name, row in template["rows"].items()
+    })
+    for name, ref in template["cells"].items():
+        sample[name] = values.get(coordinate_to_tuple(ref))
+    return sample.dropna()
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from pumpcurve import efficiency, fitting
+from pumpcurve.curve_store import extract_series
+
+# 순위 점수 가중치 (여유율, 축동력, BEP 거리)
+DEFAULT_WEIGHTS = {"margin": 1.0, "power": 1.0, "bep": 1.0}
+
+# 양정 허용 비율 하한 (0 이면 여유율 점수가 0 으로 나뉨)
+MIN_TOL = 1e-3
+
+
+# 피팅 계수로 만든 운전점 검색용 인덱스 (모델 축 배열)
+class DutyIndex:
+
+    # summary: efficiency.summarize 결과가 있으면 BEP 를 다시 계산하지 않고 사용
+    def __init__(self, fits, source="reference data", summary=None):
+        h = fitting.select(fits, source, "h").dropna(subset=["c0"])
+        kw = fitting.select(fits, source, "kw").reindex(h.index)
+        cols = [c for c in h.columns if c.startswith("c") and c[1:].isdigit()]
+        self.source = source
+        self.models = h.index.to_numpy(dtype=object)
+        self.series = extract_series(self.models).to_numpy(dtype=object)
+        self.coef_h = h[cols].to_numpy(dtype=np.float64)
+        self.coef_kw = kw[cols].to_numpy(dtype=np.float64)
+        self.q_scale = h["q_scale"].to_numpy(dtype=np.float64)
+        self.kw_scale = kw["q_scale"].to_numpy(dtype=np.float64)
+        self.q_min = h["q_min"].to_numpy(dtype=np.float64)
+        self.q_max = h["q_max"].to_numpy(dtype=np.float64)
+        if summary is not None:
+            bep = efficiency.select(summary, source).reindex(self.models)
+            self.q_bep = bep["q_bep"].to_numpy(dtype=np.float64)
+            self.eta_bep = bep["eta_bep"].to_numpy(dtype=np.float64)
+        else:
+            self.q_bep, _, _, self.eta_bep = efficiency.bep(
+                self.coef_h, self.q_scale, self.coef_kw, self.kw_scale, self.q_min, self.q_max)
+
+    def __len__(self):
+        return len(self.models)
+
+    # 요구 운전점 (Q, H) 를 허용 오차 안에서 지나는 모델 상위 k 개
+    # tol: 양정 허용 비율 (0.05 = ±5%, MIN_TOL 미만은 MIN_TOL), allow_under: 요구 양정 미달 허용 여부
+    # 여유율은 요구 양정 대비 비율이므로 h 는 0 보다 커야 함
+    def query(self, q, h, tol=0.05, top_k=10, allow_under=False, series=None, weights=None):
+        if not h > 0:
+            raise ValueError(f"요구 양정은 0 보다 커야 합니다: {h}")
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        tol = max(tol, MIN_TOL)
+        in_range = (self.q_min <= q) & (q <= self.q_max)
+        if series:
+            in_range &= np.isin(self.series, list(series))
+        idx = np.flatnonzero(in_range)
+
+        h_at = fitting.evaluate(self.coef_h[idx], self.q_scale[idx], np.array([q]))[:, 0]
+        kw_at = fitting.evaluate(self.coef_kw[idx], self.kw_scale[idx], np.array([q]))[:, 0]
+        margin = (h_at - h) / h
+        ok = margin <= tol
+        ok &= (margin >= -tol) if allow_under else (margin >= 0)
+        idx, h_at, kw_at, margin = idx[ok], h_at[ok], kw_at[ok], margin[ok]
+
+        bep_dist = np.abs(q / self.q_bep[idx] - 1)
+        eta_at = efficiency.efficiency(q, h_at, kw_at)
+        kw_min = np.nanmin(kw_at) if len(kw_at) and np.isfinite(kw_at).any() else np.nan
+        score = (weights["margin"] * np.abs(margin) / tol
+                 + weights["power"] * np.nan_to_num(kw_at / kw_min - 1, nan=1.0)
+                 + weights["bep"] * np.nan_to_num(bep_dist, nan=1.0))
+        order = np.argsort(score, kind="stable")[:top_k]
+
+        return pd.DataFrame({
+            "모델": self.models[idx][order],
+            "시리즈": self.series[idx][order],
+            "양정@Q (m)": h_at[order],
+            "여유율 (%)": margin[order] * 100,
+            "축동력@Q (kW)": kw_at[order],
+            "효율@Q (%)": eta_at[order] * 100,
+            "BEP 유량": self.q_bep[idx][order],
+            "BEP 거리 (%)": bep_dist[order] * 100,
+            "BEP 효율 (%)": self.eta_bep[idx][order] * 100,
+            "점수": score[order],
+        })
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from pumpcurve import efficiency, fitting
+
+# 교점 탐색용 재샘플링 점 수 / 이분법 반복 횟수
+GRID_POINTS = 64
+BISECT_STEPS = 40
+
+
+# 시스템 곡선 H = Hs + k·Q² (Q [L/min], H [m])
+def system_head(q, h_static, k):
+    q = np.asarray(q, dtype=np.float64)
+    return np.asarray(h_static, dtype=np.float64) + np.asarray(k, dtype=np.float64) * q ** 2
+
+
+# 설계 운전점 (Q, H) 를 지나는 시스템 곡선의 k
+def k_from_duty(h_static, q, h):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(np.asarray(q) > 0, (np.asarray(h) - np.asarray(h_static)) / np.asarray(q) ** 2,
+                        np.nan)
+
+
+# 피팅 곡선 (M 개) 과 시스템 곡선 (S 개) 의 교점을 M×S 한 번에 계산
+# 격자에서 펌프 양정이 시스템 양정 아래로 처음 내려가는 구간을 찾은 뒤 이분법으로 보정
+# 반환: q, h (M, S), 교점이 피팅 유량 범위 안에 없으면 NaN
+def intersect(coef_h, q_scale, q_min, q_max, h_static, k, points=GRID_POINTS, steps=BISECT_STEPS):
+    m, s = len(q_min), len(h_static)
+    if not m or not s:
+        return np.full((m, s), np.nan), np.full((m, s), np.nan)
+    rows = np.repeat(np.arange(m), s)
+    coefs, scale = coef_h[rows], q_scale[rows]
+    hs = np.tile(np.asarray(h_static, dtype=np.float64), m)
+    kk = np.tile(np.asarray(k, dtype=np.float64), m)
+
+    def gap(q):
+        return fitting.evaluate(coefs, scale, q) - system_head(q, hs[:, None], kk[:, None])
+
+    t = np.linspace(0.0, 1.0, points)
+    grid = q_min[rows, None] + (q_max - q_min)[rows, None] * t
+    diff = gap(grid)
+    cross = (diff[:, :-1] >= 0) & (diff[:, 1:] < 0)
+    found = cross.any(axis=1)
+    j = np.argmax(cross, axis=1)
+    lo = grid[np.arange(len(rows)), j]
+    hi = grid[np.arange(len(rows)), j + 1]
+
+    for _ in range(steps):
+        mid = 0.5 * (lo + hi)
+        above = gap(mid[:, None])[:, 0] >= 0
+        lo = np.where(above, mid, lo)
+        hi = np.where(above, hi, mid)
+
+    q = np.where(found, 0.5 * (lo + hi), np.nan)
+    h = system_head(q, hs, kk)
+    return q.reshape(m, s), h.reshape(m, s)
+
+
+# 선택 모델 × 시스템 곡선의 운전점 (Q, H, kW, η)
+# index: selection.DutyIndex (모델 축 피팅 계수), systems: [(Hs, k), ...] 또는 DataFrame(h_static, k)
+def operating_points(index, systems, models=None, labels=None):
+    systems = pd.DataFrame(systems, columns=["h_static", "k"]) if not isinstance(systems, pd.DataFrame) \
+        else systems[["h_static", "k"]]
+    pos = np.arange(len(index)) if models is None else pd.Index(index.models).get_indexer(list(models))
+    pos = pos[pos >= 0]
+    h_static = systems["h_static"].to_numpy(dtype=np.float64)
+    k = systems["k"].to_numpy(dtype=np.float64)
+    labels = list(labels) if labels is not None else [f"System {i + 1}" for i in range(len(systems))]
+
+    q, h = intersect(index.coef_h[pos], index.q_scale[pos], index.q_min[pos], index.q_max[pos], h_static, k)
+    kw = fitting.evaluate(index.coef_kw[pos], index.kw_scale[pos], q)
+    eta = efficiency.efficiency(q, h, kw)
+
+    s = len(systems)
+    return pd.DataFrame({
+        "모델": np.repeat(index.models[pos], s),
+        "시리즈": np.repeat(index.series[pos], s),
+        "시스템": np.tile(np.asarray(labels, dtype=object), len(pos)),
+        "Q (L/min)": q.ravel(),
+        "H (m)": h.ravel(),
+        "축동력 (kW)": kw.ravel(),
+        "효율 (%)": eta.ravel() * 100,
+        "BEP 대비 (%)": (q / index.q_bep[pos, None]).ravel() * 100,
+    })
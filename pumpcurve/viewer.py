@@ -0,0 +1,109 @@
+import numpy as np
+import plotly.graph_objs as go
+
+from pumpcurve.curve_store import extract_series
+
+# 뷰어 공통 영문 컬럼명
+COLUMN_MAP = {
+    "토출양정": "Total Head",
+    "전양정": "Total Head",  # fallback
+    "토출량": "Capacity",
+    "유량": "Capacity",
+    "모델": "Model",
+    "모델명": "Model",
+}
+
+# 줌/팬 강제 설정
+CHART_CONFIG = {
+    "scrollZoom": True,
+    "modeBarButtonsToAdd": ["zoom2d", "pan2d"],
+    "displaylogo": False,
+}
+
+
+# 컬럼명 정리 + 영문 컬럼명 통일 + 시리즈 추출 (같은 이름이 되는 컬럼은 앞의 것만 사용)
+def clean_frame(df, column_map=COLUMN_MAP, model_col="Model"):
+    df = df.copy()
+    df.columns = [str(c).strip() for c in df.columns]
+    df = df.rename(columns=column_map)
+    df = df.loc[:, ~df.columns.duplicated()]
+    if model_col in df.columns:
+        df["Series"] = extract_series(df[model_col]).to_numpy()
+    return df
+
+
+# clean_frame 결과 컬럼 -> 원본 시트 컬럼 (편집 내용 저장용, 파생 컬럼 제외)
+def source_columns(columns, column_map=COLUMN_MAP):
+    mapping = {}
+    for col in columns:
+        name = str(col).strip()
+        mapping.setdefault(column_map.get(name, name), name)
+    return mapping
+
+
+# 첫 점에 모델명을 표시하는 곡선 트레이스
+def labelled_trace(model, q, h, hovertemplate=None, name=None):
+    return go.Scatter(
+        x=q,
+        y=h,
+        mode="lines+markers+text",
+        name=name or model,
+        text=[model] + [""] * (len(q) - 1),
+        textposition="top left",
+        hovertemplate=hovertemplate,
+    )
+
+
+# 수직/수평 보조선 (0 이하는 표시 안 함)
+def add_guide_lines(fig, x_line, y_line):
+    if x_line > 0:
+        fig.add_vline(x=x_line, line_width=2, line_dash="dash", line_color="red")
+    if y_line > 0:
+        fig.add_hline(y=y_line, line_width=2, line_dash="dash", line_color="blue")
+
+
+# 수평/수직 보조선 (None 이면 표시 안 함, 축 전체 길이)
+def add_guides(fig, hline, vline):
+    if hline is not None:
+        fig.add_shape(type="line", xref="paper", x0=0, x1=1, yref="y", y0=hline, y1=hline,
+                      line=dict(color="red", dash="dash"))
+    if vline is not None:
+        fig.add_shape(type="line", xref="x", x0=vline, x1=vline, yref="paper", y0=0, y1=1,
+                      line=dict(color="blue", dash="dash"))
+
+
+# Q-H 곡선 화면 공통 레이아웃
+def curve_layout(fig, height=900, width=1500, yaxis_title="Total Head (m)", **layout):
+    fig.update_layout(
+        xaxis_title="Capacity (L/min)",
+        yaxis_title=yaxis_title,
+        height=height,
+        width=width,
+        hovermode="closest",
+        showlegend=True,
+        **layout
+    )
+    fig.update_xaxes(showgrid=True)
+    fig.update_yaxes(showgrid=True)
+    return fig
+
+
+def enable_pan_zoom(fig):
+    fig.update_layout(
+        dragmode="pan",
+        xaxis=dict(fixedrange=False),
+        yaxis=dict(fixedrange=False)
+    )
+    return fig
+
+
+# 시스템 곡선 H = Hs + k·Q² (0 ~ q_max)
+def add_system_curve(fig, h_static, k, q_max, name="System", points=50):
+    q = np.linspace(0, q_max, points)
+    fig.add_trace(go.Scatter(
+        x=q, y=h_static + k * q ** 2,
+        mode="lines",
+        name=name,
+        line=dict(color="black", dash="dashdot"),
+        hovertemplate=name + "<br>Capacity: %{x:.1f} L/min<br>Head: %{y:.1f} m<extra></extra>",
+    ))
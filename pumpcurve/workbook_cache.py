@@ -0,0 +1,312 @@
+import hashlib
+import io
+import json
+import os
+import posixpath
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from pumpcurve import perf
+
+# 마스터 워크북에서 사용하는 시트
+SHEETS = ["reference data", "catalog data", "deviation data"]
+
+# 캐시 저장 위치 (환경변수로 변경 가능)
+CACHE_DIR = os.environ.get("PUMP_CACHE_DIR", ".pump_cache")
+
+MANIFEST = "manifest.json"
+
+# 캐시 전체 크기 상한 (MB), 넘으면 오래 안 쓴 워크북부터 파생 캐시와 함께 삭제
+MAX_MB = float(os.environ.get("PUMP_CACHE_MB", "1024"))
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+
+_NS = {
+    "main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_REL_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+_SHARED_CELL = re.compile(rb'<c\b[^>]*\bt="s"[^>]*>\s*<v>(\d+)</v>')
+
+
+# 업로드 바이트의 내용 해시
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _read_bytes(source):
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if hasattr(source, "read"):
+        return source.read()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+# 시트별 내용 해시 {시트: 해시} (워크북에 없는 시트는 None)
+# xlsx/xlsm 은 zip 안의 시트 XML 과 그 시트가 참조하는 공유 문자열로 계산 (파싱 없이)
+# zip 이 아니면 모든 시트에 파일 전체 해시를 사용
+def sheet_hashes(data, sheets=SHEETS):
+    if not zipfile.is_zipfile(io.BytesIO(data)):
+        digest = content_hash(data)
+        return {name: digest for name in sheets}
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        book = ET.fromstring(zf.read("xl/workbook.xml"))
+        rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+        targets = {r.get("Id"): r.get("Target") for r in rels.findall("rel:Relationship", _NS)}
+        paths = {}
+        for sheet in book.findall("main:sheets/main:sheet", _NS):
+            target = targets.get(sheet.get(_REL_ID), "")
+            paths[sheet.get("name")] = target.lstrip("/") if target.startswith("/") \
+                else posixpath.normpath(posixpath.join("xl", target))
+        shared = None
+        hashes = {}
+        for name in sheets:
+            if name not in paths:
+                hashes[name] = None
+                continue
+            xml = zf.read(paths[name])
+            h = hashlib.sha256(xml)
+            refs = _SHARED_CELL.findall(xml)
+            if refs:
+                if shared is None:
+                    sst = ET.fromstring(zf.read("xl/sharedStrings.xml"))
+                    shared = ["".join(si.itertext()) for si in sst.findall("main:si", _NS)]
+                for i in refs:
+                    h.update(b"\0" + shared[int(i)].encode("utf-8"))
+            hashes[name] = h.hexdigest()
+    return hashes
+
+
+def _sheet_file(name):
+    return name.replace(" ", "_") + ".parquet"
+
+
+# 컬럼명 정리 + Arrow 로 저장 가능한 타입으로 변환
+def normalize_frame(df):
+    df = df.copy()
+    df.columns = [str(c).strip() for c in df.columns]
+    df = df.loc[:, ~pd.Index(df.columns).duplicated()]
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        num = pd.to_numeric(df[col], errors="coerce")
+        if num.notna().sum() == df[col].notna().sum():
+            df[col] = num
+        else:
+            df[col] = df[col].astype("string")
+    return df
+
+
+def _read_cached(path):
+    with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    frames = {}
+    for name in manifest["sheets"]:
+        frames[name] = pd.read_parquet(os.path.join(path, _sheet_file(name)))
+    for name in manifest["missing"]:
+        frames[name] = None
+    return frames
+
+
+# 워크북을 한 번만 파싱해서 시트별 DataFrame 반환 (없는 시트는 None)
+def parse_workbook(data, sheets=SHEETS):
+    frames = {}
+    with pd.ExcelFile(io.BytesIO(data)) as xls:
+        for name in sheets:
+            if name in xls.sheet_names:
+                frames[name] = normalize_frame(xls.parse(name))
+            else:
+                frames[name] = None
+    return frames
+
+
+def _cache_path(digest, cache_dir=None):
+    return os.path.join(cache_dir or CACHE_DIR, digest)
+
+
+def _write_cache(path, frames):
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent)
+    try:
+        present = [n for n, df in frames.items() if df is not None]
+        for name in present:
+            frames[name].to_parquet(os.path.join(tmp, _sheet_file(name)), index=False)
+        with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump({"sheets": present,
+                       "missing": [n for n, df in frames.items() if df is None]},
+                      f, ensure_ascii=False)
+        # 시트가 모자란 기존 항목은 옆으로 치운 뒤 교체 (비어 있지 않은 디렉터리에는 os.replace 불가)
+        if os.path.isdir(path):
+            stale = tmp + ".stale"
+            os.replace(path, stale)
+            shutil.rmtree(stale, ignore_errors=True)
+        os.replace(tmp, path)
+    except OSError:
+        # 다른 프로세스가 먼저 저장한 경우
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+# 해시 기준 캐시 조회, 없으면 파싱 후 Parquet 로 저장
+def load_workbook(source, digest=None, sheets=SHEETS, cache_dir=None):
+    data = _read_bytes(source)
+    digest = digest or content_hash(data)
+    path = _cache_path(digest, cache_dir)
+    frames = {}
+    if os.path.exists(os.path.join(path, MANIFEST)):
+        with perf.stage("parquet_load"):
+            frames = _read_cached(path)
+        if all(name in frames for name in sheets):
+            perf.current().cache_event("workbook_parquet", hit=True)
+            _touch(path)
+            return {name: frames[name] for name in sheets}
+    perf.current().cache_event("workbook_parquet", hit=False)
+    # 캐시에 없는 시트만 파싱해서 기존 항목에 합쳐 저장
+    with perf.stage("excel_parse"):
+        frames.update(parse_workbook(data, [name for name in sheets if name not in frames]))
+    _write_cache(path, dict(frames))
+    prune(cache_dir, keep=digest)
+    return {name: frames[name] for name in sheets}
+
+
+# 이미 정리된 시트 묶음을 해시 기준 캐시에 저장 (부분 재로드 후 다른 프로세스용)
+def save_frames(digest, frames, cache_dir=None):
+    path = _cache_path(digest, cache_dir)
+    if not os.path.exists(os.path.join(path, MANIFEST)):
+        _write_cache(path, dict(frames))
+        prune(cache_dir, keep=digest)
+
+
+# 최근 사용 시각 기록 (prune 의 LRU 순서)
+def _touch(path):
+    try:
+        os.utime(os.path.join(path, MANIFEST))
+    except OSError:
+        pass
+
+
+def _tree_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+# 캐시가 상한을 넘으면 오래 안 쓴 워크북 항목(시트 Parquet + derived/<해시>)부터 삭제
+# 반환: 삭제한 해시 목록. 수동 정리는 캐시 디렉터리를 통째로 지워도 됨 (다음 로드 때 다시 만들어짐)
+def prune(cache_dir=None, max_bytes=None, keep=None):
+    root = cache_dir or CACHE_DIR
+    max_bytes = int(MAX_MB * 2 ** 20) if max_bytes is None else max_bytes
+    try:
+        names = [n for n in os.listdir(root) if _DIGEST.fullmatch(n)]
+    except OSError:
+        return []
+    entries = []
+    for digest in names:
+        path = os.path.join(root, digest)
+        try:
+            used = os.path.getmtime(os.path.join(path, MANIFEST))
+        except OSError:
+            continue
+        derived = os.path.join(root, "derived", digest)
+        entries.append((used, digest, _tree_size(path) + _tree_size(derived)))
+    total = sum(size for _, _, size in entries)
+    removed = []
+    for _, digest, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if digest == keep:
+            continue
+        shutil.rmtree(os.path.join(root, digest), ignore_errors=True)
+        shutil.rmtree(os.path.join(root, "derived", digest), ignore_errors=True)
+        total -= size
+        removed.append(digest)
+    return removed
+
+
+def is_cached(digest, cache_dir=None):
+    return os.path.exists(os.path.join(_cache_path(digest, cache_dir), MANIFEST))
+
+
+# 워크북 한 개 로드 (파싱 결과는 Parquet 캐시에도 저장)
+def _load_one(label, digest, data, sheets, cache_dir):
+    try:
+        return label, digest, load_workbook(data, digest=digest, sheets=sheets, cache_dir=cache_dir), None
+    except Exception as e:
+        return label, digest, None, f"{type(e).__name__}: {e}"
+
+
+# pumpcurve 패키지가 있는 디렉터리 (워커의 import 경로)
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# 별도 인터프리터에서 워크북 한 개를 파싱해서 Parquet 캐시에 저장 (결과 DataFrame 은 부모가 캐시에서 읽음)
+# multiprocessing 워커는 부모의 __main__ (Streamlit 앱 스크립트) 을 다시 import 하므로 쓰지 않고,
+# 이 모듈을 -m 으로 실행하는 자식 프로세스를 띄운다 (fork 없이 exec 하므로 스레드 서버에서도 안전)
+# 반환: 오류 메시지 (성공 시 None)
+def _parse_in_worker(digest, data, sheets, cache_dir):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [_ROOT, env.get("PYTHONPATH")]))
+    proc = subprocess.run([sys.executable, "-m", "pumpcurve.workbook_cache", digest, cache_dir or CACHE_DIR, *sheets],
+                          input=data, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env)
+    if proc.returncode == 0:
+        return None
+    lines = proc.stderr.decode("utf-8", "replace").strip().splitlines()
+    return lines[-1] if lines else f"worker exit code {proc.returncode}"
+
+
+# 여러 워크북 [(라벨, 바이트 또는 업로드 파일), ...] 을 동시에 로드
+# 끝나는 순서대로 (라벨, digest, {시트: DataFrame}, 오류) 를 반환 (캐시에 있는 파일이 먼저)
+# 새로 파싱할 파일이 둘 이상일 때만 워커 프로세스 사용 (workers 개씩 동시 실행)
+def iter_workbooks(sources, workers=None, sheets=SHEETS, cache_dir=None):
+    jobs = []
+    for label, source in sources:
+        data = _read_bytes(source)
+        digest = content_hash(data)
+        if is_cached(digest, cache_dir) or len(sources) == 1:
+            yield _load_one(label, digest, data, sheets, cache_dir)
+        else:
+            jobs.append((label, digest, data))
+    if len(jobs) == 1:
+        yield _load_one(*jobs[0], sheets, cache_dir)
+    elif jobs:
+        with ThreadPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(jobs))) as pool:
+            futures = {pool.submit(_parse_in_worker, digest, data, sheets, cache_dir): (label, digest, data)
+                       for label, digest, data in jobs}
+            for fut in as_completed(futures):
+                label, digest, _ = futures[fut]
+                error = fut.result()
+                if error is not None:
+                    yield label, digest, None, error
+                    continue
+                perf.current().cache_event("workbook_parquet", hit=False)
+                with perf.stage("parquet_load"):
+                    frames = _read_cached(_cache_path(digest, cache_dir))
+                yield label, digest, {name: frames[name] for name in sheets}, None
+
+
+# 워크북 해시에 딸린 파생 캐시(피팅 결과 등) 파일 경로
+def derived_path(digest, name, cache_dir=None):
+    path = os.path.join(cache_dir or CACHE_DIR, "derived", digest)
+    os.makedirs(path, exist_ok=True)
+    return os.path.join(path, name)
+
+
+# 워커 프로세스 진입점: python -m pumpcurve.workbook_cache <digest> <캐시 디렉터리> <시트 ...>
+# 표준 입력으로 받은 워크북 바이트를 파싱해서 캐시에 저장
+if __name__ == "__main__":
+    load_workbook(sys.stdin.buffer.read(), digest=sys.argv[1], sheets=sys.argv[3:], cache_dir=sys.argv[2])
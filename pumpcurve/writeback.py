@@ -0,0 +1,175 @@
+import io
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from pumpcurve import perf, workbook_cache
+
+# 헤더 행을 찾을 때 확인하는 최대 행 수
+HEADER_SCAN_ROWS = 20
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+XLSM_MIME = "application/vnd.ms-excel.sheet.macroEnabled.12"
+
+
+# st.data_editor 편집 상태(session_state[key]) -> 셀 단위 변경
+# base_df: 편집기에 넘긴 DataFrame (index 는 시트에서 읽은 행 순서 그대로)
+# columns: {화면 컬럼: 시트 컬럼}, 여기에 없는 컬럼(파생 컬럼 등)은 저장하지 않음
+# 반환: {"cells": [(행 index, 시트 컬럼, 이전 값, 새 값)], "added": [{시트 컬럼: 값}], "deleted": [행 index],
+#        "columns": [시트 컬럼]} (columns 는 삭제만 있을 때도 헤더 행을 찾기 위함)
+def collect_changes(base_df, state, columns):
+    state = state or {}
+    deleted = sorted({int(base_df.index[int(p)]) for p in state.get("deleted_rows", [])})
+    cells = []
+    for pos, edits in state.get("edited_rows", {}).items():
+        idx = int(base_df.index[int(pos)])
+        if idx in deleted:
+            continue
+        for col, value in edits.items():
+            if col in columns:
+                cells.append((idx, columns[col], base_df[col].iloc[int(pos)], value))
+    added = []
+    for row in state.get("added_rows", []):
+        values = {columns[c]: v for c, v in row.items() if c in columns and not _is_blank(v)}
+        if values:
+            added.append(values)
+    return {"cells": cells, "added": added, "deleted": deleted, "columns": sorted(set(columns.values()))}
+
+
+def count_changes(changes):
+    return len(changes["cells"]) + len(changes["added"]) + len(changes["deleted"])
+
+
+def _is_blank(value):
+    return value is None or (isinstance(value, str) and value == "") or \
+        (not isinstance(value, str) and bool(pd.isna(value)))
+
+
+# 셀에 쓸 값 (numpy 스칼라 -> 파이썬 값, 결측 -> 빈 셀)
+def _cell_value(value):
+    if _is_blank(value):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+# 시트의 현재 값과 편집 전 값이 같은지 (숫자는 부동소수 오차 허용)
+def _same(current, old):
+    if _is_blank(current) or _is_blank(old):
+        return _is_blank(current) and _is_blank(old)
+    try:
+        return bool(np.isclose(float(current), float(old)))
+    except (TypeError, ValueError):
+        return str(current).strip() == str(old).strip()
+
+
+# 필요한 컬럼 이름이 모두 있는 첫 행을 헤더로 사용 -> (헤더 행 번호, {컬럼: 열 번호})
+def _header(ws, names):
+    for r, row in enumerate(ws.iter_rows(max_row=HEADER_SCAN_ROWS, values_only=True), start=1):
+        cols = {}
+        for c, value in enumerate(row, start=1):
+            if value is not None:
+                cols.setdefault(str(value).strip(), c)
+        if all(n in cols for n in names):
+            return r, cols
+    raise ValueError(f"헤더 행을 찾을 수 없습니다: {', '.join(sorted(names))}")
+
+
+# DataFrame 행 index -> 엑셀 행 번호 (pandas 는 중간의 빈 행도 NaN 행으로 유지, 끝의 빈 행만 제외)
+def _data_rows(ws, header_row):
+    last = header_row
+    for r, row in enumerate(ws.iter_rows(min_row=header_row + 1, values_only=True), start=header_row + 1):
+        if any(not _is_blank(v) for v in row):
+            last = r
+    return list(range(header_row + 1, last + 1))
+
+
+# 원본 워크북에 변경된 셀만 반영한 바이트 (시트 전체를 다시 쓰지 않으므로 서식/매크로 유지)
+# 편집 전 값이 현재 시트 값과 다르거나 수식 셀이면 아무것도 쓰지 않고 ValueError
+def apply_changes(source, sheet, changes, name=None):
+    import openpyxl
+
+    data = workbook_cache._read_bytes(source)
+    if not zipfile.is_zipfile(io.BytesIO(data)):
+        raise ValueError("xlsx / xlsm 파일만 저장할 수 있습니다.")
+    name = name or getattr(source, "name", None) or (source if isinstance(source, str) else "")
+    keep_vba = str(name).lower().endswith(".xlsm")
+    wb = openpyxl.load_workbook(io.BytesIO(data), keep_vba=keep_vba)
+    if sheet not in wb.sheetnames:
+        raise ValueError(f"시트가 없습니다: {sheet}")
+    ws = wb[sheet]
+
+    names = set(changes.get("columns", ())) | {c for _, c, _, _ in changes["cells"]} | \
+        {c for row in changes["added"] for c in row}
+    if not names:
+        raise ValueError("헤더 행을 찾을 컬럼 이름이 없습니다.")
+    header_row, cols = _header(ws, names)
+    rows = _data_rows(ws, header_row)
+
+    conflicts = []
+    writes = []
+    for idx, col, old, new in changes["cells"]:
+        if idx >= len(rows):
+            conflicts.append(f"{idx + 1}번째 행이 시트에 없습니다.")
+            continue
+        cell = ws.cell(row=rows[idx], column=cols[col])
+        if cell.data_type == "f" or not _same(cell.value, old):
+            conflicts.append(f"{cell.coordinate} ({col}): 시트 값 {cell.value!r} ≠ 편집 전 값 {_cell_value(old)!r}")
+            continue
+        writes.append((cell, _cell_value(new)))
+    if conflicts:
+        raise ValueError("원본 파일과 편집 기준 데이터가 다릅니다.\n" + "\n".join(conflicts))
+
+    for cell, value in writes:
+        cell.value = value
+    # 삭제 행은 행을 당기지 않고 비움 (다른 행 번호가 바뀌지 않도록)
+    for idx in changes["deleted"]:
+        if idx < len(rows):
+            for cell in ws[rows[idx]]:
+                cell.value = None
+    last = max(rows[-1] if rows else header_row, header_row)
+    for i, values in enumerate(changes["added"], start=1):
+        for col, value in values.items():
+            ws.cell(row=last + i, column=cols[col], value=_cell_value(value))
+
+    out = io.BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+# 서버의 원본 파일에 바로 반영 (임시 파일에 쓴 뒤 교체)
+def write_back(path, sheet, changes):
+    data = apply_changes(path, sheet, changes)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# 편집기 아래 저장 패널: 변경 셀만 반영한 원본 워크북을 다운로드
+def save_panel(uploaded_file, sheet, base_df, editor_key, columns):
+    import streamlit as st
+
+    changes = collect_changes(base_df, st.session_state.get(editor_key), columns)
+    n = count_changes(changes)
+    if not n:
+        st.caption("💾 저장할 변경 사항이 없습니다.")
+        return
+    signature = repr(changes)
+    saved_key = editor_key + "_saved"
+    if st.button(f"💾 변경 {n}건을 원본 파일에 반영", key=editor_key + "_save"):
+        try:
+            with perf.stage("write_back"):
+                data = apply_changes(uploaded_file, sheet, changes, name=uploaded_file.name)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        st.session_state[saved_key] = (signature, data)
+    saved = st.session_state.get(saved_key)
+    if saved and saved[0] == signature:
+        is_xlsm = uploaded_file.name.lower().endswith(".xlsm")
+        st.download_button("⬇️ 수정된 워크북 다운로드", saved[1], file_name=uploaded_file.name,
+                           mime=XLSM_MIME if is_xlsm else XLSX_MIME, key=editor_key + "_download")
@@ -0,0 +1,16 @@
+import pytest
+
+from pumpcurve import fitting, selection
+from pumpcurve.curve_store import CurveStore
+from pumpdata import pump_frame
+
+
+@pytest.fixture
+def analytic_store():
+    return CurveStore.from_frames({"reference data": pump_frame()})
+
+
+# 해석 곡선의 피팅 계수 인덱스 (2차 / 1차 곡선이므로 피팅이 정확히 일치)
+@pytest.fixture
+def analytic_index(analytic_store):
+    return selection.DutyIndex(fitting.fit_all(analytic_store, sources=("reference data",)))
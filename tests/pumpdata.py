@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+# 해석 곡선 펌프 {모델: (H0, A, P0, B)} - H = H0 - A·Q², kW = P0 + B·Q (Q [L/min])
+PUMPS = {
+    "XRF10-1": (50.0, 2e-5, 2.0, 4e-3),
+    "XRF10-2": (40.0, 2e-5, 1.5, 3e-3),
+}
+Q_POINTS = np.linspace(100.0, 1400.0, 14)
+
+
+def pump_head(model, q):
+    h0, a, _, _ = PUMPS[model]
+    return h0 - a * np.asarray(q, dtype=np.float64) ** 2
+
+
+def pump_power(model, q):
+    _, _, p0, b = PUMPS[model]
+    return p0 + b * np.asarray(q, dtype=np.float64)
+
+
+# reference 시트 형식 (모델, 토출량, 토출양정, 축동력)
+def pump_frame(models=tuple(PUMPS), q=Q_POINTS):
+    return pd.DataFrame({
+        "모델": np.repeat(list(models), len(q)),
+        "토출량": np.tile(q, len(models)),
+        "토출양정": np.concatenate([pump_head(m, q) for m in models]),
+        "축동력": np.concatenate([pump_power(m, q) for m in models]),
+    })
+
+
+# 마스터 워크북 세 시트 (catalog / deviation 은 실제 시트처럼 컬럼 이름이 다름)
+def master_frames(head_scale=1.0):
+    ref = pump_frame()
+    ref["토출양정"] *= head_scale
+    catalog = ref.rename(columns={"모델": "모델명", "토출량": "유량", "토출양정": "토출양정&전양정"})
+    deviation = ref.rename(columns={"모델": "모델명", "토출량": "유량"})
+    return {"reference data": ref, "catalog data": catalog, "deviation data": deviation}
+
+
+def workbook_bytes(frames, path):
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for name, df in frames.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    with open(path, "rb") as f:
+        return f.read()
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from pumpcurve import affinity
+from pumpdata import Q_POINTS, pump_head, pump_power
+
+
+def test_family_follows_affinity_laws():
+    h, kw = pump_head("XRF10-1", Q_POINTS), pump_power("XRF10-1", Q_POINTS)
+    speeds, diameters = (0.5, 1.0), (0.9, 1.0)
+    fq, fh, fkw = affinity.family(Q_POINTS, h, kw, speeds, diameters)
+    assert fq.shape == fh.shape == fkw.shape == (2, 2, len(Q_POINTS))
+    for i, n in enumerate(speeds):
+        for j, d in enumerate(diameters):
+            r = n * d
+            assert fq[i, j] == pytest.approx(Q_POINTS * r)
+            assert fh[i, j] == pytest.approx(h * r ** 2)
+            assert fkw[i, j] == pytest.approx(kw * r ** 3)
+    assert np.array_equal(fq[1, 1], Q_POINTS)
+
+
+# 상사 곡선 위의 점은 원점을 지나는 포물선 H = (H₁/Q₁²)·Q² 위에 있어야 함
+def test_scaled_points_stay_on_affinity_parabola():
+    h, kw = pump_head("XRF10-1", Q_POINTS), pump_power("XRF10-1", Q_POINTS)
+    fq, fh, _ = affinity.family(Q_POINTS, h, kw, speeds=(0.6, 0.8, 1.0))
+    ratio = fh / fq ** 2
+    assert ratio == pytest.approx(np.broadcast_to(h / Q_POINTS ** 2, ratio.shape))
+
+
+def test_labels_and_speed_ratios():
+    assert affinity.family_labels((0.8, 1.0), (0.9,)) == ["n 80% / D 90%", "n 100% / D 90%"]
+    assert affinity.speed_ratios(3600, [1800, 3600]) == (0.5, 1.0)
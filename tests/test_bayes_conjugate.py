@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pumpcurve import bayes
+from pumpcurve.curve_store import CurveStore
+
+
+def _store(groups):
+    df = pd.concat([pd.DataFrame({"모델명": m, "유량": q, "토출양정": y}) for m, q, y in groups], ignore_index=True)
+    return CurveStore.from_frame(df, "deviation data")
+
+
+# Normal-Inverse-Gamma 갱신식을 모델 하나씩 직접 계산
+def _closed_form(q, y, prior):
+    X = np.c_[np.ones_like(q), q]
+    mu0 = np.asarray(prior["mu"], dtype=np.float64)
+    prec0 = np.diag(1 / np.asarray(prior["sd"], dtype=np.float64) ** 2)
+    prec_n = prec0 + X.T @ X
+    m_n = np.linalg.solve(prec_n, prec0 @ mu0 + X.T @ y)
+    a_n = prior["a0"] + len(y) / 2
+    b_n = prior["b0"] + 0.5 * (y @ y + mu0 @ prec0 @ mu0 - m_n @ prec_n @ m_n)
+    return m_n, np.linalg.inv(prec_n), a_n, b_n
+
+
+def test_matches_closed_form_per_model():
+    rng = np.random.default_rng(1)
+    prior = {"mu": (30.0, -0.01), "sd": (5.0, 0.02), "a0": 2.0, "b0": 3.0}
+    groups = []
+    for i, n in enumerate([3, 6, 10]):
+        q = np.sort(rng.uniform(0, 500, n))
+        groups.append((f"XRF5-{i + 1}", q, 35 - 0.02 * q + rng.normal(0, 1, n)))
+    post = bayes.conjugate_posterior(_store(groups), "deviation data", "h", prior).set_index("model")
+
+    for model, q, y in groups:
+        m_n, V_n, a_n, b_n = _closed_form(q, y, {**bayes.PRIOR, **prior})
+        row = post.loc[model]
+        assert row["n"] == len(q)
+        assert [row["m0"], row["m1"]] == pytest.approx(m_n, rel=1e-9)
+        assert [row["v00"], row["v01"], row["v11"]] == pytest.approx([V_n[0, 0], V_n[0, 1], V_n[1, 1]], rel=1e-9)
+        assert row["a_n"] == pytest.approx(a_n)
+        assert row["b_n"] == pytest.approx(b_n, rel=1e-9)
+
+
+# 사전분포가 거의 평평하면 사후 평균 = 최소제곱 직선, b_n = b0 + 잔차제곱합 / 2
+def test_flat_prior_reduces_to_least_squares():
+    q = np.array([0.0, 100.0, 200.0, 300.0, 400.0])
+    y = np.array([40.2, 37.9, 36.1, 33.8, 32.0])
+    prior = {"mu": (0.0, 0.0), "sd": (1e8, 1e8), "a0": 1.0, "b0": 1.0}
+    row = bayes.conjugate_posterior(_store([("XRF5-1", q, y)]), "deviation data", "h", prior).iloc[0]
+
+    slope, intercept = np.polyfit(q, y, 1)
+    ssr = np.sum((y - (intercept + slope * q)) ** 2)
+    assert row["m0"] == pytest.approx(intercept, rel=1e-6)
+    assert row["m1"] == pytest.approx(slope, rel=1e-6)
+    assert row["a_n"] == pytest.approx(1.0 + len(q) / 2)
+    assert row["b_n"] == pytest.approx(1.0 + ssr / 2, rel=1e-4)
+
+
+def test_summary_and_draws_follow_the_posterior():
+    rng = np.random.default_rng(2)
+    q = np.linspace(0, 400, 12)
+    y = 40 - 0.02 * q + rng.normal(0, 0.5, len(q))
+    row = bayes.conjugate_posterior(_store([("XRF5-1", q, y)]), "deviation data", "h").iloc[0]
+
+    summary = bayes.posterior_summary(row)
+    nu, s2 = 2 * row["a_n"], row["b_n"] / row["a_n"]
+    assert summary.loc["alpha", "mean"] == pytest.approx(row["m0"])
+    assert summary.loc["beta", "sd"] == pytest.approx(np.sqrt(s2 * row["v11"] * nu / (nu - 2)))
+
+    draws = bayes.posterior_draws(row, draws=20000, chains=2, seed=0)
+    for name in ("alpha", "beta"):
+        assert draws[name].mean() == pytest.approx(summary.loc[name, "mean"], abs=4 * summary.loc[name, "sd"] / 200)
+        assert draws[name].std() == pytest.approx(summary.loc[name, "sd"], rel=0.03)
+    assert draws["sigma"].mean() == pytest.approx(summary.loc["sigma", "mean"], rel=0.01)
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pumpcurve import bayes
+from pumpcurve.curve_store import CurveStore
+
+az = pytest.importorskip("arviz")
+
+
+def _series_store(offset=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    parts = []
+    for i, (h0, slope) in enumerate([(40.0, -0.020), (45.0, -0.022), (50.0, -0.025)]):
+        q = np.linspace(100, 1000, 8)
+        parts.append(pd.DataFrame({"모델명": f"XRF10-{i + 1}", "유량": q,
+                                   "토출양정": h0 + offset + slope * q + rng.normal(0, 0.3, len(q))}))
+    parts.append(pd.DataFrame({"모델명": "XRF15-1", "유량": [100.0, 500.0], "토출양정": [60.0, 50.0]}))
+    return CurveStore.from_frame(pd.concat(parts, ignore_index=True), "deviation data")
+
+
+@pytest.fixture
+def fake_fit(monkeypatch):
+    calls = []
+
+    def fit(models, idx, q, y, prior=None, sample_kwargs=None):
+        calls.append(len(q))
+        return az.from_dict(posterior={"alpha": np.zeros((1, 2, len(models)))})
+
+    monkeypatch.setattr(bayes, "fit_hierarchical", fit)
+    return calls
+
+
+def test_series_points_selects_one_series():
+    models, idx, q, y = bayes.series_points(_series_store(), "deviation data", "XRF10", "h")
+    assert models == ["XRF10-1", "XRF10-2", "XRF10-3"]
+    assert len(q) == len(y) == 24
+    assert np.bincount(idx).tolist() == [8, 8, 8]
+
+
+def test_posterior_is_cached_and_superseded_files_removed(tmp_path, fake_fit):
+    folder = tmp_path / bayes.POSTERIOR_DIR
+    kw = {"cache_dir": str(tmp_path)}
+    bayes.load_or_fit_hierarchical(_series_store(), "deviation data", "XRF10", "h", **kw)
+    bayes.load_or_fit_hierarchical(_series_store(), "deviation data", "XRF10", "h", **kw)
+    assert fake_fit == [24]
+    first = sorted(os.listdir(folder))
+    assert len(first) == 1 and first[0].startswith("deviation_data_XRF10_h_")
+
+    # 다른 시리즈 / 다른 값 의 사후분포는 그대로 두고, 같은 시리즈의 이전 데이터 파일만 교체
+    bayes.load_or_fit_hierarchical(_series_store(), "deviation data", "XRF15", "h", **kw)
+    bayes.load_or_fit_hierarchical(_series_store(offset=1.0), "deviation data", "XRF10", "h", **kw)
+    files = sorted(os.listdir(folder))
+    assert len(fake_fit) == 3
+    assert len(files) == 2 and first[0] not in files
+    assert any(f.startswith("deviation_data_XRF15_h_") for f in files)
+
+
+def test_hierarchical_fit_recovers_lines_in_original_units():
+    pytest.importorskip("pymc")
+    store = _series_store()
+    models, idx, q, y = bayes.series_points(store, "deviation data", "XRF10", "h")
+    idata = bayes.fit_hierarchical(models, idx, q, y, sample_kwargs={
+        "draws": 300, "tune": 300, "chains": 1, "cores": 1, "random_seed": 0, "progressbar": False})
+    alpha = idata.posterior["alpha"].mean(("chain", "draw")).to_numpy()
+    beta = idata.posterior["beta"].mean(("chain", "draw")).to_numpy()
+    for i in range(len(models)):
+        slope, intercept = np.polyfit(q[idx == i], y[idx == i], 1)
+        assert alpha[i] == pytest.approx(intercept, abs=1.0)
+        assert beta[i] == pytest.approx(slope, abs=2e-3)
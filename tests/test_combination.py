@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from pumpcurve import combination
+from pumpdata import PUMPS, Q_POINTS, pump_head, pump_power
+
+
+# 해석 곡선의 역함수: H -> Q (체절 양정 위는 0)
+def pump_flow(model, head):
+    h0, a, _, _ = PUMPS[model]
+    return np.sqrt(np.clip(h0 - np.asarray(head), 0.0, None) / a)
+
+
+def test_grid_extrapolates_to_shutoff(analytic_index):
+    names, q, h, kw = combination.pump_grid(analytic_index, ["XRF10-2", "XRF10-1", "없는 모델"])
+    assert names.tolist() == ["XRF10-2", "XRF10-1"]
+    assert (q[:, 0] == 0).all() and q[:, -1] == pytest.approx(Q_POINTS[-1])
+    for i, model in enumerate(names):
+        assert h[i] == pytest.approx(pump_head(model, q[i]), rel=1e-9)
+        assert kw[i] == pytest.approx(pump_power(model, q[i]), rel=1e-9)
+
+
+def test_parallel_identical_pumps_doubles_flow(analytic_index):
+    _, q, h, kw = combination.pump_grid(analytic_index, ["XRF10-1"])
+    flow, head, power = combination.parallel(q, h, kw, [2])
+    assert head[-1] == pytest.approx(PUMPS["XRF10-1"][0])
+    expected = 2 * pump_flow("XRF10-1", head)
+    # 체절 근처는 역함수 기울기가 커서 선형 보간 오차가 큼 -> 유량 200 이상만 1% 비교
+    far = expected > 200
+    assert flow[far] == pytest.approx(expected[far], rel=1e-2)
+    assert power == pytest.approx(2 * pump_power("XRF10-1", flow / 2), rel=1e-2)
+
+
+def test_series_identical_pumps_doubles_head(analytic_index):
+    _, q, h, kw = combination.pump_grid(analytic_index, ["XRF10-1"])
+    flow, head, power = combination.series(q, h, kw, [2])
+    assert flow[0] == 0 and flow[-1] == pytest.approx(Q_POINTS[-1])
+    assert head == pytest.approx(2 * pump_head("XRF10-1", flow), rel=1e-3)
+    assert power == pytest.approx(2 * pump_power("XRF10-1", flow), rel=1e-3)
+
+
+def test_mixed_parallel_uses_highest_shutoff_head(analytic_index):
+    labels, q, h, kw = combination.build(analytic_index, ["XRF10-1", "XRF10-2"], "parallel", 1, mixed=True)
+    assert labels.tolist() == ["병렬: XRF10-1×1 + XRF10-2×1"]
+    flow, head = q[0], h[0]
+    assert head.max() == pytest.approx(PUMPS["XRF10-1"][0])
+    # 40 m (XRF10-2 체절 양정) 위에서는 XRF10-1 만 토출
+    upper = (head > PUMPS["XRF10-2"][0]) & (pump_flow("XRF10-1", head) > 200)
+    assert upper.any()
+    assert flow[upper] == pytest.approx(pump_flow("XRF10-1", head[upper]), rel=1e-2)
+    lower = (head < PUMPS["XRF10-2"][0]) & (pump_flow("XRF10-2", head) > 200)
+    expected = pump_flow("XRF10-1", head[lower]) + pump_flow("XRF10-2", head[lower])
+    assert flow[lower] == pytest.approx(expected, rel=1e-2)
+
+
+@pytest.mark.parametrize("topology", ["parallel", "series"])
+def test_build_same_model_scales_by_count(analytic_index, topology):
+    names, q, h, kw = combination.pump_grid(analytic_index, ["XRF10-1", "XRF10-2"])
+    labels, cq, ch, ckw = combination.build(analytic_index, ["XRF10-1", "XRF10-2"], topology, 3)
+    assert labels.tolist() == [f"{m} ×3 ({combination.TOPOLOGIES[topology]})" for m in names]
+    if topology == "parallel":
+        assert (cq == 3 * q).all() and (ch == h).all()
+    else:
+        assert (cq == q).all() and (ch == 3 * h).all()
+    assert (ckw == 3 * kw).all()
+
+
+def test_series_without_common_flow_range_is_nan():
+    q = np.array([[0.0, 100.0], [200.0, 300.0]])
+    h = np.array([[10.0, 5.0], [8.0, 4.0]])
+    flow, head, power = combination.series(q, h, h.copy(), [1, 1], points=5)
+    assert np.isnan(flow).all() and np.isnan(head).all() and np.isnan(power).all()
+
+
+def test_unknown_topology_raises(analytic_index):
+    with pytest.raises(ValueError):
+        combination.build(analytic_index, ["XRF10-1"], "mesh", 2)
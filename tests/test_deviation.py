@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pumpcurve import deviation
+from pumpcurve.curve_store import CurveStore
+
+# 직선 기준 곡선 (선형 보간이 정확히 일치): H = 50 - 0.02·Q, kW = 2 + 0.004·Q
+REF_Q = np.linspace(0.0, 1000.0, 11)
+
+
+def ref_head(q):
+    return 50 - 0.02 * np.asarray(q)
+
+
+def ref_power(q):
+    return 2 + 0.004 * np.asarray(q)
+
+
+# 측정점: (Q, 양정 편차 비율, 축동력 편차 비율)
+def _evaluate(points, grade):
+    q = np.array([p[0] for p in points])
+    reference = pd.DataFrame({"모델": "XRF10-1", "토출량": REF_Q, "토출양정": ref_head(REF_Q), "축동력": ref_power(REF_Q)})
+    measured = pd.DataFrame({
+        "모델명": "XRF10-1",
+        "유량": q,
+        "토출양정": ref_head(q) * (1 + np.array([p[1] for p in points])),
+        "축동력": ref_power(q) * (1 + np.array([p[2] for p in points])),
+    })
+    store = CurveStore.from_frames({"reference data": reference, "deviation data": measured})
+    return deviation.evaluate(store, grade=grade)
+
+
+@pytest.mark.parametrize("grade", list(deviation.ISO9906_GRADES))
+def test_head_and_power_tolerance_boundaries(grade):
+    tol = deviation.ISO9906_GRADES[grade]
+    inside, outside = 0.999, 1.001
+    points = [
+        (150.0, tol["head"] * inside, 0.0),
+        (250.0, -tol["head"] * inside, 0.0),
+        (350.0, tol["head"] * outside, 0.0),
+        (450.0, -tol["head"] * outside, 0.0),
+        (550.0, 0.0, tol["power"] * inside),
+        (650.0, 0.0, tol["power"] * outside),
+        # 축동력 공차는 + 방향만
+        (750.0, 0.0, -0.5),
+    ]
+    result = _evaluate(points, grade).sort_values("유량")
+    assert result["판정"].tolist() == ["PASS", "PASS", "FAIL", "FAIL", "PASS", "FAIL", "PASS"]
+    assert result["양정 판정"].tolist() == [True, True, False, False, True, True, True]
+    assert result["축동력 판정"].tolist() == [True, True, True, True, True, False, True]
+    assert result["양정 편차 (%)"].to_numpy() == pytest.approx(
+        [p[1] * 100 for p in points], abs=1e-9)
+    assert result["기준 양정"].to_numpy() == pytest.approx(ref_head([p[0] for p in points]))
+
+
+def test_grade_changes_verdict():
+    points = [(300.0, 0.04, 0.0)]
+    assert _evaluate(points, "1B")["판정"].tolist() == ["FAIL"]
+    assert _evaluate(points, "2B")["판정"].tolist() == ["PASS"]
+
+
+def test_points_outside_reference_range_have_no_reference():
+    result = _evaluate([(500.0, 0.0, 0.0), (1200.0, 0.0, 0.0)], "2B").sort_values("유량")
+    assert result["판정"].tolist() == ["PASS", "기준없음"]
+    assert np.isnan(result["기준 양정"].iloc[1])
+
+    summary = deviation.summarize(result).set_index("모델")
+    assert summary.loc["XRF10-1", ["측정점", "PASS", "FAIL", "기준없음"]].tolist() == [2, 1, 0, 1]
+    assert summary.loc["XRF10-1", "판정"] == "PASS"
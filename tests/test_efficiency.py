@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from scipy import optimize
+
+from pumpcurve import efficiency, fitting
+from pumpdata import pump_head, pump_power
+
+
+def _true_bep(model, lo, hi):
+    def neg_eta(q):
+        return -efficiency.efficiency(q, pump_head(model, q), pump_power(model, q))
+    res = optimize.minimize_scalar(neg_eta, bounds=(lo, hi), method="bounded", options={"xatol": 1e-6})
+    return res.x
+
+
+def _bep(index, q_max=None):
+    q_max = index.q_max if q_max is None else q_max
+    return efficiency.bep(index.coef_h, index.q_scale, index.coef_kw, index.kw_scale, index.q_min, q_max)
+
+
+def test_efficiency_matches_definition():
+    q, h, kw = 600.0, 30.0, 4.0
+    expected = 998.2 * 9.80665 * (q / 60000) * h / (kw * 1000)
+    assert efficiency.efficiency(q, h, kw) == pytest.approx(expected)
+    assert np.isnan(efficiency.efficiency(q, h, 0.0))
+
+
+def test_parabolic_refinement_finds_interior_bep(analytic_index):
+    q, h, kw, eta = _bep(analytic_index)
+    t = np.linspace(0.05, 1.0, efficiency.GRID_POINTS)
+    for i, model in enumerate(analytic_index.models):
+        lo, hi = analytic_index.q_min[i], analytic_index.q_max[i]
+        q_true = _true_bep(model, lo, hi)
+        grid = lo + (hi - lo) * t
+        step = grid[1] - grid[0]
+        assert lo + step < q_true < hi - step
+        # 격자 최대점보다 훨씬 가깝게 보정 (격자 간격의 1/20 이내)
+        assert abs(q[i] - q_true) < step / 20
+        assert h[i] == pytest.approx(pump_head(model, q[i]))
+        assert kw[i] == pytest.approx(pump_power(model, q[i]))
+        assert eta[i] == pytest.approx(efficiency.efficiency(q_true, pump_head(model, q_true),
+                                                             pump_power(model, q_true)), rel=1e-6)
+
+
+# 효율이 범위 끝까지 증가하면 보정 없이 끝점
+def test_bep_at_range_edge_is_not_extrapolated(analytic_index):
+    q_max = np.full(len(analytic_index), 300.0)
+    q, _, _, _ = _bep(analytic_index, q_max)
+    assert q == pytest.approx(q_max)
+
+
+def test_summary_uses_fitted_bep_and_measured_peak(analytic_store):
+    fits = fitting.fit_all(analytic_store, sources=("reference data",))
+    summary = efficiency.select(efficiency.summarize(analytic_store, fits, sources=("reference data",)),
+                                "reference data")
+    for model in summary.index:
+        q, h, kw = analytic_store.curve("reference data", model)
+        assert summary.loc[model, "eta_max"] == pytest.approx(np.nanmax(efficiency.efficiency(q, h, kw)))
+        assert summary.loc[model, "eta_bep"] >= summary.loc[model, "eta_max"] - 1e-12
+        assert summary.loc[model, "series"] == "XRF10"
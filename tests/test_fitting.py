@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pumpcurve import fitting
+from pumpcurve.curve_store import CurveStore
+from pumpdata import Q_POINTS, pump_head
+
+
+# 점 수가 서로 다른 모델 여러 개 (잡음 포함), 중간에 결측 점도 섞음
+@pytest.fixture
+def noisy_store():
+    rng = np.random.default_rng(3)
+    parts = []
+    for i, n in enumerate([4, 7, 12, 25]):
+        q = np.sort(rng.uniform(50, 2000, n))
+        h = 60 - 3e-3 * q - 1e-5 * q ** 2 + rng.normal(0, 0.5, n)
+        kw = 3 + 5e-3 * q + rng.normal(0, 0.05, n)
+        parts.append(pd.DataFrame({"모델": f"XRF20-{i + 1}", "토출량": q, "토출양정": h, "축동력": kw}))
+    df = pd.concat(parts, ignore_index=True)
+    df.loc[5, "축동력"] = np.nan
+    return CurveStore.from_frames({"reference data": df})
+
+
+@pytest.mark.parametrize("field,degree", [("h", 2), ("h", 3), ("kw", 1), ("kw", 2)])
+def test_batched_fit_matches_polyfit(noisy_store, field, degree):
+    table = fitting.fit_source(noisy_store, "reference data", field, degree, constrained=False)
+    assert len(table) == 4
+    for row in table.itertuples(index=False):
+        q, _, _ = noisy_store.curve("reference data", row.model)
+        y = noisy_store.field(field)[noisy_store.slice("reference data", row.model)]
+        ok = np.isfinite(y)
+        x = q[ok] / row.q_scale
+        coef = np.array([getattr(row, c) for c in fitting.coef_columns(degree)])
+        if ok.sum() <= degree:
+            assert np.isnan(coef).all()
+            continue
+        expected = np.polyfit(x, y[ok], degree)[::-1]
+        assert coef == pytest.approx(expected, rel=1e-6, abs=1e-8)
+        assert row.n == ok.sum()
+        fitted = np.polyval(expected[::-1], x)
+        assert row.rmse == pytest.approx(np.sqrt(np.mean((y[ok] - fitted) ** 2)), rel=1e-6, abs=1e-8)
+        ss_tot = np.sum((y[ok] - y[ok].mean()) ** 2)
+        assert row.r2 == pytest.approx(1 - np.sum((y[ok] - fitted) ** 2) / ss_tot, rel=1e-6)
+
+
+def test_too_few_points_give_nan_coefficients():
+    df = pd.DataFrame({"모델": ["XRF3-1"] * 2, "토출량": [10.0, 20.0], "토출양정": [30.0, 25.0]})
+    table = fitting.fit_source(CurveStore.from_frame(df, "reference data"), "reference data", "h", 2)
+    assert table[fitting.coef_columns(2)].isna().all(axis=None)
+
+
+# 위로 볼록한 (c2 > 0) Q-H 데이터는 제약 피팅에서 직선으로 대체
+def test_constrained_head_fit_falls_back_to_line():
+    q = np.linspace(100, 1000, 8)
+    df = pd.DataFrame({"모델": "XRF5-1", "토출량": q, "토출양정": 40 - 0.04 * q + 2e-5 * q ** 2})
+    store = CurveStore.from_frame(df, "reference data")
+    row = fitting.fit_source(store, "reference data", "h", 2, constrained=True).iloc[0]
+    assert row["c2"] == 0
+    expected = np.polyfit(q / row["q_scale"], df["토출양정"], 1)[::-1]
+    assert [row["c0"], row["c1"]] == pytest.approx(expected, rel=1e-9)
+
+
+def test_evaluate_reproduces_analytic_curve(analytic_store):
+    table = fitting.select(fitting.fit_all(analytic_store, sources=("reference data",)), "reference data", "h")
+    coefs = table[fitting.coef_columns(2)].to_numpy()
+    out = fitting.evaluate(coefs, table["q_scale"].to_numpy(), Q_POINTS)
+    for i, model in enumerate(table.index):
+        assert out[i] == pytest.approx(pump_head(model, Q_POINTS), rel=1e-9)
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from pumpcurve import master_db, workbook_cache
+from pumpdata import master_frames, workbook_bytes
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    return {"cache_dir": str(tmp_path / "cache"), "db_dir": str(tmp_path / "db")}
+
+
+def test_refresh_reloads_only_changed_sheet(tmp_path, dirs, monkeypatch):
+    path = str(tmp_path / "master.xlsx")
+    frames = master_frames()
+    workbook_bytes(frames, path)
+    db = master_db.MasterDB.from_workbook(path, **dirs)
+    assert db.refresh() == []
+
+    ref_store = db.store(["reference data"])
+    old_dev = db.store(["deviation data"])
+    frames["deviation data"] = frames["deviation data"].assign(토출양정=frames["deviation data"]["토출양정"] + 1)
+    data = workbook_bytes(frames, path)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+    parsed = []
+    parse = workbook_cache.parse_workbook
+    monkeypatch.setattr(workbook_cache, "parse_workbook",
+                        lambda data, sheets: parsed.append(list(sheets)) or parse(data, sheets))
+    assert db.refresh() == ["deviation data"]
+    assert parsed == [["deviation data"]]
+    assert db.digest == workbook_cache.content_hash(data)
+
+    # 바뀌지 않은 시트의 곡선 저장소는 그대로, 바뀐 시트는 새 값
+    assert db.store(["reference data"]) is ref_store
+    new_dev = db.store(["deviation data"])
+    assert new_dev is not old_dev
+    assert new_dev.h == pytest.approx(old_dev.h + 1)
+
+    # 새 내용은 Parquet 캐시에도 저장되어 다른 프로세스는 파싱 없이 로드
+    monkeypatch.setattr(workbook_cache, "parse_workbook", lambda *a: pytest.fail("다시 파싱함"))
+    other = master_db.MasterDB.from_workbook(path, **dirs)
+    assert other.frame("deviation data")["토출양정"].to_numpy() == pytest.approx(new_dev.h)
+
+
+def test_frames_are_read_only_views(tmp_path, dirs):
+    data = workbook_bytes(master_frames(), tmp_path / "master.xlsx")
+    db = master_db.MasterDB.from_workbook(data, **dirs)
+    df = db.frame("reference data")
+    df["토출양정"] = 0
+    assert (db.frame("reference data")["토출양정"] != 0).all()
+    assert "catalog data" in db and db.models() == ["XRF10-1", "XRF10-2"]
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from pumpcurve import efficiency, system_curve
+from pumpdata import PUMPS, pump_head, pump_power
+
+SYSTEMS = [(10.0, 1e-5), (20.0, 3e-5), (60.0, 1e-5)]
+
+
+# H0 - A·Q² = Hs + k·Q²  ->  Q = √((H0 - Hs) / (A + k))
+def analytic_flow(model, h_static, k):
+    h0, a, _, _ = PUMPS[model]
+    return np.sqrt((h0 - h_static) / (a + k)) if h0 > h_static else np.nan
+
+
+def test_intersection_matches_analytic_solution(analytic_index):
+    hs = np.array([s[0] for s in SYSTEMS])
+    k = np.array([s[1] for s in SYSTEMS])
+    q, h = system_curve.intersect(analytic_index.coef_h, analytic_index.q_scale,
+                                  analytic_index.q_min, analytic_index.q_max, hs, k)
+    assert q.shape == (len(analytic_index), len(SYSTEMS))
+    for i, model in enumerate(analytic_index.models):
+        for j, (h_static, kk) in enumerate(SYSTEMS):
+            expected = analytic_flow(model, h_static, kk)
+            if np.isnan(expected):
+                # 체절 양정보다 높은 정압 -> 교점 없음
+                assert np.isnan(q[i, j]) and np.isnan(h[i, j])
+                continue
+            assert q[i, j] == pytest.approx(expected, rel=1e-8)
+            assert h[i, j] == pytest.approx(pump_head(model, expected), rel=1e-8)
+
+
+def test_intersection_outside_fitted_range_is_nan(analytic_index):
+    # 교점 Q ≈ 45 L/min 은 피팅 범위 (100 ~ 1400) 밖
+    q, _ = system_curve.intersect(analytic_index.coef_h, analytic_index.q_scale,
+                                  analytic_index.q_min, analytic_index.q_max, [10.0], [0.02])
+    assert np.isnan(q).all()
+
+
+def test_k_from_duty_passes_through_duty_point():
+    k = system_curve.k_from_duty(12.0, 800.0, 30.0)
+    assert system_curve.system_head(800.0, 12.0, k) == pytest.approx(30.0)
+    assert np.isnan(system_curve.k_from_duty(12.0, 0.0, 30.0))
+
+
+def test_operating_points_table(analytic_index):
+    table = system_curve.operating_points(analytic_index, SYSTEMS[:2], models=["XRF10-2"], labels=["A", "B"])
+    assert table["시스템"].tolist() == ["A", "B"]
+    q = np.array([analytic_flow("XRF10-2", hs, k) for hs, k in SYSTEMS[:2]])
+    h, kw = pump_head("XRF10-2", q), pump_power("XRF10-2", q)
+    assert table["Q (L/min)"].to_numpy() == pytest.approx(q, rel=1e-8)
+    assert table["H (m)"].to_numpy() == pytest.approx(h, rel=1e-8)
+    assert table["축동력 (kW)"].to_numpy() == pytest.approx(kw, rel=1e-8)
+    assert table["효율 (%)"].to_numpy() == pytest.approx(100 * efficiency.efficiency(q, h, kw), rel=1e-6)
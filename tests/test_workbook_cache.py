@@ -0,0 +1,88 @@
+import os
+import time
+
+import pytest
+
+from pumpcurve import workbook_cache
+from pumpdata import master_frames, workbook_bytes
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "cache")
+
+
+def _no_parse(*args, **kwargs):
+    raise AssertionError("캐시 적중인데 워크북을 다시 파싱함")
+
+
+def test_same_content_hits_parquet_cache(tmp_path, cache_dir, monkeypatch):
+    data = workbook_bytes(master_frames(), tmp_path / "a.xlsx")
+    first = workbook_cache.load_workbook(data, cache_dir=cache_dir)
+    assert workbook_cache.is_cached(workbook_cache.content_hash(data), cache_dir)
+
+    monkeypatch.setattr(workbook_cache, "parse_workbook", _no_parse)
+    second = workbook_cache.load_workbook(data, cache_dir=cache_dir)
+    for name in workbook_cache.SHEETS:
+        assert second[name].equals(first[name])
+
+
+def test_changed_workbook_is_parsed_again(tmp_path, cache_dir):
+    old = workbook_bytes(master_frames(), tmp_path / "old.xlsx")
+    new = workbook_bytes(master_frames(head_scale=1.1), tmp_path / "new.xlsx")
+    before = workbook_cache.load_workbook(old, cache_dir=cache_dir)["reference data"]
+    after = workbook_cache.load_workbook(new, cache_dir=cache_dir)["reference data"]
+
+    assert workbook_cache.content_hash(old) != workbook_cache.content_hash(new)
+    assert after["토출양정"].to_numpy() == pytest.approx(before["토출양정"].to_numpy() * 1.1)
+    # 이전 내용의 캐시는 그대로 남아서 원래 값을 돌려줌
+    again = workbook_cache.load_workbook(old, cache_dir=cache_dir)["reference data"]
+    assert again.equals(before)
+
+
+def test_sheet_hashes_track_only_changed_sheet(tmp_path):
+    frames = master_frames()
+    old = workbook_bytes(frames, tmp_path / "old.xlsx")
+    frames["deviation data"] = frames["deviation data"].assign(토출양정=0.0)
+    new = workbook_bytes(frames, tmp_path / "new.xlsx")
+
+    before, after = workbook_cache.sheet_hashes(old), workbook_cache.sheet_hashes(new)
+    assert [name for name in workbook_cache.SHEETS if before[name] != after[name]] == ["deviation data"]
+
+
+def test_partial_entry_is_completed_with_missing_sheets(tmp_path, cache_dir, monkeypatch):
+    data = workbook_bytes(master_frames(), tmp_path / "a.xlsx")
+    workbook_cache.load_workbook(data, sheets=["reference data"], cache_dir=cache_dir)
+
+    parsed = []
+    parse = workbook_cache.parse_workbook
+    monkeypatch.setattr(workbook_cache, "parse_workbook",
+                        lambda data, sheets: parsed.append(list(sheets)) or parse(data, sheets))
+    frames = workbook_cache.load_workbook(data, cache_dir=cache_dir)
+    assert parsed == [["catalog data", "deviation data"]]
+    assert all(frames[name] is not None for name in workbook_cache.SHEETS)
+
+    # 합쳐진 항목은 세 시트 모두 캐시에서 읽음
+    monkeypatch.setattr(workbook_cache, "parse_workbook", _no_parse)
+    workbook_cache.load_workbook(data, cache_dir=cache_dir)
+
+
+def test_prune_removes_least_recently_used(tmp_path, cache_dir):
+    datas = [workbook_bytes(master_frames(head_scale=1 + i / 10), tmp_path / f"{i}.xlsx") for i in range(3)]
+    digests = [workbook_cache.content_hash(d) for d in datas]
+    past = time.time() - 100
+    for i, (data, digest) in enumerate(zip(datas, digests)):
+        workbook_cache.load_workbook(data, cache_dir=cache_dir)
+        manifest = os.path.join(cache_dir, digest, workbook_cache.MANIFEST)
+        os.utime(manifest, (past + i, past + i))
+    # 첫 번째 워크북을 다시 사용 -> 가장 오래 안 쓴 것은 두 번째
+    workbook_cache.load_workbook(datas[0], cache_dir=cache_dir)
+    derived = workbook_cache.derived_path(digests[1], "fits.parquet", cache_dir)
+    open(derived, "wb").close()
+
+    size = sum(workbook_cache._tree_size(os.path.join(cache_dir, d)) for d in digests)
+    removed = workbook_cache.prune(cache_dir, max_bytes=size - 1)
+    assert removed == [digests[1]]
+    assert not workbook_cache.is_cached(digests[1], cache_dir)
+    assert not os.path.exists(derived)
+    assert workbook_cache.is_cached(digests[0], cache_dir) and workbook_cache.is_cached(digests[2], cache_dir)
@@ -0,0 +1,91 @@
+import io
+import zipfile
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from pumpcurve import writeback
+
+VBA = b"fake-vba-project"
+COLUMNS = {"모델": "모델명", "Q": "유량", "H": "토출양정"}
+
+
+# 제목 행 아래에 헤더가 있는 시트 + 수식 셀, 매크로 부분(vbaProject.bin)을 끼워 넣은 xlsm
+def _xlsm():
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "deviation data"
+    ws.append(["편차 측정 결과"])
+    ws.append([])
+    ws.append(["모델명", "유량", "토출양정"])
+    ws.append(["XRF10-1", 100, 49.8])
+    ws.append(["XRF10-1", 500, 45.0])
+    ws.append(["XRF10-2", 100, "=C4-10"])
+    buf = io.BytesIO()
+    wb.save(buf)
+    out = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(buf.getvalue())) as src, zipfile.ZipFile(out, "w") as dst:
+        for item in src.infolist():
+            dst.writestr(item, src.read(item.filename))
+        dst.writestr("xl/vbaProject.bin", VBA)
+    return out.getvalue()
+
+
+def _base():
+    return pd.DataFrame({"모델": ["XRF10-1", "XRF10-1", "XRF10-2"], "Q": [100.0, 500.0, 100.0],
+                         "H": [49.8, 45.0, 39.8], "효율": [0.5, 0.6, 0.5]})
+
+
+def _sheet(data):
+    ws = openpyxl.load_workbook(io.BytesIO(data))["deviation data"]
+    return [list(row) for row in ws.iter_rows(min_row=4, values_only=True)]
+
+
+def test_collect_changes_maps_editor_state():
+    state = {"edited_rows": {"0": {"H": 50.1, "효율": 0.9}, 2: {"Q": 120.0}},
+             "added_rows": [{"모델": "XRF10-3", "Q": 200.0}, {"H": None}],
+             "deleted_rows": [2]}
+    changes = writeback.collect_changes(_base(), state, COLUMNS)
+    # 파생 컬럼(효율), 삭제된 행의 편집, 빈 추가 행은 제외
+    assert changes == {"cells": [(0, "토출양정", 49.8, 50.1)],
+                       "added": [{"모델명": "XRF10-3", "유량": 200.0}], "deleted": [2],
+                       "columns": ["모델명", "유량", "토출양정"]}
+    assert writeback.count_changes(changes) == 3
+
+
+def test_round_trip_keeps_vba_and_writes_only_changes():
+    state = {"edited_rows": {1: {"H": 44.5}}, "added_rows": [{"모델": "XRF10-3", "Q": 200.0, "H": 60.0}]}
+    changes = writeback.collect_changes(_base(), state, COLUMNS)
+    data = writeback.apply_changes(_xlsm(), "deviation data", changes, name="master.xlsm")
+
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        assert z.read("xl/vbaProject.bin") == VBA
+    assert _sheet(data) == [["XRF10-1", 100, 49.8], ["XRF10-1", 500, 44.5],
+                            ["XRF10-2", 100, "=C4-10"], ["XRF10-3", 200, 60]]
+
+    # 저장한 파일을 다시 기준으로 삼으면 이어서 편집 가능, 삭제 행은 비우기만 함
+    # (삭제만 있어도 제목 행이 아니라 실제 헤더 행 기준으로 행 번호를 맞춤)
+    deleted = writeback.collect_changes(_base(), {"deleted_rows": [0]}, COLUMNS)
+    again = writeback.apply_changes(data, "deviation data", deleted, name="master.xlsm")
+    assert _sheet(again)[0] == [None, None, None]
+    assert _sheet(again)[1:] == _sheet(data)[1:]
+
+
+def test_stale_base_value_is_a_conflict():
+    changes = {"cells": [(0, "토출양정", 49.8, 50.0), (1, "토출양정", 44.0, 43.0)], "added": [], "deleted": []}
+    with pytest.raises(ValueError, match="C5"):
+        writeback.apply_changes(_xlsm(), "deviation data", changes, name="master.xlsm")
+
+
+def test_formula_cell_is_a_conflict():
+    changes = {"cells": [(2, "토출양정", 39.8, 41.0)], "added": [], "deleted": []}
+    with pytest.raises(ValueError, match="C6"):
+        writeback.apply_changes(_xlsm(), "deviation data", changes, name="master.xlsm")
+
+
+def test_missing_sheet_and_non_zip_source_are_rejected():
+    with pytest.raises(ValueError):
+        writeback.apply_changes(_xlsm(), "없는 시트", {"cells": [], "added": [], "deleted": []})
+    with pytest.raises(ValueError):
+        writeback.apply_changes(b"not a workbook", "deviation data", {"cells": [], "added": [], "deleted": []})